@@ -0,0 +1,105 @@
+"""
+Runtime configuration loaded from environment variables
+"""
+
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    """Read an integer setting from the environment"""
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    """Read a float setting from the environment"""
+    value = os.getenv(name)
+    return float(value) if value else default
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    """Read a boolean setting from the environment"""
+    value = os.getenv(name)
+    if not value:
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# Upstream Frankfurter API
+UPSTREAM_BASE_URL = os.getenv("FX_UPSTREAM_BASE_URL", "https://api.frankfurter.dev/v1")
+UPSTREAM_TIMEOUT = _env_float("FX_UPSTREAM_TIMEOUT", 10.0)
+UPSTREAM_MAX_RETRIES = _env_int("FX_UPSTREAM_MAX_RETRIES", 3)
+# End-to-end latency budget per request (overridable per request up to the maximum)
+REQUEST_BUDGET_SECONDS = _env_float("FX_REQUEST_BUDGET_SECONDS", 15.0)
+REQUEST_MAX_BUDGET_SECONDS = _env_float("FX_REQUEST_MAX_BUDGET_SECONDS", 60.0)
+# Send a second upstream request when the first is slower than this latency percentile
+UPSTREAM_HEDGE_ENABLED = _env_bool("FX_UPSTREAM_HEDGE_ENABLED", False)
+UPSTREAM_HEDGE_PERCENTILE = _env_float("FX_UPSTREAM_HEDGE_PERCENTILE", 0.95)
+# Long ranges are fetched as concurrent per-calendar-year chunks
+UPSTREAM_CHUNK_CONCURRENCY = _env_int("FX_UPSTREAM_CHUNK_CONCURRENCY", 4)
+
+# Circuit breaker in front of the upstream API
+CIRCUIT_FAILURE_THRESHOLD = _env_float("FX_CIRCUIT_FAILURE_THRESHOLD", 0.5)
+CIRCUIT_MINIMUM_CALLS = _env_int("FX_CIRCUIT_MINIMUM_CALLS", 5)
+CIRCUIT_WINDOW_SIZE = _env_int("FX_CIRCUIT_WINDOW_SIZE", 20)
+CIRCUIT_PROBE_INTERVAL = _env_float("FX_CIRCUIT_PROBE_INTERVAL", 30.0)
+
+# Pooled HTTP client
+HTTP_MAX_CONNECTIONS = _env_int("FX_HTTP_MAX_CONNECTIONS", 20)
+HTTP_MAX_KEEPALIVE_CONNECTIONS = _env_int("FX_HTTP_MAX_KEEPALIVE_CONNECTIONS", 10)
+HTTP_KEEPALIVE_EXPIRY = _env_float("FX_HTTP_KEEPALIVE_EXPIRY", 30.0)
+HTTP2_ENABLED = _env_bool("FX_HTTP2_ENABLED", True)
+
+# Local fallback data
+FALLBACK_FILE = os.getenv("FX_FALLBACK_FILE", "app/data/sample_fx.json")
+
+# Persistent store for final historical rates (empty disables it)
+RATE_STORE_PATH = os.getenv("FX_RATE_STORE_PATH", "app/data/fx_rates.sqlite3")
+
+# Caching
+CACHE_TTL_SECONDS = _env_int("FX_CACHE_TTL_SECONDS", 300)
+CACHE_MAX_PAIRS = _env_int("FX_CACHE_MAX_PAIRS", 256)
+CACHE_MAX_BYTES = _env_int("FX_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+CACHE_SWEEP_INTERVAL = _env_float("FX_CACHE_SWEEP_INTERVAL", 60.0)
+# Expired current-window rates are served for this long while refreshed in the background
+CACHE_MAX_STALE_SECONDS = _env_int("FX_CACHE_MAX_STALE_SECONDS", 3600)
+# Seconds after the ECB publication time the current window is refreshed (negative: before)
+PUBLICATION_REFRESH_OFFSET = _env_float("FX_PUBLICATION_REFRESH_OFFSET", 120.0)
+
+# HTTP caching of summary responses (ranges with final rates are immutable)
+HTTP_CACHE_MAX_AGE = _env_int("FX_HTTP_CACHE_MAX_AGE", 60)
+HTTP_CACHE_IMMUTABLE_MAX_AGE = _env_int("FX_HTTP_CACHE_IMMUTABLE_MAX_AGE", 365 * 24 * 3600)
+
+# Encoded /summary responses kept for repeat queries
+RESPONSE_CACHE_MAX_ENTRIES = _env_int("FX_RESPONSE_CACHE_MAX_ENTRIES", 4096)
+RESPONSE_CACHE_MAX_BYTES = _env_int("FX_RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+
+# Batch summary endpoint
+BATCH_MAX_RANGES = _env_int("FX_BATCH_MAX_RANGES", 500)
+
+# Rolling-window analytics (breakdown=rolling)
+ROLLING_DEFAULT_WINDOW = _env_int("FX_ROLLING_DEFAULT_WINDOW", 20)
+ROLLING_MAX_WINDOW = _env_int("FX_ROLLING_MAX_WINDOW", 1000)
+
+# Multi-currency summaries
+MAX_TARGET_CURRENCIES = _env_int("FX_MAX_TARGET_CURRENCIES", 40)
+
+# Startup cache warm-up: comma-separated BASE/TARGET pairs prefetched in the
+# background for the given lookback, newest year first
+WARMUP_ENABLED = _env_bool("FX_WARMUP_ENABLED", True)
+WARMUP_PAIRS = os.getenv("FX_WARMUP_PAIRS", "EUR/USD")
+WARMUP_LOOKBACK_DAYS = _env_int("FX_WARMUP_LOOKBACK_DAYS", 5 * 365)
+WARMUP_CONCURRENCY = _env_int("FX_WARMUP_CONCURRENCY", 2)
+# Total time the warm-up may spend before the remaining windows are skipped
+WARMUP_BUDGET_SECONDS = _env_float("FX_WARMUP_BUDGET_SECONDS", 60.0)
+# How long startup waits for the warm-up before accepting connections (0: not at all)
+WARMUP_STARTUP_WAIT_SECONDS = _env_float("FX_WARMUP_STARTUP_WAIT_SECONDS", 5.0)
+
+# Request profiling: a sample of requests is profiled with cProfile and reports are
+# kept for those slower than the threshold (0 disables sampling)
+PROFILE_SLOW_MS = _env_float("FX_PROFILE_SLOW_MS", 0.0)
+PROFILE_SAMPLE_RATE = _env_float("FX_PROFILE_SAMPLE_RATE", 0.01)
+# Allow clients to force a profile with the X-Debug-Profile header
+PROFILE_HEADER_ENABLED = _env_bool("FX_PROFILE_HEADER_ENABLED", False)
+PROFILE_DIR = os.getenv("FX_PROFILE_DIR", "profiles")
+PROFILE_TOP_FUNCTIONS = _env_int("FX_PROFILE_TOP_FUNCTIONS", 40)
@@ -2,15 +2,54 @@
 FX Summary Microservice
 """
 
-from fastapi import FastAPI
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.routes import health, summary
+from app import config
+from app.routes import health, metrics, summary
+from app.services.franksher_api import get_api_service, close_api_service
+from app.services.warmup import CacheWarmer, parse_pairs
+from app.utils import profiling, timing
+from app.utils.metrics import HTTP_IN_FLIGHT, HTTP_LATENCY, HTTP_REQUESTS
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Create the shared API service on startup and close its HTTP pool on shutdown
+    
+    The cache warm-up runs in the background; startup waits for it at most
+    FX_WARMUP_STARTUP_WAIT_SECONDS before accepting connections, and /ready
+    reports when it has finished.
+    """
+    service = get_api_service()
+    service.start()
+    warmer = CacheWarmer(
+        service,
+        parse_pairs(config.WARMUP_PAIRS),
+        config.WARMUP_LOOKBACK_DAYS,
+        concurrency=config.WARMUP_CONCURRENCY,
+        budget_seconds=config.WARMUP_BUDGET_SECONDS,
+        enabled=config.WARMUP_ENABLED,
+    )
+    app.state.warmer = warmer
+    warmup_task = asyncio.create_task(warmer.run())
+    if config.WARMUP_STARTUP_WAIT_SECONDS > 0:
+        await asyncio.wait({warmup_task}, timeout=config.WARMUP_STARTUP_WAIT_SECONDS)
+    yield
+    warmup_task.cancel()
+    await asyncio.gather(warmup_task, return_exceptions=True)
+    await close_api_service()
 
 app = FastAPI(
     title="FX Summary Microservice",
     description="Minimal FX summary service with Franksher API integration",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -21,8 +60,58 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Count requests and record their latency per route template"""
+    HTTP_IN_FLIGHT.inc()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_IN_FLIGHT.dec()
+        # Label by route template rather than raw path to keep cardinality bounded
+        route = request.scope.get("route")
+        template = getattr(route, "path", "unmatched")
+        HTTP_LATENCY.labels(template).observe(time.perf_counter() - started)
+        HTTP_REQUESTS.labels(template, request.method, status).inc()
+
+@app.middleware("http")
+async def server_timing(request: Request, call_next):
+    """
+    Report phase timings in a Server-Timing header and profile slow requests on demand
+    
+    A sample of requests (FX_PROFILE_SAMPLE_RATE) is profiled when FX_PROFILE_SLOW_MS
+    is set, keeping reports only for requests slower than it; with
+    FX_PROFILE_HEADER_ENABLED, "X-Debug-Profile: 1" profiles a single request.
+    """
+    timings = timing.start_request()
+    forced = config.PROFILE_HEADER_ENABLED and request.headers.get("x-debug-profile") == "1"
+    sampled = config.PROFILE_SLOW_MS > 0 and random.random() < config.PROFILE_SAMPLE_RATE
+    profiler = profiling.start_profile() if forced or sampled else None
+    
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        if profiler is not None:
+            profiling.stop_profile(profiler)
+    elapsed = time.perf_counter() - started
+    response.headers["Server-Timing"] = timings.header(total=elapsed)
+    
+    if profiler is not None and (forced or elapsed * 1000 >= config.PROFILE_SLOW_MS):
+        route = getattr(request.scope.get("route"), "path", request.url.path)
+        path = await asyncio.to_thread(profiling.dump_profile, profiler, f"{request.method} {route}")
+        if forced:
+            response.headers["X-Profile-Report"] = path
+    return response
+
 app.include_router(health.router, tags=["health"])
 app.include_router(summary.router, tags=["summary"])
+app.include_router(metrics.router, tags=["metrics"])
 
 @app.get("/")
 async def root():
@@ -31,7 +120,9 @@ async def root():
         "version": "1.0.0",
         "docs": "/docs",
         "health": "/health",
-        "summary": "/summary"
+        "ready": "/ready",
+        "summary": "/summary",
+        "metrics": "/metrics"
     }
 
 if __name__ == "__main__":
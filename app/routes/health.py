@@ -1,12 +1,32 @@
 """
-Health check endpoint
+Health and readiness endpoints
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse
+
+from app.services.franksher_api import FranksherAPIService, get_api_service
 
 router = APIRouter()
 
 @router.get("/health")
-async def health_check():
-    """Health check endpoint"""
-    return {"status": "ok"}
+async def health_check(api_service: FranksherAPIService = Depends(get_api_service)):
+    """Health check endpoint, including the upstream circuit breaker state"""
+    return {
+        "status": "ok",
+        "upstream": api_service.circuit_breaker.snapshot()
+    }
+
+@router.get("/ready")
+async def readiness_check(request: Request):
+    """
+    Readiness endpoint, separate from liveness: 503 until the startup cache warm-up has finished
+    
+    A warm-up that ran out of budget or had failed windows still counts as
+    finished, since uncached ranges are fetched on demand.
+    """
+    warmer = getattr(request.app.state, "warmer", None)
+    if warmer is None:
+        return {"status": "ready", "warmup": None}
+    body = {"status": "ready" if warmer.ready else "warming_up", "warmup": warmer.snapshot()}
+    return JSONResponse(body, status_code=200 if warmer.ready else 503)
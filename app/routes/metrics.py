@@ -0,0 +1,46 @@
+"""
+Prometheus metrics endpoint
+"""
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+
+from app.routes.summary import response_cache
+from app.services.franksher_api import FranksherAPIService, get_api_service
+from app.utils import metrics
+from app.utils.circuit_breaker import CLOSED, HALF_OPEN, OPEN
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _collect_service_metrics(api_service: FranksherAPIService) -> None:
+    """Copy the service's own counters into the registry; runs only when scraped"""
+    cache = api_service.cache.stats()
+    metrics.CACHE_LOOKUPS.labels("hit").set(cache["hits"])
+    metrics.CACHE_LOOKUPS.labels("miss").set(cache["misses"])
+    metrics.CACHE_EVICTIONS.labels().set(cache["evictions"])
+    metrics.CACHE_SIZE.labels("pairs").set(cache["pairs"])
+    metrics.CACHE_SIZE.labels("rates").set(cache["rates"])
+    metrics.CACHE_SIZE.labels("bytes").set(cache["bytes"])
+    
+    responses = response_cache.stats()
+    metrics.RESPONSE_CACHE_LOOKUPS.labels("hit").set(responses["hits"])
+    metrics.RESPONSE_CACHE_LOOKUPS.labels("miss").set(responses["misses"])
+    metrics.CACHE_SIZE.labels("response_bytes").set(responses["bytes"])
+    
+    metrics.UPSTREAM_IN_FLIGHT.set(api_service.single_flight.in_flight())
+    metrics.COALESCED_REQUESTS.labels().set(api_service.single_flight.coalesced)
+    metrics.HEDGED_REQUESTS.labels().set(api_service.hedged)
+    
+    state = api_service.circuit_breaker.state
+    for name in (CLOSED, OPEN, HALF_OPEN):
+        metrics.CIRCUIT_STATE.labels(name).set(1 if state == name else 0)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(api_service: FranksherAPIService = Depends(get_api_service)):
+    """Metrics in the Prometheus text exposition format"""
+    _collect_service_metrics(api_service)
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -2,19 +2,253 @@
 Summary endpoint for FX data
 """
 
-from datetime import datetime
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+import hashlib
+import itertools
+import re
+import time
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Tuple
 
-from app.services.franksher_api import FranksherAPIService
-from app.services.calculations import FXCalculator
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, Field
+
+from app import config
+from app.services.franksher_api import FranksherAPIService, get_api_service
+from app.services.calculations import PERIODS, FXCalculator
+from app.services.fx_series import FXSeries
+from app.utils import json_encoding, timing
+from app.utils.cache import LRUCache
+from app.utils.range_cache import merge_ranges
 
 router = APIRouter()
 
+BREAKDOWNS = ["day", *PERIODS, "rolling", "none"]
+FORMATS = ["json", "ndjson"]
+# Rows encoded per chunk when streaming NDJSON
+STREAM_CHUNK_ROWS = 256
+CURRENCY_CODE = re.compile(r"[A-Z]{3}")
+ISO_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+JSON_MEDIA_TYPE = "application/json"
+
+
+class _EncodedResponse:
+    """Encoded summary body with the ETag of the data it was computed from"""
+
+    __slots__ = ("etag", "body", "final")
+
+    def __init__(self, etag: str, body: bytes, final: bool):
+        self.etag = etag
+        self.body = body
+        self.final = final
+
+
+# Encoded JSON summaries keyed by normalized request. Entries built from final
+# rates never change and are served without touching the data; others are
+# reused only while the data's ETag still matches.
+response_cache = LRUCache(
+    max_entries=config.RESPONSE_CACHE_MAX_ENTRIES,
+    max_bytes=config.RESPONSE_CACHE_MAX_BYTES,
+    ttl_seconds=config.CACHE_TTL_SECONDS,
+)
+
+
+class SummaryRange(BaseModel):
+    """One range of a batch summary request"""
+    start: str = Field(..., description="Start date in YYYY-MM-DD format")
+    end: str = Field(..., description="End date in YYYY-MM-DD format")
+    breakdown: str = Field("none", description="'day' for daily values, 'week', 'month' or 'quarter' for per-period aggregates, 'rolling' for rolling-window statistics or 'none' for summary")
+    window: int = Field(config.ROLLING_DEFAULT_WINDOW, description="Observations per window for breakdown=rolling")
+
+
+class BatchSummaryRequest(BaseModel):
+    """Batch of summary ranges answered from one pass over the data"""
+    ranges: List[SummaryRange] = Field(..., min_length=1)
+
+
+def _parse_date(value: str) -> date:
+    """Parse a zero-padded YYYY-MM-DD date, raising ValueError otherwise"""
+    if not ISO_DATE.fullmatch(value):
+        raise ValueError(f"{value!r} is not a YYYY-MM-DD date")
+    return date.fromisoformat(value)
+
+
+def _validate_summary_params(
+    start: str,
+    end: str,
+    breakdown: str,
+    window: int = config.ROLLING_DEFAULT_WINDOW
+) -> None:
+    """Validate summary query parameters, raising HTTP 400 on invalid input"""
+    # Validate date format (zero-padded YYYY-MM-DD, as the service parses it)
+    try:
+        start_date = _parse_date(start)
+        end_date = _parse_date(end)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400, 
+            detail=f"Invalid date format. Use YYYY-MM-DD format. Error: {e}"
+        )
+    
+    # Validate breakdown parameter
+    if breakdown not in BREAKDOWNS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid breakdown parameter. Must be one of: {', '.join(BREAKDOWNS)}"
+        )
+    
+    # Validate rolling window size
+    if breakdown == "rolling" and not 2 <= window <= config.ROLLING_MAX_WINDOW:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid window parameter. Must be between 2 and {config.ROLLING_MAX_WINDOW}"
+        )
+    
+    # Validate date range
+    if start_date > end_date:
+        raise HTTPException(
+            status_code=400,
+            detail="Start date must be before or equal to end date"
+        )
+
+
+def _parse_currencies(from_currency: str, to_currency: str) -> Tuple[str, List[str]]:
+    """Validate the base and comma-separated target currencies, raising HTTP 400 on invalid input"""
+    base = from_currency.strip().upper()
+    targets = list(dict.fromkeys(
+        code.strip().upper() for code in to_currency.split(",") if code.strip()
+    ))
+    
+    invalid = [code for code in [base, *targets] if not CURRENCY_CODE.fullmatch(code)]
+    if invalid or not targets:
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid currency code. Use 3-letter ISO 4217 codes, e.g. from=EUR&to=USD,GBP"
+        )
+    if len(targets) > config.MAX_TARGET_CURRENCIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many target currencies. At most {config.MAX_TARGET_CURRENCIES} are allowed"
+        )
+    if base in targets:
+        raise HTTPException(
+            status_code=400,
+            detail="Target currency must differ from the base currency"
+        )
+    return base, targets
+
+
+def _request_deadline(timeout: Optional[str]) -> float:
+    """
+    Turn a requested latency budget in seconds into a time.monotonic() deadline
+    
+    Missing budgets use the configured default and larger ones are capped at the
+    configured maximum; invalid values raise HTTP 400.
+    """
+    budget = config.REQUEST_BUDGET_SECONDS
+    if timeout is not None:
+        try:
+            budget = float(timeout)
+        except ValueError:
+            budget = 0.0
+        if not budget > 0:
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid timeout. Use a positive number of seconds"
+            )
+    return time.monotonic() + min(budget, config.REQUEST_MAX_BUDGET_SECONDS)
+
+
+def _etag(request_key: Tuple, series_by_target: Dict[str, FXSeries]) -> str:
+    """
+    Strong ETag over the normalized request and the exact rates it is computed from
+    
+    Hashing the raw date and rate arrays is far cheaper than computing the
+    summary, so a matching If-None-Match can be answered before any calculation.
+    """
+    digest = hashlib.blake2b(repr(request_key).encode(), digest_size=16)
+    for target, series in series_by_target.items():
+        if not isinstance(series, FXSeries):
+            series = FXSeries.from_records(series)
+        digest.update(target.encode())
+        digest.update(series.dates)
+        digest.update(series.rates)
+    return f'"{digest.hexdigest()}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of If-None-Match against an ETag, as RFC 9110 requires for GET"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(
+        (tag[2:] if tag.startswith("W/") else tag) == etag
+        for tag in candidates
+    )
+
+
+def _cache_control(final: bool) -> str:
+    """Cache-Control for a summary: immutable when every rate is final, short-lived otherwise"""
+    if final:
+        return f"public, max-age={config.HTTP_CACHE_IMMUTABLE_MAX_AGE}, immutable"
+    return f"public, max-age={config.HTTP_CACHE_MAX_AGE}"
+
+
+def _stream_ndjson(
+    series_by_target: Dict[str, FXSeries],
+    breakdown: str,
+    window: int,
+    tag_currency: bool
+) -> Iterator[bytes]:
+    """
+    Encode results as NDJSON, computing daily, rolling and per-period rows lazily
+    
+    Rows are produced by a generator and flushed in small chunks, so memory per
+    request stays flat regardless of the range length. Rolling breakdowns start
+    with one line holding the window and the range's maximum drawdown, followed
+    by one line per day.
+    """
+    for target, series in series_by_target.items():
+        if breakdown == "day":
+            rows = FXCalculator.iter_daily_breakdown(series)
+        elif breakdown in PERIODS:
+            rows = FXCalculator.iter_period_breakdown(series, breakdown)
+        elif breakdown == "rolling":
+            rows = itertools.chain(
+                [{"window": window, **FXCalculator.calculate_max_drawdown(series)}],
+                FXCalculator.iter_rolling_breakdown(series, window)
+            )
+        else:
+            rows = iter([FXCalculator.process_fx_data(series, breakdown, window)])
+        
+        chunk = []
+        for row in rows:
+            if tag_currency:
+                row = {"currency": target, **row}
+            chunk.append(json_encoding.dumps(row))
+            if len(chunk) >= STREAM_CHUNK_ROWS:
+                yield b"\n".join(chunk) + b"\n"
+                chunk = []
+        if chunk:
+            yield b"\n".join(chunk) + b"\n"
+
+
 @router.get("/summary")
 async def get_fx_summary(
     start: str = Query(..., description="Start date in YYYY-MM-DD format"),
     end: str = Query(..., description="End date in YYYY-MM-DD format"),
-    breakdown: str = Query("none", description="Either 'day' for daily values or 'none' for summary")
+    breakdown: str = Query("none", description="'day' for daily values, 'week', 'month' or 'quarter' for per-period aggregates, 'rolling' for rolling-window statistics or 'none' for summary"),
+    window: int = Query(config.ROLLING_DEFAULT_WINDOW, description="Observations per window for breakdown=rolling"),
+    from_currency: str = Query("EUR", alias="from", description="Base currency, e.g. EUR"),
+    to_currency: str = Query("USD", alias="to", description="Target currency, or several separated by commas"),
+    response_format: str = Query("json", alias="format", description="'json' or 'ndjson' (streamed, one row per line)"),
+    timeout: Optional[str] = Query(None, description="Latency budget in seconds for this request"),
+    timeout_header: Optional[str] = Header(None, alias="X-Request-Timeout"),
+    if_none_match: Optional[str] = Header(None, alias="If-None-Match"),
+    api_service: FranksherAPIService = Depends(get_api_service)
 ):
     """
     Get FX summary for a date range
@@ -22,51 +256,172 @@ async def get_fx_summary(
     Args:
         start: Start date in YYYY-MM-DD format
         end: End date in YYYY-MM-DD format
-        breakdown: Either "day" for daily values or "none" for summary
+        breakdown: "day" for daily values, "week", "month" or "quarter" for
+            first/last/min/max/mean rate and percent change per calendar
+            period, "rolling" for moving average, rolling
+            min/max and volatility per day plus the maximum drawdown, or "none"
+            for summary
+        window: Observations per window for the "rolling" breakdown
+        from_currency: Base currency (query parameter "from")
+        to_currency: Comma-separated target currencies (query parameter "to")
+        response_format: "json", or "ndjson" to stream rows as they are computed
+            (query parameter "format")
+        timeout: Latency budget in seconds; overrides the X-Request-Timeout header
+        timeout_header: Latency budget in seconds from the X-Request-Timeout header
+        if_none_match: ETags the client already holds; a match returns 304
+        api_service: Shared API service injected by FastAPI
         
     Returns:
-        FX summary data in JSON format
+        FX summary data in JSON format; with several targets, an object
+        keyed by target currency. Responses carry a strong ETag and a
+        Cache-Control lifetime (immutable once every rate is final).
     """
     try:
-        # Validate date format
-        try:
-            datetime.strptime(start, "%Y-%m-%d")
-            datetime.strptime(end, "%Y-%m-%d")
-        except ValueError as e:
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Invalid date format. Use YYYY-MM-DD format. Error: {e}"
-            )
+        with timing.phase(timing.VALIDATION):
+            deadline = _request_deadline(timeout if timeout is not None else timeout_header)
+            _validate_summary_params(start, end, breakdown, window)
+            base, targets = _parse_currencies(from_currency, to_currency)
+            if response_format not in FORMATS:
+                raise HTTPException(
+                    status_code=400,
+                    detail="Invalid format parameter. Must be 'json' or 'ndjson'"
+                )
         
-        # Validate breakdown parameter
-        if breakdown not in ["day", "none"]:
-            raise HTTPException(
-                status_code=400,
-                detail="Invalid breakdown parameter. Must be 'day' or 'none'"
-            )
+        if breakdown != "rolling":
+            window = config.ROLLING_DEFAULT_WINDOW  # ignored, keep the cache key normalized
+        request_key = (start, end, breakdown, window, base, tuple(targets), response_format)
+        cached = response_cache.get(request_key) if response_format == "json" else None
+        if cached is not None and cached.final:
+            # Final rates never change: skip fetching, calculation and encoding
+            headers = {"ETag": cached.etag, "Cache-Control": _cache_control(True)}
+            if _etag_matches(if_none_match, cached.etag):
+                return Response(status_code=304, headers=headers)
+            return Response(cached.body, media_type=JSON_MEDIA_TYPE, headers=headers)
+        
+        # Fetch data (all targets share one upstream fetch per range)
+        if len(targets) == 1:
+            data = await api_service.get_fx_data(start, end, base, targets[0], deadline=deadline)
+            series_by_target = {targets[0]: data}
+        else:
+            series_by_target = await api_service.get_fx_rates(start, end, base, targets, deadline=deadline)
         
-        # Validate date range
-        if start > end:
+        if not any(series_by_target.values()):
             raise HTTPException(
-                status_code=400,
-                detail="Start date must be before or equal to end date"
+                status_code=404,
+                detail="No FX data available for the specified date range"
             )
         
-        # Initialize API service
-        api_service = FranksherAPIService()
+        # Conditional request: answer from the validator before any calculation
+        final = api_service.is_final(start, end, base, targets)
+        etag = _etag(request_key, series_by_target)
+        headers = {"ETag": etag, "Cache-Control": _cache_control(final)}
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
         
-        # Fetch data (EUR to USD only as per specification)
-        data = await api_service.get_fx_data(start, end, "EUR", "USD")
+        if cached is not None and cached.etag == etag:
+            if final:
+                response_cache.set(request_key, _EncodedResponse(etag, cached.body, True), ttl=None, size=len(cached.body))
+            return Response(cached.body, media_type=JSON_MEDIA_TYPE, headers=headers)
         
-        if not data:
-            raise HTTPException(
-                status_code=404,
-                detail="No FX data available for the specified date range"
+        if response_format == "ndjson":
+            return StreamingResponse(
+                _stream_ndjson(series_by_target, breakdown, window, tag_currency=len(targets) > 1),
+                media_type="application/x-ndjson",
+                headers=headers
             )
         
         # Process data
-        result = FXCalculator.process_fx_data(data, breakdown)
-        return result
+        with timing.phase(timing.PROCESSING):
+            if len(targets) == 1:
+                result = FXCalculator.process_fx_data(series_by_target[targets[0]], breakdown, window)
+            else:
+                result = {
+                    target: FXCalculator.process_fx_data(series, breakdown, window)
+                    for target, series in series_by_target.items()
+                }
+        with timing.phase(timing.SERIALIZATION):
+            body = json_encoding.dumps(result)
+        response_cache.set(
+            request_key,
+            _EncodedResponse(etag, body, final),
+            ttl=None if final else config.CACHE_TTL_SECONDS,
+            size=len(body)
+        )
+        return Response(body, media_type=JSON_MEDIA_TYPE, headers=headers)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+
+@router.post("/summary/batch")
+async def get_fx_summary_batch(
+    request: BatchSummaryRequest = Body(...),
+    timeout_header: Optional[str] = Header(None, alias="X-Request-Timeout"),
+    api_service: FranksherAPIService = Depends(get_api_service)
+):
+    """
+    Get FX summaries for many date ranges in one request
+    
+    The union of the ranges is fetched once (overlapping ranges are merged) and
+    every range is answered from a zero-copy slice of that data.
+    
+    Args:
+        request: Ranges with their breakdown modes
+        timeout_header: Latency budget in seconds from the X-Request-Timeout header
+        api_service: Shared API service injected by FastAPI
+        
+    Returns:
+        Results in request order; ranges without data carry an "error" entry
+    """
+    deadline = _request_deadline(timeout_header)
+    if len(request.ranges) > config.BATCH_MAX_RANGES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many ranges. A batch may contain at most {config.BATCH_MAX_RANGES}"
+        )
+    
+    with timing.phase(timing.VALIDATION):
+        for index, item in enumerate(request.ranges):
+            try:
+                _validate_summary_params(item.start, item.end, item.breakdown, item.window)
+            except HTTPException as e:
+                raise HTTPException(status_code=400, detail=f"ranges[{index}]: {e.detail}")
+    
+    try:
+        spans = merge_ranges([
+            (date.fromisoformat(item.start), date.fromisoformat(item.end))
+            for item in request.ranges
+        ])
+        fetched = await asyncio.gather(*(
+            api_service.get_fx_data(span_start.isoformat(), span_end.isoformat(), "EUR", "USD", deadline=deadline)
+            for span_start, span_end in spans
+        ))
+        
+        results = []
+        with timing.phase(timing.PROCESSING):
+            for item in request.ranges:
+                start = date.fromisoformat(item.start)
+                end = date.fromisoformat(item.end)
+                series = next(
+                    data for (span_start, span_end), data in zip(spans, fetched)
+                    if span_start <= start and end <= span_end
+                )
+                results.append({
+                    "start": item.start,
+                    "end": item.end,
+                    "breakdown": item.breakdown,
+                    "result": FXCalculator.process_fx_data(
+                        series.between(start, end), item.breakdown, item.window
+                    )
+                })
+        with timing.phase(timing.SERIALIZATION):
+            body = json_encoding.dumps({"results": results})
+        return Response(body, media_type=JSON_MEDIA_TYPE)
         
     except HTTPException:
         raise
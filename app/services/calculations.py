@@ -2,13 +2,59 @@
 FX calculation utilities
 """
 
-from typing import List, Dict, Optional
+import math
+from collections import deque
+from datetime import date
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from app.services.fx_series import FXSeries
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency, pure-Python fallback is used
+    np = None
+
+# Calendar periods supported by the resampled breakdowns
+PERIODS = ("week", "month", "quarter")
+
+
+def _period_bounds(ordinal: int, period: str) -> Tuple[str, int]:
+    """
+    Label of the calendar period containing a day and the ordinal of the next period's first day
+    
+    Weeks are ISO weeks (Monday to Sunday), labelled like "2025-W27"; months
+    like "2025-07" and quarters like "2025-Q3".
+    """
+    day = date.fromordinal(ordinal)
+    if period == "week":
+        year, week, weekday = day.isocalendar()
+        return f"{year}-W{week:02d}", ordinal - weekday + 8
+    if period == "month":
+        first_month = day.month
+        label = f"{day.year}-{day.month:02d}"
+        months = 1
+    else:
+        first_month = (day.month - 1) // 3 * 3 + 1
+        label = f"{day.year}-Q{(day.month - 1) // 3 + 1}"
+        months = 3
+    next_month = first_month + months
+    next_start = date(day.year + (next_month - 1) // 12, (next_month - 1) % 12 + 1, 1)
+    return label, next_start.toordinal()
+
 
 class FXCalculator:
     """Utility class for FX rate calculations"""
     
+    # Series at least this long use the NumPy backend when it is installed;
+    # below it, NumPy's per-call overhead outweighs the loop
+    vectorize_threshold = 256
+    
+    @staticmethod
+    def _use_numpy(rates: Sequence[float]) -> bool:
+        return np is not None and len(rates) >= FXCalculator.vectorize_threshold
+    
     @staticmethod
-    def calculate_daily_percent_change(rates: List[float]) -> List[Optional[float]]:
+    def calculate_daily_percent_change(rates: Sequence[float]) -> List[Optional[float]]:
         """
         Calculate daily percent change for a list of rates
         
@@ -21,6 +67,9 @@ class FXCalculator:
         if not rates:
             return []
         
+        if FXCalculator._use_numpy(rates):
+            return FXCalculator._vectorized_percent_change(rates)
+        
         percent_changes = [None]  # First day has no previous rate
         
         for i in range(1, len(rates)):
@@ -36,7 +85,7 @@ class FXCalculator:
         return percent_changes
     
     @staticmethod
-    def calculate_mean_rate(rates: List[float]) -> float:
+    def calculate_mean_rate(rates: Sequence[float]) -> float:
         """
         Calculate arithmetic mean of rates
         
@@ -49,6 +98,8 @@ class FXCalculator:
         if not rates:
             return 0.0
         
+        # Sequential sum on purpose: NumPy's pairwise summation rounds differently
+        # and can change the 6th decimal of the mean
         return round(sum(rates) / len(rates), 6)
     
     @staticmethod
@@ -70,49 +121,277 @@ class FXCalculator:
         return round(total_change, 2)
     
     @staticmethod
-    def process_fx_data(
-        data: List[Dict], 
-        breakdown: str = "none"
+    def _vectorized_percent_change(rates: Sequence[float]) -> List[Optional[float]]:
+        """NumPy implementation of calculate_daily_percent_change with identical output"""
+        values = np.asarray(rates, dtype=np.float64)  # zero-copy for FXSeries views
+        previous = values[:-1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            pct_changes = ((values[1:] - previous) / previous) * 100
+            rounded = np.round(pct_changes, 2)
+            
+            # np.round scales by 100 before rounding, so values sitting on a .5
+            # boundary may round differently from round(); redo those in Python
+            scaled = pct_changes * 100
+            ties = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+        for i in ties:
+            rounded[i] = round(float(pct_changes[i]), 2)
+        
+        result = rounded.tolist()
+        for i in np.flatnonzero(previous == 0):
+            result[i] = None
+        return [None] + result
+    
+    @staticmethod
+    def calculate_max_drawdown(series: FXSeries) -> Dict:
+        """
+        Calculate the largest peak-to-trough decline in one pass
+        
+        Args:
+            series: Date-sorted FX series
+            
+        Returns:
+            Dictionary with the decline as a (non-positive) percentage and the
+            peak and trough dates; all None for an empty series
+        """
+        peak_rate = None
+        peak_ordinal = None
+        worst = 0.0
+        worst_peak = worst_trough = None
+        for ordinal, rate in series:
+            if peak_rate is None or rate > peak_rate:
+                peak_rate, peak_ordinal = rate, ordinal
+            elif peak_rate > 0:
+                drawdown = (rate - peak_rate) / peak_rate
+                if drawdown < worst:
+                    worst, worst_peak, worst_trough = drawdown, peak_ordinal, ordinal
+        
+        if peak_rate is None:
+            return {"max_drawdown_pct": None, "peak_date": None, "trough_date": None}
+        return {
+            "max_drawdown_pct": round(worst * 100, 2),
+            "peak_date": date.fromordinal(worst_peak).isoformat() if worst_peak is not None else None,
+            "trough_date": date.fromordinal(worst_trough).isoformat() if worst_trough is not None else None
+        }
+    
+    @staticmethod
+    def iter_rolling_breakdown(series: FXSeries, window: int) -> Iterator[Dict]:
+        """
+        Yield rolling statistics for every day with a full window
+        
+        All statistics are updated incrementally in a single O(n) pass: running
+        sums for the moving average and volatility, and monotonic deques of
+        indices for the rolling minimum and maximum.
+        
+        Args:
+            series: Date-sorted FX series
+            window: Number of observations per window (at least 2)
+            
+        Yields:
+            Dictionaries with date, rate, moving_average, rolling_min, rolling_max
+            and volatility (sample standard deviation of the daily percent changes
+            inside the window)
+        """
+        dates = series.dates
+        rates = series.rates
+        total = 0.0
+        # Running sums of the daily percent changes inside the window; changes
+        # after a zero rate are undefined and left out
+        returns = [None] * len(rates)
+        return_sum = 0.0
+        return_squares = 0.0
+        return_count = 0
+        lows = deque()
+        highs = deque()
+        
+        for i, rate in enumerate(rates):
+            total += rate
+            if i > 0 and rates[i - 1] != 0:
+                change = (rate - rates[i - 1]) / rates[i - 1] * 100
+                returns[i] = change
+                return_sum += change
+                return_squares += change * change
+                return_count += 1
+            
+            while lows and rates[lows[-1]] >= rate:
+                lows.pop()
+            lows.append(i)
+            while highs and rates[highs[-1]] <= rate:
+                highs.pop()
+            highs.append(i)
+            
+            leaving = i - window
+            if leaving >= 0:
+                total -= rates[leaving]
+                # The change into the oldest rate of the window belongs to the previous window
+                dropped = returns[leaving + 1]
+                if dropped is not None:
+                    return_sum -= dropped
+                    return_squares -= dropped * dropped
+                    return_count -= 1
+                if lows[0] <= leaving:
+                    lows.popleft()
+                if highs[0] <= leaving:
+                    highs.popleft()
+            
+            if i + 1 < window:
+                continue
+            
+            volatility = None
+            if return_count > 1:
+                variance = (return_squares - return_sum * return_sum / return_count) / (return_count - 1)
+                volatility = round(math.sqrt(max(variance, 0.0)), 4)
+            yield {
+                "date": date.fromordinal(dates[i]).isoformat(),
+                "rate": rate,
+                "moving_average": round(total / window, 6),
+                "rolling_min": rates[lows[0]],
+                "rolling_max": rates[highs[0]],
+                "volatility": volatility
+            }
+    
+    @staticmethod
+    def iter_period_breakdown(series: FXSeries, period: str) -> Iterator[Dict]:
+        """
+        Yield OHLC-style aggregates per calendar period in one streaming pass
+        
+        The series is date-sorted, so each period is a contiguous run of rows: only
+        the running aggregates of the current period are kept, and a row is emitted
+        when the first day of the next period (or the end of the series) is reached.
+        The period boundary is computed once per period, so rows inside it cost only
+        an integer comparison.
+        
+        Args:
+            series: Date-sorted FX series
+            period: One of 'week', 'month' or 'quarter'
+            
+        Yields:
+            Dictionaries with period, start_date, end_date, first_rate, last_rate,
+            min_rate, max_rate, mean_rate, pct_change (first to last rate of the
+            period) and days (number of rates)
+        """
+        dates = series.dates
+        rates = series.rates
+        n = len(dates)
+        i = 0
+        while i < n:
+            label, next_start = _period_bounds(dates[i], period)
+            start = i
+            first = low = high = rates[i]
+            total = 0.0
+            while i < n and dates[i] < next_start:
+                rate = rates[i]
+                if rate < low:
+                    low = rate
+                elif rate > high:
+                    high = rate
+                total += rate
+                i += 1
+            yield FXCalculator._period_row(
+                label, dates[start], dates[i - 1], first, rates[i - 1], low, high, total, i - start
+            )
+    
+    @staticmethod
+    def _period_row(
+        label: str,
+        first_ordinal: int,
+        last_ordinal: int,
+        first: float,
+        last: float,
+        low: float,
+        high: float,
+        total: float,
+        count: int
     ) -> Dict:
+        """Build one resampled period row from its running aggregates"""
+        return {
+            "period": label,
+            "start_date": date.fromordinal(first_ordinal).isoformat(),
+            "end_date": date.fromordinal(last_ordinal).isoformat(),
+            "first_rate": first,
+            "last_rate": last,
+            "min_rate": low,
+            "max_rate": high,
+            "mean_rate": round(total / count, 6),
+            "pct_change": FXCalculator.calculate_total_percent_change(first, last),
+            "days": count
+        }
+    
+    @staticmethod
+    def process_fx_data(
+        data: Union[FXSeries, List[Dict]], 
+        breakdown: str = "none",
+        window: int = 20
+    ) -> Union[Dict, List[Dict]]:
         """
         Process FX data and return summary or daily breakdown
         
         Args:
-            data: List of FX data dictionaries with 'date' and 'rate' keys
-            breakdown: Either 'day' for daily breakdown or 'none' for summary
+            data: FXSeries, or list of FX data dictionaries with 'date' and 'rate' keys
+            breakdown: 'day' for daily breakdown, 'week', 'month' or 'quarter' for
+                per-period aggregates, 'rolling' for rolling-window statistics or
+                'none' for summary
+            window: Observations per window for the 'rolling' breakdown
             
         Returns:
-            Processed data dictionary
+            Summary or rolling-window dictionary, or a list of rows for the
+            daily and per-period breakdowns
         """
         if not data:
             return {
                 "error": "No data available for the specified date range"
             }
         
-        # Sort data by date
-        sorted_data = sorted(data, key=lambda x: x['date'])
-        
-        # Extract rates and dates
-        dates = [item['date'] for item in sorted_data]
-        rates = [float(item['rate']) for item in sorted_data]
+        # FXSeries is already sorted by date; dictionaries are sorted on conversion
+        series = data if isinstance(data, FXSeries) else FXSeries.from_records(data)
         
         if breakdown == "day":
-            return FXCalculator._create_daily_breakdown(dates, rates)
+            return FXCalculator._create_daily_breakdown(series.iso_dates(), series.rates)
+        elif breakdown in PERIODS:
+            return list(FXCalculator.iter_period_breakdown(series, breakdown))
+        elif breakdown == "rolling":
+            return FXCalculator._create_rolling_breakdown(series, window)
         else:
-            return FXCalculator._create_summary(rates)
+            return FXCalculator._create_summary(series.rates)
+    
+    @staticmethod
+    def iter_daily_breakdown(series: FXSeries) -> Iterator[Dict]:
+        """
+        Yield the daily breakdown row by row without materializing it
+        
+        Produces the same rows as process_fx_data(series, "day") while keeping
+        only the previous rate in memory, for streaming responses.
+        
+        Args:
+            series: Date-sorted FX series
+            
+        Yields:
+            Dictionaries with date, rate and pct_change
+        """
+        previous_rate = None
+        for ordinal, rate in series:
+            if previous_rate is None or previous_rate == 0:
+                pct_change = None
+            else:
+                pct_change = round(((rate - previous_rate) / previous_rate) * 100, 2)
+            yield {
+                "date": date.fromordinal(ordinal).isoformat(),
+                "rate": rate,
+                "pct_change": pct_change
+            }
+            previous_rate = rate
     
     @staticmethod
     def _create_daily_breakdown(
         dates: List[str], 
-        rates: List[float]
+        rates: Sequence[float]
     ) -> List[Dict]:
         """Create daily breakdown response as array"""
         percent_changes = FXCalculator.calculate_daily_percent_change(rates)
         
         days = []
-        for i, (date, rate, pct_change) in enumerate(zip(dates, rates, percent_changes)):
+        for i, (day, rate, pct_change) in enumerate(zip(dates, rates, percent_changes)):
             days.append({
-                "date": date,
+                "date": day,
                 "rate": rate,
                 "pct_change": pct_change
             })
@@ -120,7 +399,16 @@ class FXCalculator:
         return days
     
     @staticmethod
-    def _create_summary(rates: List[float]) -> Dict:
+    def _create_rolling_breakdown(series: FXSeries, window: int) -> Dict:
+        """Create rolling-window response: per-day statistics plus the range's max drawdown"""
+        return {
+            "window": window,
+            **FXCalculator.calculate_max_drawdown(series),
+            "days": list(FXCalculator.iter_rolling_breakdown(series, window))
+        }
+    
+    @staticmethod
+    def _create_summary(rates: Sequence[float]) -> Dict:
         """Create summary response"""
         start_rate = rates[0]
         end_rate = rates[-1]
@@ -0,0 +1,84 @@
+"""
+Indexed local fallback dataset
+"""
+
+import json
+import os
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from app.services.fx_series import FXSeries
+
+
+class FallbackIndex:
+    """
+    Sorted, array-backed index over the local fallback JSON file
+
+    The file is parsed once and kept as one series (parallel arrays of date
+    ordinals and rates) per currency pair; range lookups use binary search.
+    Records without 'from'/'to' are treated as EUR/USD. The index is rebuilt
+    only when the file's modification time (or size) changes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._signature: Optional[tuple] = None
+        self._series: Dict[Tuple[str, str], FXSeries] = {}
+
+    def lookup(
+        self,
+        start_date: str,
+        end_date: str,
+        pair: Tuple[str, str] = ("EUR", "USD")
+    ) -> FXSeries:
+        """
+        Return fallback rates within a date range
+
+        Args:
+            start_date: Start date in YYYY-MM-DD format
+            end_date: End date in YYYY-MM-DD format
+            pair: (base, quote) currency pair (default: EUR/USD)
+
+        Returns:
+            Zero-copy series slice over the indexed data
+        """
+        self._refresh()
+        series = self._series.get(pair)
+        if series is None:
+            return FXSeries()
+        return series.between(date.fromisoformat(start_date), date.fromisoformat(end_date))
+
+    def pairs(self) -> List[Tuple[str, str]]:
+        """Currency pairs available in the fallback file"""
+        self._refresh()
+        return list(self._series)
+
+    def __len__(self) -> int:
+        self._refresh()
+        return sum(len(series) for series in self._series.values())
+
+    def _refresh(self) -> None:
+        """Reload the index if the file changed since it was last read"""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            self._signature = None
+            self._series = {}
+            return
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return
+
+        # Record the signature even if parsing fails, so a broken file is not reparsed per call
+        self._signature = signature
+        try:
+            with open(self.path, 'r') as f:
+                records = json.load(f)
+            by_pair: Dict[Tuple[str, str], List[Dict]] = {}
+            for item in records:
+                pair = (item.get("from", "EUR"), item.get("to", "USD"))
+                by_pair.setdefault(pair, []).append(item)
+            self._series = {pair: FXSeries.from_records(items) for pair, items in by_pair.items()}
+        except Exception:
+            self._series = {}
@@ -2,31 +2,206 @@
 Franksher API service with fallback to local data
 """
 
-import json
-import os
+import importlib.util
 import time
-from typing import List, Dict, Optional
+from datetime import date, datetime, timedelta, timezone
+from typing import Awaitable, Callable, List, Dict, Optional, Tuple
 import httpx
 import asyncio
 
+from app import config
+from app.services.fallback_data import FallbackIndex
+from app.services.fx_series import FXSeries
+from app.services.rate_store import RateStore
+from app.utils import metrics, timing
+from app.utils.cache import sweep_periodically
+from app.utils.circuit_breaker import CLOSED, CircuitBreaker
+from app.utils.latency import LatencyWindow
+from app.utils.publication import latest_publication_date, next_refresh_time
+from app.utils.range_cache import RangeCache, merge_ranges
+
+
+# ECB reference rates are published against EUR; every cached pair is an EUR leg
+ANCHOR_CURRENCY = "EUR"
+
+
+def _http2_available() -> bool:
+    """HTTP/2 support in httpx requires the optional h2 package"""
+    return importlib.util.find_spec("h2") is not None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent upstream fetches per currency pair
+
+    Each fetch runs as a shared task registered with the day interval it covers.
+    A caller whose range overlaps fetches already in flight awaits those tasks
+    and only starts new fetches for the days nobody is fetching yet.
+    """
+    
+    def __init__(self):
+        self._inflight: Dict[Tuple[str, str], List[Tuple[int, int, asyncio.Task]]] = {}
+        self.leaders = 0  # fetches actually started
+        self.coalesced = 0  # callers that shared at least one in-flight fetch
+    
+    def run(
+        self,
+        pair: Tuple[str, str],
+        start: date,
+        end: date,
+        fetch: Callable[[date, date], Awaitable[None]]
+    ) -> List[asyncio.Task]:
+        """
+        Return the tasks that together cover a range, starting fetches only for uncovered days
+        
+        Args:
+            pair: (base, quote) currency pair
+            start: First day of the range
+            end: Last day of the range
+            fetch: Coroutine function fetching and caching one sub-range
+            
+        Returns:
+            Shared tasks to await (wrap them in asyncio.shield)
+        """
+        tasks = []
+        shared = False
+        cursor = start.toordinal()
+        last = end.toordinal()
+        for first, final, task in sorted(self._inflight.get(pair, []), key=lambda entry: entry[0]):
+            if final < cursor or first > last:
+                continue
+            if first > cursor:
+                tasks.append(self._start(pair, cursor, first - 1, fetch))
+            tasks.append(task)
+            shared = True
+            cursor = final + 1
+            if cursor > last:
+                break
+        if cursor <= last:
+            tasks.append(self._start(pair, cursor, last, fetch))
+        
+        if shared:
+            self.coalesced += 1
+        return tasks
+    
+    def in_flight(self) -> int:
+        """Number of upstream fetches currently running"""
+        return sum(len(entries) for entries in self._inflight.values())
+    
+    def _start(
+        self,
+        pair: Tuple[str, str],
+        first: int,
+        last: int,
+        fetch: Callable[[date, date], Awaitable[None]]
+    ) -> asyncio.Task:
+        """Start a shared fetch task and register it until it completes"""
+        task = asyncio.ensure_future(fetch(date.fromordinal(first), date.fromordinal(last)))
+        entry = (first, last, task)
+        self._inflight.setdefault(pair, []).append(entry)
+        self.leaders += 1
+        
+        def _done(finished: asyncio.Task) -> None:
+            entries = self._inflight.get(pair, [])
+            if entry in entries:
+                entries.remove(entry)
+            if not entries:
+                self._inflight.pop(pair, None)
+            # Mark the exception retrieved when every caller has gone away
+            if not finished.cancelled():
+                finished.exception()
+        
+        task.add_done_callback(_done)
+        return task
+
+
 class FranksherAPIService:
     """Service for fetching FX data from Franksher API with local fallback"""
     
-    def __init__(self):
-        self.base_url = "https://api.frankfurter.dev/v1"
-        self.fallback_file = "app/data/sample_fx.json"
-        self.timeout = 10.0
-        self.max_retries = 3
-        self.cache = {}  # Simple in-memory cache
-        self.cache_ttl = 300  # 5 minutes
+    def __init__(
+        self,
+        client: Optional[httpx.AsyncClient] = None,
+        max_connections: int = config.HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections: int = config.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = config.HTTP_KEEPALIVE_EXPIRY,
+        http2: bool = config.HTTP2_ENABLED,
+        store_path: Optional[str] = config.RATE_STORE_PATH,
+        fallback_file: str = config.FALLBACK_FILE,
+    ):
+        self.base_url = config.UPSTREAM_BASE_URL
+        self.fallback = FallbackIndex(fallback_file)
+        self.timeout = config.UPSTREAM_TIMEOUT
+        self.max_retries = config.UPSTREAM_MAX_RETRIES
+        self.cache_ttl = config.CACHE_TTL_SECONDS
+        self.cache = RangeCache(
+            ttl_seconds=self.cache_ttl,
+            max_pairs=config.CACHE_MAX_PAIRS,
+            max_bytes=config.CACHE_MAX_BYTES,
+            max_stale_seconds=config.CACHE_MAX_STALE_SECONDS,
+        )
+        self.rate_store = RateStore(store_path) if store_path else None
+        self.single_flight = SingleFlight()
+        self.circuit_breaker = CircuitBreaker(
+            failure_threshold=config.CIRCUIT_FAILURE_THRESHOLD,
+            minimum_calls=config.CIRCUIT_MINIMUM_CALLS,
+            window_size=config.CIRCUIT_WINDOW_SIZE,
+            probe_interval=config.CIRCUIT_PROBE_INTERVAL,
+        )
+        # Bounds concurrent chunk requests across all callers
+        self.chunk_semaphore = asyncio.Semaphore(config.UPSTREAM_CHUNK_CONCURRENCY)
+        self._background_tasks: List[asyncio.Task] = []
+        self.hedge = config.UPSTREAM_HEDGE_ENABLED
+        self.upstream_latency = LatencyWindow()
+        self.hedged = 0  # upstream requests that were hedged with a second one
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2 and _http2_available()
+        self._client = client
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled HTTP client shared by every upstream call, created on first use"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2,
+            )
+        return self._client
+    
+    def start(self) -> None:
+        """Start background maintenance tasks (expired cache sweep, publication refresh)"""
+        if not self._background_tasks:
+            self._background_tasks.append(
+                asyncio.create_task(sweep_periodically(self.cache, config.CACHE_SWEEP_INTERVAL))
+            )
+            self._background_tasks.append(
+                asyncio.create_task(self._refresh_at_publication())
+            )
+    
+    async def aclose(self) -> None:
+        """Stop background tasks, then close the pooled HTTP client and release its connections"""
+        for task in self._background_tasks:
+            task.cancel()
+        await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        self._background_tasks.clear()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        if self.rate_store is not None:
+            await asyncio.to_thread(self.rate_store.close)
     
     async def get_fx_data(
         self, 
         start_date: str, 
         end_date: str, 
         from_currency: str = "EUR", 
-        to_currency: str = "USD"
-    ) -> List[Dict]:
+        to_currency: str = "USD",
+        deadline: Optional[float] = None
+    ) -> FXSeries:
         """
         Fetch FX data from Franksher API with fallback to local data
         
@@ -35,102 +210,517 @@ class FranksherAPIService:
             end_date: End date in YYYY-MM-DD format
             from_currency: Base currency (default: EUR)
             to_currency: Target currency (default: USD)
+            deadline: time.monotonic() value by which an answer is needed
+                (default: now plus the configured request budget)
             
         Returns:
-            List of dictionaries with date and rate information
+            Date-sorted series of rates (a zero-copy slice of the cached history
+            for EUR-based pairs)
+        """
+        rates = await self.get_fx_rates(start_date, end_date, from_currency, [to_currency], deadline)
+        return rates[to_currency]
+    
+    async def get_fx_rates(
+        self,
+        start_date: str,
+        end_date: str,
+        from_currency: str,
+        to_currencies: List[str],
+        deadline: Optional[float] = None
+    ) -> Dict[str, FXSeries]:
+        """
+        Fetch FX data for several target currencies at once
+        
+        Rates are cached as EUR legs (EUR/X), which one upstream call returns for
+        every currency. Other pairs are triangulated locally: X/Y = (EUR/Y) / (EUR/X).
+        
+        Args:
+            start_date: Start date in YYYY-MM-DD format
+            end_date: End date in YYYY-MM-DD format
+            from_currency: Base currency
+            to_currencies: Target currencies
+            deadline: time.monotonic() value by which an answer is needed; once
+                it passes, this caller stops waiting and uncovered legs are
+                answered from the local fallback without caching it. Shared
+                upstream fetches keep the service's own timeout and retries and
+                finish in the background (default: now plus the configured
+                request budget)
+            
+        Returns:
+            Series per target currency (empty when no data is available)
+        """
+        if deadline is None:
+            deadline = time.monotonic() + config.REQUEST_BUDGET_SECONDS
+        start = date.fromisoformat(start_date)
+        end = date.fromisoformat(end_date)
+        legs = sorted({
+            currency for currency in [from_currency, *to_currencies]
+            if currency != ANCHOR_CURRENCY
+        })
+        complete = await self._ensure_legs(start, end, legs, deadline)
+        
+        with timing.phase(timing.CACHE):
+            leg_series = {
+                currency: self.cache.get_range((ANCHOR_CURRENCY, currency), start, end)
+                for currency in legs
+            }
+        if not complete:
+            # Out of budget: legs still being fetched are answered from local data
+            for currency in legs:
+                pair = (ANCHOR_CURRENCY, currency)
+                if self.cache.missing_ranges(pair, start, end):
+                    metrics.FALLBACK_ACTIVATIONS.labels("deadline").inc()
+                    local = await self._load_local_data(start_date, end_date, pair)
+                    leg_series[currency] = local or leg_series[currency]
+        result = {}
+        for to_currency in to_currencies:
+            if to_currency == from_currency:
+                result[to_currency] = FXSeries()
+            elif from_currency == ANCHOR_CURRENCY:
+                result[to_currency] = leg_series[to_currency]
+            else:
+                result[to_currency] = FXSeries.ratio(
+                    leg_series.get(to_currency), leg_series[from_currency]
+                )
+        return result
+    
+    def is_final(
+        self,
+        start_date: str,
+        end_date: str,
+        from_currency: str,
+        to_currencies: List[str]
+    ) -> bool:
+        """
+        Whether the cached rates for a request are final and will never change
+        
+        True only when every leg is covered by permanent (published, upstream or
+        persisted) rates; ranges answered from the local fallback or reaching
+        into the current window are not final.
+        """
+        start = date.fromisoformat(start_date)
+        end = date.fromisoformat(end_date)
+        legs = {
+            currency for currency in [from_currency, *to_currencies]
+            if currency != ANCHOR_CURRENCY
+        }
+        return all(
+            self.cache.is_permanent((ANCHOR_CURRENCY, currency), start, end)
+            for currency in legs
+        )
+    
+    async def _ensure_legs(self, start: date, end: date, legs: List[str], deadline: float) -> bool:
+        """
+        Make sure the EUR legs for a range are cached, fetching only what is missing
+        
+        Returns:
+            False when the deadline passed before the fetches finished; they keep
+            running in the background and fill the cache for later callers
+        """
+        pairs = [(ANCHOR_CURRENCY, currency) for currency in legs]
+        # Shared fetches run under the service's own timeout and retries; the
+        # deadline only bounds how long this caller waits for them
+        tasks = await self._start_fetches(start, end, legs, count_lookup=True)
+        complete = True
+        if tasks:
+            try:
+                with timing.phase(timing.UPSTREAM):
+                    await asyncio.wait_for(
+                        asyncio.gather(*(asyncio.shield(task) for task in tasks)),
+                        timeout=max(deadline - time.monotonic(), 0)
+                    )
+            except asyncio.TimeoutError:
+                complete = False
+        
+        # Expired but servable rates are returned as they are and refreshed in the
+        # background; the shared tasks stay registered until they finish
+        stale = merge_ranges([
+            gap for pair in pairs for gap in self.cache.stale_ranges(pair, start, end)
+        ])
+        for stale_start, stale_end in stale:
+            self.single_flight.run(
+                (ANCHOR_CURRENCY, "*"), stale_start, stale_end,
+                lambda first, last: self._fetch_gap(first, last, legs, fallback=False)
+            )
+        return complete
+    
+    async def prefetch(
+        self,
+        start_date: str,
+        end_date: str,
+        from_currency: str,
+        to_currencies: List[str]
+    ) -> bool:
+        """
+        Fill the cache for a range from upstream, without a deadline or local fallback
+        
+        Used by the startup warm-up: fetches keep the service's own timeout and
+        retries, and chunks upstream could not serve are left uncached rather
+        than filled with local data.
+        
+        Returns:
+            True when every missing day was fetched from upstream (or the range
+            was already cached)
         """
-        # Check cache first
-        cache_key = f"{start_date}_{end_date}_{from_currency}_{to_currency}"
-        if cache_key in self.cache:
-            cached_data, timestamp = self.cache[cache_key]
-            if time.time() - timestamp < self.cache_ttl:
-                return cached_data
+        legs = sorted({
+            currency for currency in [from_currency, *to_currencies]
+            if currency != ANCHOR_CURRENCY
+        })
+        tasks = await self._start_fetches(
+            date.fromisoformat(start_date), date.fromisoformat(end_date), legs, fallback=False
+        )
+        results = await asyncio.gather(*(asyncio.shield(task) for task in tasks), return_exceptions=True)
+        return all(result is True for result in results)
+    
+    async def _start_fetches(
+        self,
+        start: date,
+        end: date,
+        legs: List[str],
+        fallback: bool = True,
+        count_lookup: bool = False
+    ) -> List[asyncio.Task]:
+        """
+        Load stored final rates, then start (or join) upstream fetches for what is still missing
         
-        # Try Franksher API first
+        One upstream call fills every leg, so the union of the gaps is fetched;
+        concurrent callers share fetches that are already in flight. With
+        count_lookup, the request is recorded as one cache hit (every leg
+        cached) or miss.
+        """
+        pairs = [(ANCHOR_CURRENCY, currency) for currency in legs]
+        with timing.phase(timing.CACHE):
+            missing = {pair: self.cache.missing_ranges(pair, start, end) for pair in pairs}
+            if count_lookup:
+                self.cache.record_lookup(hit=not any(missing.values()))
+            
+            # Final rates already persisted locally never need to go upstream
+            if self.rate_store is not None and any(missing.values()):
+                for pair, pair_gaps in missing.items():
+                    for gap_start, gap_end in pair_gaps:
+                        await self._load_from_store(pair, gap_start, gap_end)
+                missing = {pair: self.cache.missing_ranges(pair, start, end) for pair in pairs}
+            
+            gaps = merge_ranges([gap for pair_gaps in missing.values() for gap in pair_gaps])
+        tasks = []
+        for gap_start, gap_end in gaps:
+            tasks.extend(self.single_flight.run(
+                (ANCHOR_CURRENCY, "*"), gap_start, gap_end,
+                lambda first, last: self._fetch_gap(first, last, legs, fallback=fallback)
+            ))
+        return tasks
+    
+    async def refresh_current_window(self) -> None:
+        """Refetch every cached range that is not final yet, for all cached legs"""
+        pairs = [pair for pair in self.cache.pairs() if pair[0] == ANCHOR_CURRENCY]
+        legs = sorted(quote for _, quote in pairs)
+        ranges = merge_ranges([
+            interval for pair in pairs for interval in self.cache.expiring_ranges(pair)
+        ])
+        tasks = []
+        for range_start, range_end in ranges:
+            tasks.extend(self.single_flight.run(
+                (ANCHOR_CURRENCY, "*"), range_start, range_end,
+                lambda first, last: self._fetch_gap(first, last, legs, fallback=False)
+            ))
+        if tasks:
+            await asyncio.gather(*(asyncio.shield(task) for task in tasks), return_exceptions=True)
+    
+    async def _refresh_at_publication(self) -> None:
+        """Background task refreshing the current window around each ECB publication"""
+        while True:
+            refresh_at = next_refresh_time(timedelta(seconds=config.PUBLICATION_REFRESH_OFFSET))
+            await asyncio.sleep(max((refresh_at - datetime.now(timezone.utc)).total_seconds(), 0))
+            try:
+                await self.refresh_current_window()
+            except Exception:
+                pass
+    
+    async def _load_from_store(self, pair: Tuple[str, str], gap_start: date, gap_end: date) -> None:
+        """Warm the cache with stored final rates for one pair"""
         try:
-            data = await self._fetch_from_api(start_date, end_date, from_currency, to_currency)
-            if data:
-                # Cache the result
-                self.cache[cache_key] = (data, time.time())
-                return data
+            covered, data = await asyncio.to_thread(self.rate_store.load, pair, gap_start, gap_end)
         except Exception:
-            pass
+            return
+        for start, end in covered:
+            self.cache.store(pair, start, end, data, permanent=True)
+    
+    async def _fetch_gap(
+        self,
+        gap_start: date,
+        gap_end: date,
+        legs: List[str],
+        fallback: bool = True
+    ) -> bool:
+        """
+        Fetch one sub-range upstream for all currencies, falling back to local data, and cache it
+        
+        Long ranges are split into calendar-year chunks fetched concurrently; each
+        chunk retries on its own, so a slow or failed transfer only costs that year.
+        Chunks are spliced into the cached series in date order as they arrive.
+        Background refreshes pass fallback=False so stale upstream rates are kept
+        rather than replaced with local data. Local data only fills days the
+        requested legs have no cached rates for.
+        
+        Returns:
+            True when every chunk was fetched from upstream
+        """
+        chunks = _split_by_year(gap_start, gap_end)
+        results = await asyncio.gather(
+            *(self._fetch_chunk(chunk_start, chunk_end, legs) for chunk_start, chunk_end in chunks),
+            return_exceptions=True
+        )
+        
+        fetched_all = all(fetched is True for fetched in results)
+        if not fallback or fetched_all:
+            return fetched_all
         
-        # Fallback to local data
-        data = await self._load_local_data(start_date, end_date)
-        if data:
-            # Cache the fallback result too
-            self.cache[cache_key] = (data, time.time())
-        return data
+        # Fallback to local data for chunks the API could not serve
+        for (chunk_start, chunk_end), fetched in zip(chunks, results):
+            if fetched is True:
+                continue
+            metrics.FALLBACK_ACTIVATIONS.labels("upstream_failure").inc()
+            for currency in legs:
+                pair = (ANCHOR_CURRENCY, currency)
+                # Only fill days this leg lacks, so cached upstream rates are never replaced
+                for missing_start, missing_end in self.cache.missing_ranges(pair, chunk_start, chunk_end):
+                    data = await self._load_local_data(
+                        missing_start.isoformat(), missing_end.isoformat(), pair
+                    )
+                    if data:
+                        # Cache the fallback result too
+                        self.cache.store(pair, missing_start, missing_end, data)
+        return False
+    
+    async def _fetch_chunk(
+        self,
+        chunk_start: date,
+        chunk_end: date,
+        legs: List[str]
+    ) -> bool:
+        """Fetch and cache one chunk from the API, returning whether it succeeded"""
+        async with self.chunk_semaphore:
+            data = await self._fetch_from_api(
+                chunk_start.isoformat(), chunk_end.isoformat(), ANCHOR_CURRENCY
+            )
+        if data is None:
+            return False
+        # Requested legs missing from the response are cached as empty
+        for currency in legs:
+            data.setdefault(currency, FXSeries())
+        await self._store_fetched(chunk_start, chunk_end, data)
+        return True
+    
+    async def _store_fetched(self, gap_start: date, gap_end: date, data: Dict[str, FXSeries]) -> None:
+        """
+        Cache upstream EUR legs; days before the latest publication are final and
+        are kept permanently (and persisted), only the current window gets a TTL
+        """
+        horizon = latest_publication_date()
+        pairs = {(ANCHOR_CURRENCY, currency): series for currency, series in data.items()}
+        if gap_start < horizon:
+            final_end = min(gap_end, horizon - timedelta(days=1))
+            for pair, series in pairs.items():
+                self.cache.store(pair, gap_start, final_end, series, permanent=True)
+            if self.rate_store is not None:
+                try:
+                    await asyncio.to_thread(self._save_final, pairs, gap_start, final_end)
+                except Exception:
+                    pass
+        if gap_end >= horizon:
+            for pair, series in pairs.items():
+                self.cache.store(pair, max(gap_start, horizon), gap_end, series)
+    
+    def _save_final(self, pairs: Dict[Tuple[str, str], FXSeries], start: date, end: date) -> None:
+        """Persist final rates for every pair (runs in a worker thread)"""
+        for pair, series in pairs.items():
+            self.rate_store.save(pair, start, end, series)
     
     async def _fetch_from_api(
         self, 
         start_date: str, 
         end_date: str, 
         from_currency: str, 
-        to_currency: str
-    ) -> Optional[List[Dict]]:
-        """Fetch data from Franksher API with retry logic"""
+        to_currency: Optional[str] = None
+    ) -> Optional[Dict[str, FXSeries]]:
+        """
+        Fetch data from Franksher API with retry logic
+        
+        Without to_currency the response carries every quote currency for the base.
+        Every attempt is reported to the circuit breaker; while it is open no
+        request is sent and None is returned at once, so callers fall back
+        without waiting for timeouts or backoff.
+        
+        Returns:
+            Series per quote currency, or None for an unexpected response format
+            or an open circuit
+        """
+        url = f"{self.base_url}/{start_date}..{end_date}?from={from_currency}"
+        if to_currency:
+            url += f"&to={to_currency}"
+        breaker = self.circuit_breaker
         
         for attempt in range(self.max_retries):
+            if not breaker.allow_request():
+                metrics.UPSTREAM_REQUESTS.labels("circuit_open").inc()
+                return None
             try:
-                async with httpx.AsyncClient(timeout=self.timeout) as client:
-                    url = f"{self.base_url}/{start_date}..{end_date}?from={from_currency}&to={to_currency}"
-                    response = await client.get(url)
-                    response.raise_for_status()
-                    
-                    data = response.json()
-                    
-                    if isinstance(data, list):
-                        # Normalize the data format to only include date and rate
-                        return [
-                            {"date": item.get("date"), "rate": item.get("rate")} 
-                            for item in data if "date" in item and "rate" in item
-                        ]
-                    elif isinstance(data, dict) and 'rates' in data:
-                        rates = data['rates']
-                        return [
-                            {"date": date, "rate": rate.get(to_currency, rate)} 
-                            for date, rate in rates.items()
-                        ]
-                    else:
-                        return None
+                response = await self._timed_get(url, self.timeout)
+                response.raise_for_status()
+                
+                rates = _parse_rates(response.json(), to_currency)
+                breaker.record_success()
+                return rates
                         
             except httpx.TimeoutException:
+                breaker.record_failure()
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)
+                    await self._backoff(attempt, "timeout")
             except httpx.HTTPStatusError as e:
-                if e.response.status_code >= 500 and attempt < self.max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)
+                if e.response.status_code < 500:
+                    # Client errors mean upstream is reachable
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                if attempt < self.max_retries - 1:
+                    await self._backoff(attempt, str(e.response.status_code))
                 else:
                     raise
             except Exception as e:
+                breaker.record_failure()
                 if attempt < self.max_retries - 1:
-                    await asyncio.sleep(2 ** attempt)
+                    await self._backoff(attempt, "error")
                 else:
                     raise
         
         return None
     
-    async def _load_local_data(self, start_date: str, end_date: str) -> List[Dict]:
-        """Load data from local JSON file"""
+    async def _backoff(self, attempt: int, reason: str) -> None:
+        """Sleep before the next attempt"""
+        if self.circuit_breaker.state != CLOSED:
+            # The next attempt is rejected or becomes the half-open probe; no point waiting
+            return
+        metrics.UPSTREAM_RETRIES.labels(reason).inc()
+        await asyncio.sleep(2 ** attempt)
+    
+    async def _timed_get(self, url: str, timeout: float) -> httpx.Response:
+        """Send one upstream attempt, recording its latency and outcome"""
+        started = time.monotonic()
+        status = "error"
         try:
-            if not os.path.exists(self.fallback_file):
-                return []
-            
-            with open(self.fallback_file, 'r') as f:
-                data = json.load(f)
-            
-            # Filter data by date range and normalize format
-            filtered_data = []
-            for item in data:
-                if start_date <= item.get('date', '') <= end_date:
-                    filtered_data.append({
-                        "date": item.get("date"),
-                        "rate": item.get("rate")
-                    })
-            
-            return filtered_data
-            
+            response = await self._get(url, timeout)
+            status = str(response.status_code)
+            return response
+        except httpx.TimeoutException:
+            status = "timeout"
+            raise
+        finally:
+            metrics.UPSTREAM_REQUESTS.labels(status).inc()
+            metrics.UPSTREAM_LATENCY.labels(status).observe(time.monotonic() - started)
+    
+    async def _get(self, url: str, timeout: float) -> httpx.Response:
+        """
+        Send one upstream GET, hedged with a second request when enabled
+        
+        The second request is only sent once the first has been running longer
+        than the configured percentile of recent upstream latencies; whichever
+        succeeds first wins and the other is cancelled.
+        """
+        started = time.monotonic()
+        hedge_after = self.upstream_latency.percentile(config.UPSTREAM_HEDGE_PERCENTILE) if self.hedge else None
+        if hedge_after is None or hedge_after >= timeout:
+            response = await self.client.get(url, timeout=timeout)
+            self.upstream_latency.record(time.monotonic() - started)
+            return response
+        
+        primary = asyncio.ensure_future(self.client.get(url, timeout=timeout))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=hedge_after)
+            if not done:
+                self.hedged += 1
+                pending.add(asyncio.ensure_future(self.client.get(url, timeout=timeout - hedge_after)))
+            while done or pending:
+                for task in done:
+                    if task.exception() is None:
+                        self.upstream_latency.record(time.monotonic() - started)
+                        return task.result()
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            # Every request failed; surface the first one's error
+            return primary.result()
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _load_local_data(
+        self,
+        start_date: str,
+        end_date: str,
+        pair: Tuple[str, str] = ("EUR", "USD")
+    ) -> FXSeries:
+        """Load data from the indexed local fallback file"""
+        try:
+            with timing.phase(timing.FALLBACK):
+                return self.fallback.lookup(start_date, end_date, pair)
         except Exception:
-            return []
+            return FXSeries()
+
+
+def _split_by_year(start: date, end: date) -> List[Tuple[date, date]]:
+    """Split a date range into consecutive chunks that each stay within one calendar year"""
+    chunks = []
+    cursor = start
+    while cursor <= end:
+        chunk_end = min(end, date(cursor.year, 12, 31))
+        chunks.append((cursor, chunk_end))
+        cursor = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def _parse_rates(data: object, to_currency: Optional[str]) -> Optional[Dict[str, FXSeries]]:
+    """Normalize an upstream response into one series per quote currency"""
+    points: Dict[str, List[Tuple[int, float]]] = {}
+    
+    if isinstance(data, list):
+        # Flat date/rate records, attributed to their 'to' field or the requested currency
+        for item in data:
+            currency = item.get("to", to_currency)
+            if currency and item.get("date") is not None and item.get("rate") is not None:
+                points.setdefault(currency, []).append(
+                    (date.fromisoformat(item["date"]).toordinal(), item["rate"])
+                )
+    elif isinstance(data, dict) and 'rates' in data:
+        for day, rates in data['rates'].items():
+            ordinal = date.fromisoformat(day).toordinal()
+            if isinstance(rates, dict):
+                for currency, rate in rates.items():
+                    points.setdefault(currency, []).append((ordinal, rate))
+            elif to_currency:
+                points.setdefault(to_currency, []).append((ordinal, rates))
+    else:
+        return None
+    
+    return {currency: FXSeries.from_points(items) for currency, items in points.items()}
+
+
+
+# Process-wide service instance, managed by the application lifespan
+_api_service: Optional[FranksherAPIService] = None
+
+
+def get_api_service() -> FranksherAPIService:
+    """FastAPI dependency returning the shared API service"""
+    global _api_service
+    if _api_service is None:
+        _api_service = FranksherAPIService()
+    return _api_service
+
+
+async def close_api_service() -> None:
+    """Close the shared API service on application shutdown"""
+    global _api_service
+    if _api_service is not None:
+        await _api_service.aclose()
+        _api_service = None
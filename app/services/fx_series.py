@@ -0,0 +1,185 @@
+"""
+Columnar FX rate series shared by the API service, caches and calculator
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+class FXSeries:
+    """
+    Immutable, date-sorted FX series stored as parallel arrays
+
+    Dates are kept as proleptic Gregorian ordinals in ``array('i')`` and rates
+    in ``array('d')``. Slicing by date range only moves offsets over the shared
+    arrays, so it never copies data; the arrays must not be mutated once a
+    series has been built over them. Dictionaries are only produced at the
+    serialization edge (``to_records``).
+    """
+
+    __slots__ = ("_dates", "_rates", "_start", "_stop")
+
+    def __init__(
+        self,
+        dates: Optional[array] = None,
+        rates: Optional[array] = None,
+        start: int = 0,
+        stop: Optional[int] = None
+    ):
+        self._dates = dates if dates is not None else array('i')
+        self._rates = rates if rates is not None else array('d')
+        self._start = start
+        self._stop = len(self._dates) if stop is None else stop
+
+    @classmethod
+    def from_points(cls, points: Iterable[Tuple[int, float]]) -> "FXSeries":
+        """Build a series from (date ordinal, rate) pairs in any order; the last duplicate wins"""
+        by_date = {ordinal: float(rate) for ordinal, rate in points}
+        ordinals = sorted(by_date)
+        return cls(array('i', ordinals), array('d', (by_date[o] for o in ordinals)))
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict]) -> "FXSeries":
+        """Build a series from dictionaries with 'date' (YYYY-MM-DD) and 'rate' keys"""
+        return cls.from_points(
+            (date.fromisoformat(item["date"]).toordinal(), item["rate"])
+            for item in records
+            if item.get("date") is not None and item.get("rate") is not None
+        )
+
+    @property
+    def dates(self) -> memoryview:
+        """Date ordinals as a zero-copy view"""
+        return memoryview(self._dates)[self._start:self._stop]
+
+    @property
+    def rates(self) -> memoryview:
+        """Rates as a zero-copy view"""
+        return memoryview(self._rates)[self._start:self._stop]
+
+    @property
+    def first_date(self) -> Optional[date]:
+        return date.fromordinal(self._dates[self._start]) if self else None
+
+    @property
+    def last_date(self) -> Optional[date]:
+        return date.fromordinal(self._dates[self._stop - 1]) if self else None
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the underlying arrays"""
+        return (
+            self._dates.buffer_info()[1] * self._dates.itemsize
+            + self._rates.buffer_info()[1] * self._rates.itemsize
+        )
+
+    def between(self, start: date, end: date) -> "FXSeries":
+        """Zero-copy slice of the days from start to end (inclusive)"""
+        return self._slice_ordinals(start.toordinal(), end.toordinal())
+
+    def splice(self, start: date, end: date, replacement: "FXSeries") -> "FXSeries":
+        """
+        Return a new series with the days from start to end replaced
+
+        Args:
+            start: First day of the replaced window
+            end: Last day of the replaced window
+            replacement: Points to insert; any outside the window are dropped
+
+        Returns:
+            New series over freshly allocated arrays
+        """
+        first = start.toordinal()
+        last = end.toordinal()
+        lo = bisect_left(self._dates, first, self._start, self._stop)
+        hi = bisect_right(self._dates, last, self._start, self._stop)
+        inserted = replacement._slice_ordinals(first, last)
+
+        dates = self._dates[self._start:lo]
+        dates.extend(inserted._dates[inserted._start:inserted._stop])
+        dates.extend(self._dates[hi:self._stop])
+        rates = self._rates[self._start:lo]
+        rates.extend(inserted._rates[inserted._start:inserted._stop])
+        rates.extend(self._rates[hi:self._stop])
+        return FXSeries(dates, rates)
+
+    @staticmethod
+    def ratio(
+        numerator: Optional["FXSeries"],
+        denominator: Optional["FXSeries"],
+        precision: int = 6
+    ) -> "FXSeries":
+        """
+        Divide two series on their common dates, e.g. a cross rate from two legs
+
+        Args:
+            numerator: Dividend series; None stands for a constant 1.0
+            denominator: Divisor series; None stands for a constant 1.0
+            precision: Decimal places the quotients are rounded to
+
+        Returns:
+            New series with one point per date present in both inputs
+            (dates with a zero divisor are skipped)
+        """
+        if numerator is None and denominator is None:
+            return FXSeries()
+        if denominator is None:
+            return numerator
+
+        dates = array('i')
+        rates = array('d')
+        if numerator is None:
+            for ordinal, rate in denominator:
+                if rate != 0:
+                    dates.append(ordinal)
+                    rates.append(round(1.0 / rate, precision))
+            return FXSeries(dates, rates)
+
+        # Merge join over the two date-sorted series
+        num_dates, num_rates = numerator.dates, numerator.rates
+        den_dates, den_rates = denominator.dates, denominator.rates
+        i = j = 0
+        while i < len(num_dates) and j < len(den_dates):
+            if num_dates[i] < den_dates[j]:
+                i += 1
+            elif num_dates[i] > den_dates[j]:
+                j += 1
+            else:
+                if den_rates[j] != 0:
+                    dates.append(num_dates[i])
+                    rates.append(round(num_rates[i] / den_rates[j], precision))
+                i += 1
+                j += 1
+        return FXSeries(dates, rates)
+
+    def iso_dates(self) -> List[str]:
+        """Dates as YYYY-MM-DD strings"""
+        return [date.fromordinal(ordinal).isoformat() for ordinal in self.dates]
+
+    def to_records(self) -> List[Dict]:
+        """Materialize the series as date/rate dictionaries"""
+        return [
+            {"date": iso_date, "rate": rate}
+            for iso_date, rate in zip(self.iso_dates(), self.rates)
+        ]
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __iter__(self) -> Iterator[Tuple[int, float]]:
+        return zip(self.dates, self.rates)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, FXSeries):
+            return NotImplemented
+        return self.dates == other.dates and self.rates == other.rates
+
+    def __repr__(self) -> str:
+        return f"FXSeries({len(self)} points, {self.first_date} .. {self.last_date})"
+
+    def _slice_ordinals(self, first: int, last: int) -> "FXSeries":
+        lo = bisect_left(self._dates, first, self._start, self._stop)
+        hi = bisect_right(self._dates, last, self._start, self._stop)
+        return FXSeries(self._dates, self._rates, lo, hi)
@@ -0,0 +1,145 @@
+"""
+Persistent on-disk store for final (historical) FX rates
+"""
+
+import os
+import sqlite3
+import threading
+from array import array
+from datetime import date
+from typing import List, Optional, Tuple
+
+from app.services.fx_series import FXSeries
+
+Pair = Tuple[str, str]
+DateRange = Tuple[date, date]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rates (
+    base TEXT NOT NULL,
+    quote TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    rate REAL NOT NULL,
+    PRIMARY KEY (base, quote, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS coverage (
+    base TEXT NOT NULL,
+    quote TEXT NOT NULL,
+    start_day INTEGER NOT NULL,
+    end_day INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS coverage_pair ON coverage (base, quote, start_day);
+"""
+
+
+class RateStore:
+    """
+    SQLite store for rates that can no longer change
+
+    Only ranges that lie entirely before the latest ECB publication are saved.
+    Alongside the rates the store keeps the fetched day intervals, so days
+    without a rate (weekends, holidays) are known to be complete as well.
+    Calls are blocking; run them with asyncio.to_thread from async code.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def load(self, pair: Pair, start: date, end: date) -> Tuple[List[DateRange], FXSeries]:
+        """
+        Load stored intervals and rates overlapping a range
+
+        Args:
+            pair: (base, quote) currency pair
+            start: First day of the range
+            end: Last day of the range
+
+        Returns:
+            Tuple of (covered intervals clipped to the range, stored series)
+        """
+        first = start.toordinal()
+        last = end.toordinal()
+        base, quote = pair
+        with self._lock:
+            conn = self._connection()
+            intervals = conn.execute(
+                "SELECT start_day, end_day FROM coverage "
+                "WHERE base = ? AND quote = ? AND end_day >= ? AND start_day <= ? "
+                "ORDER BY start_day",
+                (base, quote, first, last)
+            ).fetchall()
+            if not intervals:
+                return [], FXSeries()
+            rows = conn.execute(
+                "SELECT day, rate FROM rates "
+                "WHERE base = ? AND quote = ? AND day BETWEEN ? AND ? ORDER BY day",
+                (base, quote, first, last)
+            ).fetchall()
+
+        covered = [
+            (date.fromordinal(max(s, first)), date.fromordinal(min(e, last)))
+            for s, e in intervals
+        ]
+        series = FXSeries(array('i', (day for day, _ in rows)), array('d', (rate for _, rate in rows)))
+        return covered, series
+
+    def save(self, pair: Pair, start: date, end: date, series: FXSeries) -> None:
+        """
+        Save final rates for a fetched range and record the range as covered
+
+        Args:
+            pair: (base, quote) currency pair
+            start: First day that was fetched
+            end: Last day that was fetched
+            series: Rates; points outside the range are ignored
+        """
+        first = start.toordinal()
+        last = end.toordinal()
+        base, quote = pair
+        rows = [(base, quote, day, rate) for day, rate in series.between(start, end)]
+
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO rates VALUES (?, ?, ?, ?)", rows)
+                # Merge with overlapping or adjacent intervals to keep coverage compact
+                merge_start, merge_end = conn.execute(
+                    "SELECT MIN(start_day), MAX(end_day) FROM coverage "
+                    "WHERE base = ? AND quote = ? AND end_day >= ? AND start_day <= ?",
+                    (base, quote, first - 1, last + 1)
+                ).fetchone()
+                conn.execute(
+                    "DELETE FROM coverage WHERE base = ? AND quote = ? AND end_day >= ? AND start_day <= ?",
+                    (base, quote, first - 1, last + 1)
+                )
+                conn.execute(
+                    "INSERT INTO coverage VALUES (?, ?, ?, ?)",
+                    (
+                        base, quote,
+                        min(first, merge_start if merge_start is not None else first),
+                        max(last, merge_end if merge_end is not None else last),
+                    )
+                )
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Open the database on first use"""
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+            # WAL lets several workers read while one writes
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+        return self._conn
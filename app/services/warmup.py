@@ -0,0 +1,154 @@
+"""
+Startup cache warm-up
+"""
+
+import asyncio
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple
+
+from app.services.franksher_api import FranksherAPIService
+
+# Warm-up states reported by /ready
+PENDING = "pending"
+RUNNING = "running"
+COMPLETE = "complete"
+INCOMPLETE = "incomplete"  # budget ran out or some windows failed
+DISABLED = "disabled"
+
+def parse_pairs(value: str) -> Dict[str, List[str]]:
+    """
+    Parse comma-separated BASE/TARGET pairs into target currencies per base
+    
+    Args:
+        value: Pairs such as "EUR/USD,EUR/GBP,GBP/JPY"
+        
+    Returns:
+        Target currencies keyed by base currency, in the order given
+        
+    Raises:
+        ValueError: If a pair is not two 3-letter codes separated by "/"
+    """
+    targets_by_base: Dict[str, List[str]] = {}
+    for pair in value.split(","):
+        pair = pair.strip().upper()
+        if not pair:
+            continue
+        base, _, target = pair.partition("/")
+        if len(base) != 3 or len(target) != 3 or not (base + target).isalpha() or base == target:
+            raise ValueError(f"Invalid warm-up pair {pair!r}, expected e.g. EUR/USD")
+        targets = targets_by_base.setdefault(base, [])
+        if target not in targets:
+            targets.append(target)
+    return targets_by_base
+
+
+def lookback_windows(end: date, days: int) -> List[Tuple[date, date]]:
+    """
+    Split the lookback ending at the given day into calendar-year windows, newest first
+    
+    Upstream fetches are chunked by calendar year, so aligned windows need one
+    upstream call each.
+    """
+    windows = []
+    first = end - timedelta(days=days)
+    while end >= first:
+        start = max(first, date(end.year, 1, 1))
+        windows.append((start, end))
+        end = date(end.year - 1, 12, 31)
+    return windows
+
+
+class CacheWarmer:
+    """
+    Prefetch configured pairs into the service cache after startup
+    
+    Every (base currency, window) is one prefetch call, so all targets of a
+    base share one upstream fetch. At most `concurrency` windows are fetched at
+    once, the newest first since they are queried most. Started fetches keep the
+    service's own timeout and retries and never cache local fallback data; a
+    window only counts as done when upstream data was cached. Windows not
+    started within the budget are skipped; the warm-up then reports itself
+    incomplete but ready, since every request can still be served on demand.
+    """
+    
+    def __init__(
+        self,
+        service: FranksherAPIService,
+        pairs: Dict[str, List[str]],
+        lookback_days: int,
+        concurrency: int = 2,
+        budget_seconds: float = 60.0,
+        enabled: bool = True
+    ):
+        self.service = service
+        self.pairs = pairs
+        self.lookback_days = lookback_days
+        self.concurrency = max(1, concurrency)
+        self.budget_seconds = budget_seconds
+        self.state = PENDING if enabled and pairs else DISABLED
+        self.windows_total = 0
+        self.windows_done = 0
+        self.windows_failed = 0
+        self.windows_skipped = 0
+        self._started: Optional[float] = None
+        self._finished: Optional[float] = None
+    
+    @property
+    def ready(self) -> bool:
+        """Whether the warm-up has finished (or is disabled)"""
+        return self.state in (COMPLETE, INCOMPLETE, DISABLED)
+    
+    async def run(self) -> None:
+        """Prefetch every configured window, bounded by the concurrency limit; none is started after the budget"""
+        if self.state != PENDING:
+            return
+        self.state = RUNNING
+        self._started = time.monotonic()
+        deadline = self._started + self.budget_seconds
+        today = datetime.now(timezone.utc).date()
+        windows = lookback_windows(today, self.lookback_days)
+        jobs = [
+            (base, targets, start, end)
+            for start, end in windows
+            for base, targets in self.pairs.items()
+        ]
+        self.windows_total = len(jobs)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def warm(base: str, targets: List[str], start: date, end: date) -> None:
+            async with semaphore:
+                if time.monotonic() >= deadline:
+                    self.windows_skipped += 1
+                    return
+                try:
+                    cached = await self.service.prefetch(start.isoformat(), end.isoformat(), base, targets)
+                except Exception:
+                    cached = False
+                if cached:
+                    self.windows_done += 1
+                else:
+                    self.windows_failed += 1
+        
+        try:
+            await asyncio.gather(*(warm(*job) for job in jobs))
+        finally:
+            self._finished = time.monotonic()
+            incomplete = self.windows_failed or self.windows_skipped or self.windows_done < self.windows_total
+            self.state = INCOMPLETE if incomplete else COMPLETE
+    
+    def snapshot(self) -> Dict:
+        """Warm-up progress for the readiness endpoint"""
+        elapsed = None
+        if self._started is not None:
+            elapsed = round((self._finished or time.monotonic()) - self._started, 3)
+        return {
+            "state": self.state,
+            "pairs": [f"{base}/{target}" for base, targets in self.pairs.items() for target in targets],
+            "lookback_days": self.lookback_days,
+            "windows_total": self.windows_total,
+            "windows_done": self.windows_done,
+            "windows_failed": self.windows_failed,
+            "windows_skipped": self.windows_skipped,
+            "elapsed_seconds": elapsed
+        }
@@ -1,43 +1,178 @@
 """
-Simple caching utilities for FX data
+Bounded LRU cache with TTL support for FX data
 """
 
+import asyncio
+import sys
 import time
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterator, Optional
 
-class SimpleCache:
-    """Simple in-memory cache with TTL support"""
-    
-    def __init__(self, ttl_seconds: int = 300):  # 5 minutes default TTL
-        self.cache: Dict[str, Dict[str, Any]] = {}
+_DEFAULT_TTL = object()
+
+
+class _Entry:
+    """Compact cache entry"""
+
+    __slots__ = ("value", "expires_at", "size")
+
+    def __init__(self, value: Any, expires_at: Optional[float], size: int):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+
+
+class LRUCache:
+    """
+    In-memory LRU cache with TTL, entry-count and approximate byte limits
+
+    All operations are O(1) except sweep(), which scans for expired entries.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: Optional[int] = None,
+        ttl_seconds: Optional[float] = 300  # 5 minutes default TTL
+    ):
+        self._data: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
         self.ttl = ttl_seconds
-    
-    def get(self, key: str) -> Optional[Any]:
-        """Get value from cache if not expired"""
-        if key not in self.cache:
-            return None
-        
-        entry = self.cache[key]
-        if time.time() - entry['timestamp'] > self.ttl:
-            del self.cache[key]
-            return None
-        
-        return entry['value']
-    
-    def set(self, key: str, value: Any) -> None:
-        """Set value in cache with current timestamp"""
-        self.cache[key] = {
-            'value': value,
-            'timestamp': time.time()
-        }
-    
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get value from cache if present and not expired"""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Get value without updating recency or hit/miss statistics"""
+        entry = self._data.get(key)
+        if entry is None or (entry.expires_at is not None and entry.expires_at <= time.monotonic()):
+            return default
+        return entry.value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        ttl: Any = _DEFAULT_TTL,
+        size: Optional[int] = None
+    ) -> None:
+        """
+        Set value in cache, evicting least recently used entries over the limits
+
+        Args:
+            key: Cache key
+            value: Value to store
+            ttl: Seconds until expiry; None never expires (default: cache TTL)
+            size: Approximate size in bytes (default: sys.getsizeof(value))
+        """
+        if ttl is _DEFAULT_TTL:
+            ttl = self.ttl
+        if size is None:
+            size = sys.getsizeof(value)
+
+        if key in self._data:
+            self._remove(key)
+
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        self._data[key] = _Entry(value, expires_at, size)
+        self.bytes += size
+        self._evict()
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove a key, returning whether it was present"""
+        if key not in self._data:
+            return False
+        self._remove(key)
+        return True
+
+    def resize(self, key: Hashable, size: int) -> None:
+        """Update the recorded size of an entry whose value grew or shrank in place"""
+        entry = self._data.get(key)
+        if entry is None:
+            return
+        self.bytes += size - entry.size
+        entry.size = size
+        self._evict()
+
+    def sweep(self) -> int:
+        """Remove all expired entries, returning how many were removed"""
+        now = time.monotonic()
+        expired = [
+            key for key, entry in self._data.items()
+            if entry.expires_at is not None and entry.expires_at <= now
+        ]
+        for key in expired:
+            self._remove(key)
+        self.expirations += len(expired)
+        return len(expired)
+
     def clear(self) -> None:
         """Clear all cached data"""
-        self.cache.clear()
-    
+        self._data.clear()
+        self.bytes = 0
+
     def size(self) -> int:
         """Get number of cached entries"""
-        return len(self.cache)
+        return len(self._data)
+
+    def keys(self) -> Iterator[Hashable]:
+        """Iterate over cached keys from least to most recently used"""
+        return iter(list(self._data))
+
+    def stats(self) -> Dict[str, int]:
+        """Hit, miss, eviction and size statistics"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "entries": len(self._data),
+            "bytes": self.bytes,
+        }
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and (entry.expires_at is None or entry.expires_at > time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._data.pop(key)
+        self.bytes -= entry.size
+
+    def _evict(self) -> None:
+        """Evict least recently used entries until within the configured limits"""
+        while len(self._data) > self.max_entries or (
+            self.max_bytes is not None and self.bytes > self.max_bytes and len(self._data) > 1
+        ):
+            _, entry = self._data.popitem(last=False)
+            self.bytes -= entry.size
+            self.evictions += 1
+
 
-# Global cache instance
-fx_cache = SimpleCache(ttl_seconds=300)  # 5 minutes TTL
+async def sweep_periodically(cache: Any, interval_seconds: float) -> None:
+    """Background task removing expired entries from a cache every interval"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        cache.sweep()
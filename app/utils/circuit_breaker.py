@@ -0,0 +1,111 @@
+"""
+Circuit breaker guarding calls to the upstream API
+"""
+
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Union
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker with closed, open and half-open states
+
+    While closed, the outcomes of the most recent calls are kept in a sliding
+    window; once at least ``minimum_calls`` are recorded and the failure rate
+    reaches ``failure_threshold`` the circuit opens. An open circuit rejects
+    calls until ``probe_interval`` seconds have passed, then lets a single probe
+    through (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: float = 0.5,
+        minimum_calls: int = 5,
+        window_size: int = 20,
+        probe_interval: float = 30.0
+    ):
+        self.failure_threshold = failure_threshold
+        self.minimum_calls = minimum_calls
+        self.probe_interval = probe_interval
+        self._outcomes: Deque[bool] = deque(maxlen=window_size)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self.opened = 0  # times the circuit has opened
+        self.rejected = 0  # calls refused while open
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the probe interval has passed"""
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.probe_interval:
+            self._state = HALF_OPEN
+            self._probing = False
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Whether a call may go upstream now; in half-open state only one probe is let through"""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == HALF_OPEN and not self._probing:
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        """Record a successful call, closing the circuit after a successful probe"""
+        if self._state == HALF_OPEN:
+            self._close()
+            return
+        self._outcomes.append(True)
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the circuit over the failure threshold"""
+        if self._state == HALF_OPEN:
+            self._open()
+            return
+        if self._state == OPEN:
+            return
+        self._outcomes.append(False)
+        if len(self._outcomes) >= self.minimum_calls and self.failure_rate() >= self.failure_threshold:
+            self._open()
+
+    def failure_rate(self) -> float:
+        """Share of failures among the calls in the window"""
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def retry_after(self) -> Optional[float]:
+        """Seconds until the next probe while open, otherwise None"""
+        if self.state != OPEN:
+            return None
+        return max(self.probe_interval - (time.monotonic() - self._opened_at), 0.0)
+
+    def snapshot(self) -> Dict[str, Union[str, float, int, None]]:
+        """State and counters for health reporting"""
+        return {
+            "state": self.state,
+            "failure_rate": round(self.failure_rate(), 3),
+            "calls": len(self._outcomes),
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "retry_after": self.retry_after(),
+        }
+
+    def _open(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._probing = False
+        self.opened += 1
+
+    def _close(self) -> None:
+        self._state = CLOSED
+        self._probing = False
+        self._outcomes.clear()
@@ -0,0 +1,27 @@
+"""
+JSON encoding with an optional fast backend
+"""
+
+import json
+from typing import Any
+
+try:  # orjson is optional (uv sync --extra fast)
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is absent
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+
+
+def dumps(value: Any) -> bytes:
+    """
+    Encode a value as compact UTF-8 JSON
+
+    Uses orjson when installed; otherwise the standard library with the same
+    settings as Starlette's JSONResponse.
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(
+        value, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
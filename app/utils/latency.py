@@ -0,0 +1,42 @@
+"""
+Sliding window of recent latencies for percentile estimates
+"""
+
+from collections import deque
+from typing import Deque, Optional
+
+
+class LatencyWindow:
+    """
+    Keeps the most recent latency samples and answers percentile queries
+
+    Recording is O(1); percentile() sorts the window, which is small and only
+    consulted once per upstream request.
+    """
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self.min_samples = min_samples
+
+    def record(self, seconds: float) -> None:
+        """Add one latency sample in seconds"""
+        self._samples.append(seconds)
+
+    def percentile(self, quantile: float) -> Optional[float]:
+        """
+        Latency at a quantile of the window (nearest rank)
+
+        Args:
+            quantile: Quantile between 0 and 1, e.g. 0.95
+
+        Returns:
+            Latency in seconds, or None until min_samples have been recorded
+        """
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(int(quantile * len(ordered)), len(ordered) - 1)
+        return ordered[index]
+
+    def __len__(self) -> int:
+        return len(self._samples)
@@ -0,0 +1,242 @@
+"""
+Lightweight Prometheus-compatible metrics
+"""
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Tuple
+
+# Default latency buckets in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric(ABC):
+    """Base class for a metric family with optional labels"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, object] = {}
+
+    def labels(self, *values: str):
+        """Child metric for one combination of label values (created on first use)"""
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._new_child()
+        return child
+
+    @abstractmethod
+    def _new_child(self):
+        """Create the value holder for one label combination"""
+
+    @abstractmethod
+    def _samples(self) -> List[str]:
+        """Sample lines in the Prometheus text format"""
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """Increment the unlabelled counter"""
+        self.labels().inc(amount)
+
+    def _samples(self) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {child.value}"
+            for key, child in self._children.items()
+        ]
+
+
+class Gauge(Counter):
+    """Value that can go up and down"""
+
+    kind = "gauge"
+
+    def dec(self, amount: float = 1.0) -> None:
+        """Decrement the unlabelled gauge"""
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        """Set the unlabelled gauge"""
+        self.labels().set(value)
+
+
+class _HistogramValue:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        # Per-bucket counts are made cumulative only when rendering
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram(_Metric):
+    """Distribution of observations over fixed buckets"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        """Record an observation in the unlabelled histogram"""
+        self.labels().observe(value)
+
+    def _samples(self) -> List[str]:
+        lines = []
+        names = self.labelnames + ("le",)
+        for key, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(names, key + (le,))} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {child.sum}")
+            lines.append(f"{self.name}_count{labels} {child.count}")
+        return lines
+
+
+class Registry:
+    """Collection of metric families rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+    def _register(self, metric: _Metric):
+        # Registering the same name again returns the existing family
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+
+# Process-wide registry exposed on /metrics
+REGISTRY = Registry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    "fx_http_requests_total", "HTTP requests handled", ("route", "method", "status")
+)
+HTTP_LATENCY = REGISTRY.histogram(
+    "fx_http_request_duration_seconds", "HTTP request latency", ("route",)
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "fx_http_requests_in_flight", "HTTP requests currently being handled"
+)
+UPSTREAM_REQUESTS = REGISTRY.counter(
+    "fx_upstream_requests_total", "Upstream API attempts by outcome", ("status",)
+)
+UPSTREAM_LATENCY = REGISTRY.histogram(
+    "fx_upstream_request_duration_seconds", "Upstream API attempt latency", ("status",)
+)
+UPSTREAM_RETRIES = REGISTRY.counter(
+    "fx_upstream_retries_total", "Upstream API retries by the status that caused them", ("status",)
+)
+UPSTREAM_IN_FLIGHT = REGISTRY.gauge(
+    "fx_upstream_fetches_in_flight", "Shared upstream fetches currently running"
+)
+FALLBACK_ACTIVATIONS = REGISTRY.counter(
+    "fx_fallback_activations_total", "Ranges answered from local fallback data", ("reason",)
+)
+
+# Mirrored from the service's own counters when /metrics is scraped
+HEDGED_REQUESTS = REGISTRY.counter(
+    "fx_upstream_hedged_total", "Upstream requests hedged with a second request"
+)
+COALESCED_REQUESTS = REGISTRY.counter(
+    "fx_upstream_coalesced_total", "Callers that shared an in-flight upstream fetch"
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "fx_cache_lookups_total", "Range cache lookups by result", ("result",)
+)
+CACHE_EVICTIONS = REGISTRY.counter(
+    "fx_cache_evictions_total", "Currency pairs evicted from the range cache"
+)
+RESPONSE_CACHE_LOOKUPS = REGISTRY.counter(
+    "fx_response_cache_lookups_total", "Encoded response cache lookups by result", ("result",)
+)
+CACHE_SIZE = REGISTRY.gauge(
+    "fx_cache_size", "Range cache contents", ("unit",)
+)
+CIRCUIT_STATE = REGISTRY.gauge(
+    "fx_circuit_breaker_state", "Upstream circuit breaker state (1 for the current state)", ("state",)
+)
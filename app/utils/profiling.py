@@ -0,0 +1,59 @@
+"""
+Opt-in cProfile hook for slow requests
+"""
+
+import cProfile
+import os
+import pstats
+import re
+import time
+from typing import Optional
+
+from app import config
+
+# cProfile hooks the whole interpreter, so at most one request is profiled at a time
+_active = False
+
+
+def start_profile() -> Optional[cProfile.Profile]:
+    """Start profiling, or return None if another profile is already running"""
+    global _active
+    if _active:
+        return None
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError:  # another profiler or debugger holds the hook
+        return None
+    _active = True
+    return profiler
+
+
+def stop_profile(profiler: cProfile.Profile) -> None:
+    """Stop a profile started with start_profile"""
+    global _active
+    profiler.disable()
+    _active = False
+
+
+def dump_profile(profiler: cProfile.Profile, label: str) -> str:
+    """
+    Write a profile as a .prof file plus a text report of the top functions
+
+    Args:
+        profiler: Stopped profiler
+        label: Request description used in the file name (e.g. the route)
+
+    Returns:
+        Path of the .prof file
+    """
+    os.makedirs(config.PROFILE_DIR, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", label).strip("_") or "root"
+    base = os.path.join(
+        config.PROFILE_DIR, f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}-{slug}"
+    )
+    profiler.dump_stats(base + ".prof")
+    with open(base + ".txt", "w") as report:
+        stats = pstats.Stats(profiler, stream=report)
+        stats.sort_stats("cumulative").print_stats(config.PROFILE_TOP_FUNCTIONS)
+    return base + ".prof"
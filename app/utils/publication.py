@@ -0,0 +1,87 @@
+"""
+ECB reference rate publication calendar helpers
+"""
+
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional
+
+try:
+    from zoneinfo import ZoneInfo
+    ECB_TIMEZONE = ZoneInfo("Europe/Berlin")
+except Exception:  # tzdata not available, assume CET
+    ECB_TIMEZONE = timezone(timedelta(hours=1))
+
+# The ECB publishes reference rates around 16:00 CET on working days
+PUBLICATION_TIME = time(16, 0)
+
+
+def _previous_weekday(day: date) -> date:
+    """Return the day itself or the closest earlier Monday-Friday"""
+    while day.weekday() >= 5:
+        day -= timedelta(days=1)
+    return day
+
+
+def latest_publication_date(now: Optional[datetime] = None) -> date:
+    """
+    Date of the most recent ECB reference rate publication
+
+    Args:
+        now: Current time (default: now); naive values are treated as UTC
+
+    Returns:
+        The latest working day whose rates have been published
+    """
+    if now is None:
+        now = datetime.now(timezone.utc)
+    elif now.tzinfo is None:
+        now = now.replace(tzinfo=timezone.utc)
+    local = now.astimezone(ECB_TIMEZONE)
+
+    today = local.date()
+    if today.weekday() < 5 and local.time() >= PUBLICATION_TIME:
+        return today
+    return _previous_weekday(today - timedelta(days=1))
+
+
+def next_publication_time(now: Optional[datetime] = None) -> datetime:
+    """
+    Time of the next ECB reference rate publication
+
+    Args:
+        now: Current time (default: now); naive values are treated as UTC
+
+    Returns:
+        Timezone-aware datetime of the next working day publication after now
+    """
+    if now is None:
+        now = datetime.now(timezone.utc)
+    elif now.tzinfo is None:
+        now = now.replace(tzinfo=timezone.utc)
+    local = now.astimezone(ECB_TIMEZONE)
+
+    day = local.date()
+    if local.time() >= PUBLICATION_TIME:
+        day += timedelta(days=1)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return datetime.combine(day, PUBLICATION_TIME, tzinfo=ECB_TIMEZONE)
+
+
+def next_refresh_time(offset: timedelta, now: Optional[datetime] = None) -> datetime:
+    """
+    Next time that is a fixed offset from a working-day ECB publication
+
+    Args:
+        offset: Distance from the publication time (negative: before it)
+        now: Current time (default: now); naive values are treated as UTC
+
+    Returns:
+        Timezone-aware datetime after now; never on a weekend publication slot,
+        whatever the sign of the offset
+    """
+    if now is None:
+        now = datetime.now(timezone.utc)
+    elif now.tzinfo is None:
+        now = now.replace(tzinfo=timezone.utc)
+    return next_publication_time(now - offset) + offset
@@ -0,0 +1,287 @@
+"""
+Interval-aware per-day cache for FX rates
+"""
+
+import math
+import time
+from datetime import date
+from typing import Dict, List, Optional, Tuple, Union
+
+from app.services.fx_series import FXSeries
+from app.utils.cache import LRUCache
+
+Pair = Tuple[str, str]
+DateRange = Tuple[date, date]
+
+# Approximate memory cost of one coverage interval, used for the byte budget
+_BYTES_PER_INTERVAL = 120
+
+
+class _PairHistory:
+    """Cached rate series and covered day intervals for one currency pair"""
+
+    __slots__ = ("series", "coverage")
+
+    def __init__(self):
+        self.series = FXSeries()
+        # Sorted, non-overlapping [start_ordinal, end_ordinal, stored_at];
+        # stored_at is infinite for permanent (final) intervals
+        self.coverage: List[List[float]] = []
+
+    def nbytes(self) -> int:
+        return self.series.nbytes + len(self.coverage) * _BYTES_PER_INTERVAL
+
+
+class RangeCache:
+    """
+    Per-day rate cache that answers any date range from what it already holds
+
+    Rates are stored per (pair, day) in one FXSeries per pair. Alongside them the cache records which
+    day intervals have been fetched, so days without a rate (weekends, holidays)
+    are known to be covered and are not requested again.
+
+    Pair histories live in a bounded LRUCache, so the least recently used pairs
+    are evicted once the pair count or the approximate byte budget is exceeded.
+
+    Coverage older than the TTL is stale: it is still served for up to
+    ``max_stale_seconds`` more (see ``stale_ranges``) so callers can refresh it
+    in the background instead of waiting for upstream.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = 300,
+        max_pairs: int = 256,
+        max_bytes: Optional[int] = None,
+        max_stale_seconds: int = 0
+    ):
+        self.ttl = ttl_seconds
+        self.max_stale = max_stale_seconds
+        self._entries = LRUCache(max_entries=max_pairs, max_bytes=max_bytes, ttl_seconds=None)
+        self.hits = 0
+        self.misses = 0
+
+    def missing_ranges(self, pair: Pair, start: date, end: date) -> List[DateRange]:
+        """
+        Work out which sub-intervals of a range are not cached
+
+        Args:
+            pair: (base, quote) currency pair
+            start: First day of the range
+            end: Last day of the range
+
+        Returns:
+            Ordered list of (start, end) gaps that must be fetched
+        """
+        gaps = []
+        cursor = start.toordinal()
+        last = end.toordinal()
+        history = self._entries.get(pair)
+        intervals = self._fresh_coverage(pair, history) if history is not None else []
+        for first, final, _ in intervals:
+            if final < cursor:
+                continue
+            if first > last:
+                break
+            if first > cursor:
+                gaps.append((date.fromordinal(cursor), date.fromordinal(first - 1)))
+            cursor = max(cursor, int(final) + 1)
+            if cursor > last:
+                break
+        if cursor <= last:
+            gaps.append((date.fromordinal(cursor), end))
+        return gaps
+
+    def record_lookup(self, hit: bool) -> None:
+        """
+        Count one lookup in the hit/miss statistics
+
+        Callers check coverage several times per request (per leg, before and
+        after loading stored rates), so they record the outcome once themselves.
+        """
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def stale_ranges(self, pair: Pair, start: date, end: date) -> List[DateRange]:
+        """
+        Cached sub-intervals of a range that are past the TTL but still servable
+
+        Args:
+            pair: (base, quote) currency pair
+            start: First day of the range
+            end: Last day of the range
+
+        Returns:
+            Ordered list of (start, end) intervals that should be refreshed
+        """
+        history = self._entries.peek(pair)
+        if history is None:
+            return []
+        first = start.toordinal()
+        last = end.toordinal()
+        cutoff = time.time() - self.ttl
+        return [
+            (date.fromordinal(max(int(begin), first)), date.fromordinal(min(int(final), last)))
+            for begin, final, stored_at in self._fresh_coverage(pair, history)
+            if stored_at < cutoff and final >= first and begin <= last
+        ]
+
+    def expiring_ranges(self, pair: Pair) -> List[DateRange]:
+        """Covered intervals of a pair that are not permanent (the current window)"""
+        history = self._entries.peek(pair)
+        if history is None:
+            return []
+        return [
+            (date.fromordinal(int(begin)), date.fromordinal(int(final)))
+            for begin, final, stored_at in self._fresh_coverage(pair, history)
+            if stored_at != math.inf
+        ]
+
+    def is_permanent(self, pair: Pair, start: date, end: date) -> bool:
+        """Whether every day of a range is covered by permanent (final) intervals"""
+        history = self._entries.peek(pair)
+        if history is None:
+            return False
+        cursor = start.toordinal()
+        last = end.toordinal()
+        for begin, final, stored_at in history.coverage:
+            if final < cursor or stored_at != math.inf:
+                continue
+            if begin > cursor:
+                return False
+            cursor = int(final) + 1
+            if cursor > last:
+                return True
+        return False
+
+    def pairs(self) -> List[Pair]:
+        """Cached pairs from least to most recently used"""
+        return list(self._entries.keys())
+
+    def get_range(self, pair: Pair, start: date, end: date) -> FXSeries:
+        """Return cached rates in a range as a zero-copy slice of the pair's series"""
+        history = self._entries.get(pair)
+        if history is None:
+            return FXSeries()
+        return history.series.between(start, end)
+
+    def store(
+        self,
+        pair: Pair,
+        start: date,
+        end: date,
+        data: Union[FXSeries, List[Dict]],
+        permanent: bool = False
+    ) -> None:
+        """
+        Store rates fetched for a range and mark the whole range as covered
+
+        Args:
+            pair: (base, quote) currency pair
+            start: First day that was fetched
+            end: Last day that was fetched
+            data: Series (or date/rate dictionaries); points outside the range are ignored
+            permanent: Rates are final and the coverage never expires
+        """
+        first = start.toordinal()
+        last = end.toordinal()
+        history = self._entries.get(pair)
+        if history is None:
+            history = _PairHistory()
+            self._entries.set(pair, history, size=0)
+        if not isinstance(data, FXSeries):
+            data = FXSeries.from_records(data)
+
+        # Replace the whole window so days removed upstream do not linger
+        history.series = history.series.splice(start, end, data)
+
+        stored_at = math.inf if permanent else time.time()
+        self._add_coverage(history, first, last, stored_at)
+        self._entries.resize(pair, history.nbytes())
+
+    def sweep(self) -> int:
+        """Drop expired coverage and rates for every pair, returning how many days were removed"""
+        removed = 0
+        for pair in self._entries.keys():
+            history = self._entries.peek(pair)
+            before = len(history.series)
+            self._fresh_coverage(pair, history)
+            removed += before - len(history.series)
+            if not history.coverage:
+                self._entries.delete(pair)
+        return removed
+
+    def clear(self) -> None:
+        """Clear all cached data"""
+        self._entries.clear()
+
+    def size(self) -> int:
+        """Get number of cached (pair, day) rates"""
+        return sum(len(self._entries.peek(pair).series) for pair in self._entries.keys())
+
+    def stats(self) -> Dict[str, int]:
+        """Range hit/miss statistics plus eviction and size figures of the pair store"""
+        entries = self._entries.stats()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": entries["evictions"],
+            "pairs": entries["entries"],
+            "rates": self.size(),
+            "bytes": entries["bytes"],
+        }
+
+    def _fresh_coverage(self, pair: Pair, history: _PairHistory) -> List[List[float]]:
+        """Coverage intervals for a pair, pruning ones past the TTL plus the allowed staleness"""
+        intervals = history.coverage
+        if not intervals:
+            return []
+
+        cutoff = time.time() - self.ttl - self.max_stale
+        expired = [interval for interval in intervals if interval[2] < cutoff]
+        if expired:
+            intervals = [interval for interval in intervals if interval[2] >= cutoff]
+            history.coverage = intervals
+            for start, end, _ in expired:
+                history.series = history.series.splice(
+                    date.fromordinal(int(start)), date.fromordinal(int(end)), FXSeries()
+                )
+            self._entries.resize(pair, history.nbytes())
+        return intervals
+
+    def _add_coverage(self, history: _PairHistory, first: int, last: int, stored_at: float) -> None:
+        """Insert a covered interval, trimming any older intervals it overlaps"""
+        merged = []
+        for interval in history.coverage:
+            start, end, timestamp = interval
+            if end < first or start > last:
+                merged.append(interval)
+                continue
+            if start < first:
+                merged.append([start, first - 1, timestamp])
+            if end > last:
+                merged.append([last + 1, end, timestamp])
+        merged.append([first, last, stored_at])
+        merged.sort(key=lambda interval: interval[0])
+
+        # Coalesce neighbours stored at the same time
+        coalesced: List[List[float]] = []
+        for interval in merged:
+            if coalesced and coalesced[-1][1] + 1 >= interval[0] and coalesced[-1][2] == interval[2]:
+                coalesced[-1][1] = max(coalesced[-1][1], interval[1])
+            else:
+                coalesced.append(interval)
+        history.coverage = coalesced
+
+
+def merge_ranges(ranges: List[DateRange]) -> List[DateRange]:
+    """Merge overlapping or adjacent date ranges into their sorted union"""
+    merged: List[DateRange] = []
+    for start, end in sorted(ranges):
+        if merged and start.toordinal() <= merged[-1][1].toordinal() + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
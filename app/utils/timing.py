@@ -0,0 +1,65 @@
+"""
+Per-request phase timings reported in the Server-Timing header
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+
+# Phase names as they appear in the Server-Timing header
+VALIDATION = "validation"
+CACHE = "cache"
+UPSTREAM = "upstream"
+FALLBACK = "fallback"
+PROCESSING = "processing"
+SERIALIZATION = "serialization"
+
+_current: ContextVar[Optional["RequestTimings"]] = ContextVar("request_timings", default=None)
+
+
+class RequestTimings:
+    """Accumulated seconds per phase for one request"""
+
+    __slots__ = ("phases",)
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def header(self, total: Optional[float] = None) -> str:
+        """Server-Timing header value with durations in milliseconds"""
+        entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.phases.items()]
+        if total is not None:
+            entries.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(entries)
+
+
+def start_request() -> RequestTimings:
+    """Begin collecting phase timings for the current request context"""
+    timings = RequestTimings()
+    _current.set(timings)
+    return timings
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Time a block as one phase of the current request
+
+    Outside a request (background tasks, tests) this only costs a context
+    variable lookup. Tasks started during a request inherit its timings, so
+    phases that overlap (e.g. concurrent fallback loads) may sum to more than
+    the total.
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
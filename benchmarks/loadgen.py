@@ -0,0 +1,163 @@
+"""
+Open-loop load generator for /summary
+
+Sends requests at a fixed target rate (independent of response times, so a slow
+service builds up concurrency like real traffic does) and reports throughput,
+latency percentiles, status counts and, with --stub-url, how many upstream calls
+the stub server received.
+
+Usage:
+    python -m benchmarks.loadgen --url http://127.0.0.1:8000 --rps 100 --duration 30 \\
+        --stub-url http://127.0.0.1:9000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence
+
+import httpx
+
+
+def percentile(values: Sequence[float], quantile: float) -> Optional[float]:
+    """Nearest-rank percentile of the values (None when empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(quantile * len(ordered)), len(ordered) - 1)]
+
+
+def random_query(rng: random.Random, years: int, max_days: int, breakdown: str) -> str:
+    """A /summary query for a random range within the last few years"""
+    today = date.today()
+    start = today - timedelta(days=rng.randrange(1, years * 365))
+    end = min(start + timedelta(days=rng.randrange(0, max_days)), today)
+    return f"/summary?start={start.isoformat()}&end={end.isoformat()}&breakdown={breakdown}"
+
+
+async def _stub_requests(client: httpx.AsyncClient, stub_url: Optional[str]) -> Optional[int]:
+    if not stub_url:
+        return None
+    response = await client.get(f"{stub_url.rstrip('/')}/_stats")
+    return response.json()["requests"]
+
+
+async def run_load(
+    url: str,
+    rps: float,
+    duration: float,
+    concurrency: int = 256,
+    years: int = 5,
+    max_days: int = 365,
+    breakdown: str = "none",
+    stub_url: Optional[str] = None,
+    seed: int = 0
+) -> Dict:
+    """
+    Drive /summary at a target rate and summarize the outcome
+
+    Args:
+        url: Base URL of the service
+        rps: Target requests per second
+        duration: Seconds to send requests for
+        concurrency: Maximum requests in flight; requests beyond it are counted as dropped
+        years: Ranges start within this many years back
+        max_days: Maximum range length in days
+        breakdown: Breakdown mode requested
+        stub_url: Base URL of benchmarks.stub_server, to count upstream calls
+        seed: Random seed for the query mix
+
+    Returns:
+        Report with throughput, latency percentiles (ms) and status counts
+    """
+    rng = random.Random(seed)
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    dropped = 0
+    in_flight = 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60.0) as client:
+        upstream_before = await _stub_requests(client, stub_url)
+
+        async def send(query: str) -> None:
+            nonlocal in_flight
+            in_flight += 1
+            started = time.perf_counter()
+            try:
+                response = await client.get(query)
+                statuses[str(response.status_code)] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            finally:
+                latencies.append(time.perf_counter() - started)
+                in_flight -= 1
+
+        tasks = []
+        interval = 1.0 / rps
+        started = time.perf_counter()
+        total = int(rps * duration)
+        for sent in range(total):
+            # Schedule against the start time so slow sends do not lower the rate
+            delay = started + sent * interval - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if in_flight >= concurrency:
+                dropped += 1
+                continue
+            tasks.append(asyncio.create_task(send(random_query(rng, years, max_days, breakdown))))
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+        upstream_after = await _stub_requests(client, stub_url)
+
+    def ms(value: Optional[float]) -> Optional[float]:
+        return round(value * 1000, 2) if value is not None else None
+
+    return {
+        "target_rps": rps,
+        "duration": round(elapsed, 3),
+        "sent": len(tasks),
+        "dropped": dropped,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed > 0 else 0.0,
+        "statuses": dict(statuses),
+        "latency_ms": {
+            "p50": ms(percentile(latencies, 0.50)),
+            "p90": ms(percentile(latencies, 0.90)),
+            "p99": ms(percentile(latencies, 0.99)),
+            "max": ms(max(latencies) if latencies else None),
+        },
+        "upstream_calls": (
+            upstream_after - upstream_before if upstream_before is not None else None
+        ),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Service base URL")
+    parser.add_argument("--rps", type=float, default=50.0, help="Target requests per second")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to send requests for")
+    parser.add_argument("--concurrency", type=int, default=256, help="Maximum requests in flight")
+    parser.add_argument("--years", type=int, default=5, help="Ranges start within this many years back")
+    parser.add_argument("--max-days", type=int, default=365, help="Maximum range length in days")
+    parser.add_argument("--breakdown", default="none", choices=["none", "day", "week", "month", "quarter", "rolling"])
+    parser.add_argument("--stub-url", default=None, help="benchmarks.stub_server URL, to count upstream calls")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(run_load(
+        args.url, args.rps, args.duration, args.concurrency,
+        args.years, args.max_days, args.breakdown, args.stub_url, args.seed
+    ))
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,311 @@
+"""
+Benchmark runner for the calculator, caches, fallback loading and the /summary hot path
+
+Usage:
+    python -m benchmarks.run [--quick] [--output results.json]
+                             [--baseline benchmarks/baseline.json] [--tolerance 0.5]
+                             [--update-baseline] [--filter NAME]
+
+Results are written as JSON (seconds per call). With --baseline, each benchmark's
+best time is compared with the stored one and the exit status is 1 when any is
+slower than the tolerance allows.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from array import array
+from datetime import date, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from app.main import app
+from app.routes.summary import response_cache
+from app.services.calculations import FXCalculator, np
+from app.services.fallback_data import FallbackIndex
+from app.services.franksher_api import FranksherAPIService, get_api_service
+from app.services.fx_series import FXSeries
+from app.utils.cache import LRUCache
+from app.utils.range_cache import RangeCache
+from benchmarks.stub_upstream import stub_client, synthetic_rate
+
+SIZES = (10, 100, 1_000, 10_000, 100_000, 1_000_000)
+QUICK_SIZES = (10, 100, 1_000, 10_000)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+# Each sample should run for at least this long to keep timer noise low
+MIN_SAMPLE_SECONDS = 0.05
+
+Result = Dict[str, float]
+
+
+def measure(func: Callable[[], object], repeat: int = 5) -> Result:
+    """Time a callable, returning the best and median seconds per call"""
+    started = time.perf_counter()
+    func()
+    once = time.perf_counter() - started
+    number = max(1, int(MIN_SAMPLE_SECONDS / once)) if once > 0 else 1000
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - started) / number)
+    return {"min": min(samples), "median": statistics.median(samples), "number": number, "repeat": repeat}
+
+
+async def measure_async(func: Callable[[], Awaitable[object]], repeat: int = 5) -> Result:
+    """Time a coroutine function, returning the best and median seconds per call"""
+    started = time.perf_counter()
+    await func()
+    once = time.perf_counter() - started
+    number = max(1, int(MIN_SAMPLE_SECONDS / once)) if once > 0 else 1000
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            await func()
+        samples.append((time.perf_counter() - started) / number)
+    return {"min": min(samples), "median": statistics.median(samples), "number": number, "repeat": repeat}
+
+
+def synthetic_series(points: int) -> FXSeries:
+    """Series of consecutive days with deterministic rates"""
+    first = date(2000, 1, 3).toordinal()
+    ordinals = array('i', range(first, first + points))
+    rates = array('d', (synthetic_rate("USD", date.fromordinal(o)) for o in ordinals))
+    return FXSeries(ordinals, rates)
+
+
+def bench_calculator(sizes: Tuple[int, ...]) -> Dict[str, Result]:
+    """FXCalculator.process_fx_data in each breakdown mode"""
+    results = {}
+    for points in sizes:
+        series = synthetic_series(points)
+        repeat = 3 if points >= 100_000 else 5
+        for breakdown in ("none", "day", "month", "rolling"):
+            results[f"calculator.{breakdown}.{points}"] = measure(
+                lambda: FXCalculator.process_fx_data(series, breakdown), repeat
+            )
+    return results
+
+
+def bench_caches() -> Dict[str, Result]:
+    """LRU cache get/set under churn and range cache store/lookup"""
+    results = {}
+    rng = random.Random(42)
+
+    # Working set twice the capacity, so about half of the lookups miss and evict
+    lru = LRUCache(max_entries=1_000, ttl_seconds=300)
+    keys = [("EUR", f"C{i}") for i in range(2_000)]
+    operations = [rng.choice(keys) for _ in range(10_000)]
+
+    def churn():
+        for key in operations:
+            if lru.get(key) is None:
+                lru.set(key, key, size=64)
+
+    results["lru_cache.churn.10000_ops"] = measure(churn)
+
+    history = synthetic_series(5 * 365)
+    first = history.first_date
+    windows = [
+        (first + timedelta(days=offset), first + timedelta(days=offset + length))
+        for offset, length in ((rng.randrange(0, 1_500), rng.randrange(1, 300)) for _ in range(1_000))
+    ]
+
+    def store_monthly():
+        cache = RangeCache(ttl_seconds=300)
+        for month in range(0, 5 * 365, 30):
+            start = first + timedelta(days=month)
+            cache.store(("EUR", "USD"), start, start + timedelta(days=29), history)
+
+    cache = RangeCache(ttl_seconds=300)
+    cache.store(("EUR", "USD"), first, history.last_date, history, permanent=True)
+
+    def lookups():
+        for start, end in windows:
+            if not cache.missing_ranges(("EUR", "USD"), start, end):
+                cache.get_range(("EUR", "USD"), start, end)
+
+    results["range_cache.store.61_months"] = measure(store_monthly)
+    results["range_cache.lookup.1000_ranges"] = measure(lookups)
+    return results
+
+
+def bench_fallback() -> Dict[str, Result]:
+    """Parsing and querying the local fallback file"""
+    results = {}
+    series = synthetic_series(10 * 365)
+    records = [
+        {"date": iso_date, "rate": rate, "from": "EUR", "to": "USD"}
+        for iso_date, rate in zip(series.iso_dates(), series.rates)
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "fallback.json")
+        with open(path, "w") as handle:
+            json.dump(records, handle)
+
+        results["fallback.load.3650_records"] = measure(
+            lambda: FallbackIndex(path).lookup("2005-01-01", "2005-12-31")
+        )
+        index = FallbackIndex(path)
+        results["fallback.lookup.1_year"] = measure(lambda: index.lookup("2005-01-01", "2005-12-31"))
+    return results
+
+
+async def _bench_summary() -> Dict[str, Result]:
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        services: List[FranksherAPIService] = []
+
+        def fresh_service() -> FranksherAPIService:
+            service = FranksherAPIService(client=stub_client(), store_path=None)
+            services.append(service)
+            return service
+
+        async def cold():
+            # A new service per call and no encoded response: every request goes through the stub upstream
+            response_cache.clear()
+            service = fresh_service()
+            app.dependency_overrides[get_api_service] = lambda: service
+            response = await client.get("/summary?start=2024-01-01&end=2024-12-31&breakdown=none")
+            assert response.status_code == 200, response.text
+
+        warm_service = fresh_service()
+
+        async def warm(breakdown: str, reuse_response: bool = False):
+            # Rates come from the warm range cache; the body is rebuilt unless reuse_response is set
+            if not reuse_response:
+                response_cache.clear()
+            app.dependency_overrides[get_api_service] = lambda: warm_service
+            response = await client.get(f"/summary?start=2024-01-01&end=2024-12-31&breakdown={breakdown}")
+            assert response.status_code == 200, response.text
+
+        try:
+            results["summary.cold.1_year"] = await measure_async(cold)
+            for service in services[1:]:
+                await service.aclose()
+            del services[1:]
+            results["summary.warm.none.1_year"] = await measure_async(lambda: warm("none"))
+            results["summary.warm.day.1_year"] = await measure_async(lambda: warm("day"))
+            results["summary.response_cache.none.1_year"] = await measure_async(
+                lambda: warm("none", reuse_response=True)
+            )
+        finally:
+            app.dependency_overrides.pop(get_api_service, None)
+            response_cache.clear()
+            for service in services:
+                await service.aclose()
+    return results
+
+
+def bench_summary() -> Dict[str, Result]:
+    """End-to-end /summary through the ASGI app against the stub upstream"""
+    return asyncio.run(_bench_summary())
+
+
+def run(quick: bool = False, name_filter: Optional[str] = None) -> Dict[str, Result]:
+    """Run every benchmark group, returning results keyed by benchmark name"""
+    groups = [
+        lambda: bench_calculator(QUICK_SIZES if quick else SIZES),
+        bench_caches,
+        bench_fallback,
+        bench_summary,
+    ]
+    results = {}
+    for group in groups:
+        results.update(group())
+    if name_filter:
+        results = {name: result for name, result in results.items() if name_filter in name}
+    return results
+
+
+def compare(
+    results: Dict[str, Result],
+    baseline: Dict[str, Result],
+    tolerance: float
+) -> List[Tuple[str, float]]:
+    """
+    Find benchmarks slower than their baseline
+
+    Args:
+        results: Current results
+        baseline: Stored results
+        tolerance: Allowed slowdown as a fraction, e.g. 0.25 for 25%
+
+    Returns:
+        (name, slowdown ratio) for each regression; benchmarks missing from
+        either side are ignored
+    """
+    regressions = []
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None or reference["min"] <= 0:
+            continue
+        ratio = result["min"] / reference["min"]
+        if ratio > 1 + tolerance:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def _metadata() -> Dict[str, object]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": np.__version__ if np is not None else None,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="Calculator series only up to 10^4 points")
+    parser.add_argument("--output", help="Write results JSON to this file (default: stdout)")
+    parser.add_argument("--baseline", default=None, help="Compare against this results file")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="Allowed slowdown before failing (default 0.5)")
+    parser.add_argument("--update-baseline", action="store_true", help=f"Store the results as the baseline ({DEFAULT_BASELINE})")
+    parser.add_argument("--filter", dest="name_filter", help="Only keep benchmarks whose name contains this text")
+    args = parser.parse_args(argv)
+
+    results = run(quick=args.quick, name_filter=args.name_filter)
+    report = {"meta": _metadata(), "results": results}
+    encoded = json.dumps(report, indent=2, sort_keys=True)
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            handle.write(encoded + "\n")
+    else:
+        print(encoded)
+
+    for name, result in sorted(results.items()):
+        print(f"{name:40} {result['min'] * 1e6:14.1f} us", file=sys.stderr)
+
+    if args.update_baseline:
+        with open(args.baseline or DEFAULT_BASELINE, "w") as handle:
+            handle.write(encoded + "\n")
+        return 0
+
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        for name, ratio in regressions:
+            print(f"REGRESSION {name}: {ratio:.2f}x baseline", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
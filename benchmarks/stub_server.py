@@ -0,0 +1,134 @@
+"""
+Local Frankfurter stand-in with fault injection
+
+Serves /v1/{start}..{end} time series and /v1/latest with synthetic rates. Latency,
+errors and slowly streamed bodies can be injected to exercise retries, timeouts,
+the circuit breaker and connection reuse without touching the real API.
+
+Usage:
+    python -m benchmarks.stub_server --port 9000 --latency-ms 40 --error-rate 0.05
+    FX_UPSTREAM_BASE_URL=http://127.0.0.1:9000/v1 uvicorn app.main:app
+
+GET /_stats returns call counters and POST /_faults changes the fault settings
+of a running server (same fields as FaultConfig).
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from dataclasses import asdict, dataclass, fields
+from datetime import date, datetime, timezone
+from typing import Dict, Optional
+
+from fastapi import Body, FastAPI
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from app.utils.publication import latest_publication_date
+from benchmarks.stub_upstream import frankfurter_payload
+
+# Chunks a slow body is split into
+SLOW_BODY_CHUNKS = 10
+
+
+@dataclass
+class FaultConfig:
+    """Injected faults; rates are probabilities per request"""
+    latency_ms: float = 0.0  # added before responding
+    jitter_ms: float = 0.0  # uniform extra latency up to this value
+    error_rate: float = 0.0  # respond 503
+    slow_body_rate: float = 0.0  # stream the body in chunks spread over slow_body_ms
+    slow_body_ms: float = 2000.0
+    seed: Optional[int] = None
+
+
+def create_app(faults: Optional[FaultConfig] = None) -> FastAPI:
+    """Build the stub application with its own fault settings and counters"""
+    faults = faults or FaultConfig()
+    rng = random.Random(faults.seed)
+    stats: Dict[str, int] = {"requests": 0, "errors": 0, "slow_bodies": 0, "in_flight": 0, "max_in_flight": 0}
+    app = FastAPI(title="Frankfurter stub")
+
+    async def respond(payload: Dict) -> Response:
+        stats["requests"] += 1
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        try:
+            delay = faults.latency_ms + rng.uniform(0, faults.jitter_ms)
+            if delay > 0:
+                await asyncio.sleep(delay / 1000)
+            if rng.random() < faults.error_rate:
+                stats["errors"] += 1
+                return JSONResponse({"message": "injected error"}, status_code=503)
+            body = json.dumps(payload).encode()
+            if rng.random() < faults.slow_body_rate:
+                stats["slow_bodies"] += 1
+                return StreamingResponse(_slow_body(body, faults.slow_body_ms / 1000), media_type="application/json")
+            return Response(body, media_type="application/json")
+        finally:
+            stats["in_flight"] -= 1
+
+    @app.get("/v1/latest")
+    async def latest(to: Optional[str] = None):
+        day = latest_publication_date(datetime.now(timezone.utc))
+        payload = frankfurter_payload(day, day, to.split(",") if to else None)
+        return await respond({"amount": 1.0, "base": "EUR", "date": day.isoformat(), "rates": payload["rates"][day.isoformat()]})
+
+    @app.get("/v1/{span}")
+    async def time_series(span: str, to: Optional[str] = None):
+        try:
+            start, end = (date.fromisoformat(part) for part in span.split(".."))
+        except ValueError:
+            return JSONResponse({"message": "not found"}, status_code=404)
+        return await respond(frankfurter_payload(start, end, to.split(",") if to else None))
+
+    @app.get("/_stats")
+    async def get_stats():
+        return stats
+
+    @app.post("/_faults")
+    async def set_faults(changes: Dict = Body(...)):
+        names = {field.name for field in fields(FaultConfig)}
+        for name, value in changes.items():
+            if name in names:
+                setattr(faults, name, value)
+        return asdict(faults)
+
+    return app
+
+
+async def _slow_body(body: bytes, seconds: float):
+    """Yield the body in chunks spread evenly over the given time"""
+    size = max(1, len(body) // SLOW_BODY_CHUNKS + 1)
+    for offset in range(0, len(body), size):
+        await asyncio.sleep(seconds / SLOW_BODY_CHUNKS)
+        yield body[offset:offset + size]
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--slow-body-rate", type=float, default=0.0)
+    parser.add_argument("--slow-body-ms", type=float, default=2000.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    faults = FaultConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        slow_body_rate=args.slow_body_rate,
+        slow_body_ms=args.slow_body_ms,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(faults), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
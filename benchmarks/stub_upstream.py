@@ -0,0 +1,45 @@
+"""
+In-process stand-in for the Frankfurter API used by the benchmarks
+"""
+
+import math
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+
+import httpx
+
+CURRENCIES = ("USD", "GBP", "JPY", "CHF")
+
+
+def synthetic_rate(currency: str, day: date) -> float:
+    """Deterministic, smoothly varying rate for a currency on a day"""
+    base = {"USD": 1.1, "GBP": 0.85, "JPY": 160.0, "CHF": 0.95}.get(currency, 1.0)
+    return round(base * (1 + 0.05 * math.sin(day.toordinal() / 30.0)), 6)
+
+
+def frankfurter_payload(start: date, end: date, currencies: Optional[List[str]] = None) -> Dict:
+    """Frankfurter time series payload with one rate per working day"""
+    currencies = currencies or list(CURRENCIES)
+    rates = {}
+    day = start
+    while day <= end:
+        if day.weekday() < 5:
+            rates[day.isoformat()] = {currency: synthetic_rate(currency, day) for currency in currencies}
+        day += timedelta(days=1)
+    return {"amount": 1.0, "base": "EUR", "start_date": start.isoformat(), "end_date": end.isoformat(), "rates": rates}
+
+
+def handle(request: httpx.Request) -> httpx.Response:
+    """Answer /{start}..{end} time series requests like Frankfurter"""
+    span = request.url.path.rsplit("/", 1)[-1]
+    try:
+        start, end = (date.fromisoformat(part) for part in span.split(".."))
+    except ValueError:
+        return httpx.Response(404, json={"message": "not found"})
+    to = request.url.params.get("to")
+    return httpx.Response(200, json=frankfurter_payload(start, end, to.split(",") if to else None))
+
+
+def stub_client() -> httpx.AsyncClient:
+    """HTTP client whose requests are served by the stub without touching the network"""
+    return httpx.AsyncClient(transport=httpx.MockTransport(handle))
@@ -0,0 +1,64 @@
+"""
+Unit tests for the benchmark runner, stub upstream server and load generator helpers
+"""
+
+import pytest
+from datetime import date
+from fastapi.testclient import TestClient
+from benchmarks.loadgen import percentile
+from benchmarks.run import compare, measure
+from benchmarks.stub_server import FaultConfig, create_app
+from benchmarks.stub_upstream import frankfurter_payload
+
+def test_compare_flags_only_slowdowns_beyond_tolerance():
+    """Test regressions are reported relative to the baseline's best time"""
+    baseline = {"fast": {"min": 1.0}, "slow": {"min": 1.0}, "gone": {"min": 1.0}}
+    results = {"fast": {"min": 1.2}, "slow": {"min": 1.6}, "new": {"min": 5.0}}
+    
+    assert compare(results, baseline, tolerance=0.5) == [("slow", pytest.approx(1.6))]
+
+def test_measure_reports_per_call_seconds():
+    """Test measure returns best and median seconds per call"""
+    result = measure(lambda: sum(range(100)), repeat=3)
+    
+    assert 0 < result["min"] <= result["median"]
+    assert result["repeat"] == 3
+
+def test_stub_payload_has_working_days_only():
+    """Test the stub upstream skips weekends like Frankfurter"""
+    payload = frankfurter_payload(date(2025, 7, 4), date(2025, 7, 7), ["USD"])
+    
+    assert list(payload["rates"]) == ["2025-07-04", "2025-07-07"]
+    assert set(payload["rates"]["2025-07-04"]) == {"USD"}
+
+def test_stub_server_time_series_and_stats():
+    """Test the stub server answers Frankfurter time series requests and counts them"""
+    stub = TestClient(create_app())
+    
+    response = stub.get("/v1/2025-07-01..2025-07-03?to=USD")
+    
+    assert response.status_code == 200
+    assert list(response.json()["rates"]) == ["2025-07-01", "2025-07-02", "2025-07-03"]
+    assert stub.get("/_stats").json()["requests"] == 1
+
+def test_stub_server_fault_injection():
+    """Test injected errors and runtime fault changes"""
+    stub = TestClient(create_app(FaultConfig(error_rate=1.0)))
+    
+    assert stub.get("/v1/2025-07-01..2025-07-03").status_code == 503
+    stub.post("/_faults", json={"error_rate": 0.0, "slow_body_rate": 1.0, "slow_body_ms": 10})
+    response = stub.get("/v1/2025-07-01..2025-07-03")
+    
+    assert response.status_code == 200
+    assert "2025-07-02" in response.json()["rates"]
+    assert stub.get("/_stats").json() == {
+        "requests": 2, "errors": 1, "slow_bodies": 1, "in_flight": 0, "max_in_flight": 1
+    }
+
+def test_percentile_nearest_rank():
+    """Test load generator percentiles use the nearest rank"""
+    values = [float(value) for value in range(1, 101)]
+    
+    assert percentile(values, 0.5) == 51.0
+    assert percentile(values, 0.99) == 100.0
+    assert percentile([], 0.5) is None
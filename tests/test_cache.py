@@ -0,0 +1,80 @@
+"""
+Unit tests for the LRU cache
+"""
+
+from unittest.mock import patch
+from app.utils.cache import LRUCache
+
+def test_get_and_set():
+    """Test basic set/get with hit and miss statistics"""
+    cache = LRUCache(max_entries=10)
+    cache.set("a", 1)
+    
+    assert cache.get("a") == 1
+    assert cache.get("missing") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_evicts_least_recently_used():
+    """Test the least recently used entry is evicted over the entry limit"""
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+    assert cache.stats()["evictions"] == 1
+
+def test_evicts_over_byte_budget():
+    """Test entries are evicted once the approximate byte budget is exceeded"""
+    cache = LRUCache(max_entries=100, max_bytes=250)
+    for key in range(5):
+        cache.set(key, "x", size=100)
+    
+    assert cache.size() == 2
+    assert cache.bytes == 200
+    assert cache.stats()["evictions"] == 3
+
+def test_resize_updates_byte_accounting():
+    """Test resizing an entry updates the byte total and can trigger eviction"""
+    cache = LRUCache(max_entries=10, max_bytes=300)
+    cache.set("a", [], size=100)
+    cache.set("b", [], size=100)
+    cache.resize("b", 250)
+    
+    assert "a" not in cache
+    assert cache.bytes == 250
+
+def test_entry_expires_after_ttl():
+    """Test expired entries are not returned"""
+    cache = LRUCache(ttl_seconds=10)
+    with patch('app.utils.cache.time.monotonic', return_value=1000.0):
+        cache.set("a", 1)
+    with patch('app.utils.cache.time.monotonic', return_value=1011.0):
+        assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+def test_ttl_none_never_expires():
+    """Test entries stored without TTL survive the sweep"""
+    cache = LRUCache(ttl_seconds=10)
+    with patch('app.utils.cache.time.monotonic', return_value=1000.0):
+        cache.set("permanent", 1, ttl=None)
+        cache.set("temporary", 2)
+    with patch('app.utils.cache.time.monotonic', return_value=2000.0):
+        removed = cache.sweep()
+        assert cache.get("permanent") == 1
+    
+    assert removed == 1
+    assert cache.size() == 1
+
+def test_clear():
+    """Test clearing the cache resets entries and bytes"""
+    cache = LRUCache()
+    cache.set("a", 1, size=10)
+    cache.clear()
+    
+    assert cache.size() == 0
+    assert cache.bytes == 0
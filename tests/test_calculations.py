@@ -2,8 +2,12 @@
 Unit tests for FX calculations
 """
 
+import random
 import pytest
+from datetime import date
+from unittest.mock import patch
 from app.services.calculations import FXCalculator
+from app.services.fx_series import FXSeries
 
 def test_calculate_daily_percent_change():
     """Test daily percent change calculation"""
@@ -132,3 +136,221 @@ def test_process_fx_data_unsorted():
     # Should be sorted by date
     assert result["start_rate"] == 1.087
     assert result["end_rate"] == 1.092
+
+def test_process_fx_data_accepts_series():
+    """Test processing an FXSeries gives the same result as dictionaries"""
+    data = [
+        {"date": "2025-07-01", "rate": 1.087},
+        {"date": "2025-07-02", "rate": 1.085},
+        {"date": "2025-07-03", "rate": 1.092}
+    ]
+    series = FXSeries.from_records(data)
+    
+    assert FXCalculator.process_fx_data(series, "none") == FXCalculator.process_fx_data(data, "none")
+    assert FXCalculator.process_fx_data(series, "day") == FXCalculator.process_fx_data(data, "day")
+
+@pytest.mark.parametrize("size", [300, 5000])
+def test_vectorized_backend_matches_pure_python(size):
+    """Test the NumPy backend gives exactly the pure-Python results"""
+    np = pytest.importorskip("numpy")
+    rng = np.random.default_rng(42)
+    rates = np.round(1.1 + rng.normal(0, 0.01, size).cumsum() / 10, 4).tolist()
+    rates[size // 2] = 0.0  # division by zero on the next day
+    rates[10:14] = [1.0, 1.00005, 1.0, 1.000125]  # values on a rounding boundary
+    
+    with patch.object(FXCalculator, "vectorize_threshold", 10**9):
+        expected_changes = FXCalculator.calculate_daily_percent_change(rates)
+        expected_mean = FXCalculator.calculate_mean_rate(rates)
+    with patch.object(FXCalculator, "vectorize_threshold", 1):
+        changes = FXCalculator.calculate_daily_percent_change(rates)
+        mean = FXCalculator.calculate_mean_rate(rates)
+    
+    assert changes == expected_changes
+    assert changes[size // 2 + 1] is None
+    assert mean == expected_mean
+
+def test_mean_rate_matches_sequential_sum_on_random_windows():
+    """Test long series keep the rounding of the sequential sum in the mean"""
+    rng = random.Random(7)
+    rates = [round(1.0 + rng.random() * 0.6, 4) for _ in range(3000)]
+    
+    with patch.object(FXCalculator, "vectorize_threshold", 1):
+        for _ in range(2000):
+            start = rng.randrange(0, 2700)
+            window = rates[start:start + rng.randrange(256, 300)]
+            assert FXCalculator.calculate_mean_rate(window) == round(sum(window) / len(window), 6)
+
+def test_vectorized_backend_accepts_series_views():
+    """Test the NumPy backend reads FXSeries rates without conversion"""
+    pytest.importorskip("numpy")
+    series = FXSeries.from_records([
+        {"date": f"2025-07-{day:02d}", "rate": 1.08 + day / 1000} for day in range(1, 31)
+    ])
+    
+    with patch.object(FXCalculator, "vectorize_threshold", 1):
+        vectorized = FXCalculator.process_fx_data(series, "day")
+    
+    assert vectorized == FXCalculator.process_fx_data(series.to_records(), "day")
+
+def test_iter_daily_breakdown_matches_list():
+    """Test the streaming generator yields the same rows as the list breakdown"""
+    series = FXSeries.from_records([
+        {"date": "2025-07-01", "rate": 1.087},
+        {"date": "2025-07-02", "rate": 0},
+        {"date": "2025-07-03", "rate": 1.092},
+        {"date": "2025-07-04", "rate": 1.089}
+    ])
+    
+    assert list(FXCalculator.iter_daily_breakdown(series)) == FXCalculator.process_fx_data(series, "day")
+
+def _brute_force_rolling(rates, window):
+    """Recompute every window from scratch, for comparison with the single-pass version"""
+    rows = []
+    for i in range(window - 1, len(rates)):
+        values = rates[i - window + 1:i + 1]
+        changes = [
+            (current - previous) / previous * 100
+            for previous, current in zip(values, values[1:]) if previous != 0
+        ]
+        volatility = None
+        if len(changes) > 1:
+            mean = sum(changes) / len(changes)
+            volatility = round((sum((c - mean) ** 2 for c in changes) / (len(changes) - 1)) ** 0.5, 4)
+        rows.append((round(sum(values) / window, 6), min(values), max(values), volatility))
+    return rows
+
+@pytest.mark.parametrize("window", [2, 3, 7, 30])
+def test_iter_rolling_breakdown_matches_brute_force(window):
+    """Test running sums and monotonic deques give the same statistics as recomputing each window"""
+    rates = [1.0 + ((i * 37) % 23) / 100 for i in range(120)]
+    rates[50] = 0.0
+    first = date(2025, 1, 1).toordinal()
+    series = FXSeries.from_points((first + i, rate) for i, rate in enumerate(rates))
+    
+    rows = list(FXCalculator.iter_rolling_breakdown(series, window))
+    
+    assert len(rows) == len(rates) - window + 1
+    assert rows[0]["date"] == date.fromordinal(first + window - 1).isoformat()
+    expected = _brute_force_rolling(rates, window)
+    assert [(row["moving_average"], row["rolling_min"], row["rolling_max"]) for row in rows] == [
+        (average, low, high) for average, low, high, _ in expected
+    ]
+    assert [row["volatility"] for row in rows] == pytest.approx([volatility for *_, volatility in expected], abs=1e-4)
+
+def test_iter_rolling_breakdown_shorter_than_window():
+    """Test no rows are produced until a full window is available"""
+    series = FXSeries.from_records([
+        {"date": "2025-07-01", "rate": 1.087},
+        {"date": "2025-07-02", "rate": 1.085}
+    ])
+    
+    assert list(FXCalculator.iter_rolling_breakdown(series, 3)) == []
+
+def test_calculate_max_drawdown():
+    """Test the largest peak-to-trough decline and its dates"""
+    series = FXSeries.from_records([
+        {"date": "2025-07-01", "rate": 1.10},
+        {"date": "2025-07-02", "rate": 1.20},
+        {"date": "2025-07-03", "rate": 1.08},
+        {"date": "2025-07-04", "rate": 1.25},
+        {"date": "2025-07-05", "rate": 1.15}
+    ])
+    
+    assert FXCalculator.calculate_max_drawdown(series) == {
+        "max_drawdown_pct": -10.0,
+        "peak_date": "2025-07-02",
+        "trough_date": "2025-07-03"
+    }
+
+def test_calculate_max_drawdown_rising_series():
+    """Test a series that never declines has no drawdown"""
+    series = FXSeries.from_records([
+        {"date": "2025-07-01", "rate": 1.10},
+        {"date": "2025-07-02", "rate": 1.20}
+    ])
+    
+    assert FXCalculator.calculate_max_drawdown(series) == {
+        "max_drawdown_pct": 0.0,
+        "peak_date": None,
+        "trough_date": None
+    }
+
+def test_process_fx_data_rolling_breakdown():
+    """Test the rolling breakdown combines per-day statistics with the max drawdown"""
+    data = [
+        {"date": "2025-07-01", "rate": 1.10},
+        {"date": "2025-07-02", "rate": 1.20},
+        {"date": "2025-07-03", "rate": 1.08}
+    ]
+    
+    result = FXCalculator.process_fx_data(data, "rolling", window=2)
+    
+    assert result["window"] == 2
+    assert result["max_drawdown_pct"] == -10.0
+    assert [row["date"] for row in result["days"]] == ["2025-07-02", "2025-07-03"]
+    assert result["days"][1]["moving_average"] == 1.14
+    assert result["days"][1]["rolling_min"] == 1.08
+    assert result["days"][1]["rolling_max"] == 1.20
+
+def test_iter_period_breakdown_month():
+    """Test monthly aggregates split at calendar month boundaries"""
+    series = FXSeries.from_records([
+        {"date": "2025-06-27", "rate": 1.10},
+        {"date": "2025-06-30", "rate": 1.12},
+        {"date": "2025-07-01", "rate": 1.08},
+        {"date": "2025-07-15", "rate": 1.14},
+        {"date": "2025-07-31", "rate": 1.11}
+    ])
+    
+    rows = list(FXCalculator.iter_period_breakdown(series, "month"))
+    
+    assert rows == [
+        {
+            "period": "2025-06", "start_date": "2025-06-27", "end_date": "2025-06-30",
+            "first_rate": 1.10, "last_rate": 1.12, "min_rate": 1.10, "max_rate": 1.12,
+            "mean_rate": 1.11, "pct_change": 1.82, "days": 2
+        },
+        {
+            "period": "2025-07", "start_date": "2025-07-01", "end_date": "2025-07-31",
+            "first_rate": 1.08, "last_rate": 1.11, "min_rate": 1.08, "max_rate": 1.14,
+            "mean_rate": 1.11, "pct_change": 2.78, "days": 3
+        }
+    ]
+
+@pytest.mark.parametrize("period,labels", [
+    ("week", ["2025-W01", "2025-W52", "2026-W01"]),
+    ("month", ["2024-12", "2025-01", "2025-12", "2026-01"]),
+    ("quarter", ["2024-Q4", "2025-Q1", "2025-Q4", "2026-Q1"])
+])
+def test_iter_period_breakdown_labels(period, labels):
+    """Test period labels across year ends (ISO weeks may belong to the next or previous year)"""
+    series = FXSeries.from_records([
+        {"date": "2024-12-31", "rate": 1.0},
+        {"date": "2025-01-02", "rate": 1.0},
+        {"date": "2025-12-26", "rate": 1.0},
+        {"date": "2025-12-31", "rate": 1.0},
+        {"date": "2026-01-02", "rate": 1.0}
+    ])
+    
+    rows = list(FXCalculator.iter_period_breakdown(series, period))
+    
+    assert [row["period"] for row in rows] == labels
+    assert sum(row["days"] for row in rows) == 5
+
+def test_iter_period_breakdown_matches_grouping():
+    """Test the streaming pass agrees with grouping the rows by period"""
+    first = date(2023, 1, 1).toordinal()
+    rates = [1.0 + ((i * 37) % 23) / 100 for i in range(800)]
+    series = FXSeries.from_points((first + i, rate) for i, rate in enumerate(rates))
+    
+    groups = {}
+    for i, rate in enumerate(rates):
+        day = date.fromordinal(first + i)
+        groups.setdefault((day.year, day.month), []).append(rate)
+    
+    rows = FXCalculator.process_fx_data(series, "month")
+    
+    assert [(row["first_rate"], row["last_rate"], row["min_rate"], row["max_rate"], row["days"]) for row in rows] == [
+        (values[0], values[-1], min(values), max(values), len(values)) for values in groups.values()
+    ]
+    assert [row["mean_rate"] for row in rows] == pytest.approx([sum(v) / len(v) for v in groups.values()], abs=1e-6)
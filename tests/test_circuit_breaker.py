@@ -0,0 +1,57 @@
+"""
+Unit tests for the upstream circuit breaker
+"""
+
+import pytest
+from unittest.mock import patch
+from app.utils.circuit_breaker import CircuitBreaker
+
+@pytest.fixture
+def breaker():
+    """Create a breaker opening at 50% failures over at least 4 calls"""
+    return CircuitBreaker(failure_threshold=0.5, minimum_calls=4, window_size=10, probe_interval=30)
+
+def test_stays_closed_below_minimum_calls(breaker):
+    """Test a few failures do not open the circuit before enough calls are seen"""
+    for _ in range(3):
+        breaker.record_failure()
+    
+    assert breaker.state == "closed"
+    assert breaker.allow_request()
+
+def test_opens_over_failure_rate(breaker):
+    """Test the circuit opens once the failure rate reaches the threshold"""
+    breaker.record_success()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    
+    assert breaker.state == "open"
+    assert not breaker.allow_request()
+    assert breaker.snapshot()["rejected"] == 1
+
+def test_half_open_probe_closes_on_success(breaker):
+    """Test a single probe is let through after the interval and success closes the circuit"""
+    for _ in range(4):
+        breaker.record_failure()
+    
+    with patch('app.utils.circuit_breaker.time.monotonic', return_value=10**9):
+        assert breaker.state == "half_open"
+        assert breaker.allow_request()
+        assert not breaker.allow_request()
+        breaker.record_success()
+    
+    assert breaker.state == "closed"
+    assert breaker.failure_rate() == 0.0
+
+def test_half_open_probe_failure_reopens(breaker):
+    """Test a failed probe opens the circuit again"""
+    for _ in range(4):
+        breaker.record_failure()
+    
+    with patch('app.utils.circuit_breaker.time.monotonic', return_value=10**9):
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == "open"
+    
+    assert breaker.opened == 2
@@ -3,15 +3,44 @@ Unit tests for Franksher API service
 """
 
 import pytest
+import asyncio
+import httpx
 import json
 import os
-from unittest.mock import patch, AsyncMock, mock_open
-from app.services.franksher_api import FranksherAPIService
+import time
+from datetime import date
+from unittest.mock import patch, AsyncMock, MagicMock
+from app.services.fallback_data import FallbackIndex
+from app.services.fx_series import FXSeries
+from app.utils import metrics
+from app.utils.range_cache import RangeCache
+from app.services.franksher_api import FranksherAPIService, _split_by_year, get_api_service
 
 @pytest.fixture
-def api_service():
+def mock_client():
+    """Mock pooled HTTP client"""
+    return AsyncMock()
+
+@pytest.fixture
+def api_service(mock_client):
     """Create API service instance for testing"""
-    return FranksherAPIService()
+    return FranksherAPIService(client=mock_client, store_path=None)
+
+def frankfurter_payload(records, currency="USD"):
+    """Build a Frankfurter time series payload from date/rate records"""
+    return {
+        "amount": 1.0,
+        "base": "EUR",
+        "rates": {item["date"]: {currency: item["rate"]} for item in records}
+    }
+
+def make_response(payload):
+    """Build a mock HTTP response returning the given JSON payload"""
+    response = MagicMock()
+    response.json.return_value = payload
+    response.status_code = 200
+    response.raise_for_status.return_value = None
+    return response
 
 @pytest.fixture
 def sample_api_response():
@@ -32,90 +61,454 @@ def sample_local_data():
         {"date": "2025-07-04", "rate": 1.089, "from": "EUR", "to": "USD"}
     ]
 
+@pytest.fixture
+def local_data_file(tmp_path, sample_local_data):
+    """Write the sample local data to a temporary fallback file"""
+    path = tmp_path / "sample_fx.json"
+    path.write_text(json.dumps(sample_local_data))
+    return path
+
 @pytest.mark.asyncio
-@patch('httpx.AsyncClient')
 async def test_get_fx_data_success(mock_client, api_service, sample_api_response):
     """Test successful API data fetch"""
     # Mock successful HTTP response
-    mock_response = AsyncMock()
-    mock_response.json.return_value = sample_api_response
-    mock_response.raise_for_status.return_value = None
+    mock_client.get.return_value = make_response(frankfurter_payload(sample_api_response))
+    
+    result = await api_service.get_fx_data("2025-07-01", "2025-07-03")
     
-    mock_client_instance = AsyncMock()
-    mock_client_instance.get.return_value = mock_response
-    mock_client.return_value.__aenter__.return_value = mock_client_instance
+    assert result.to_records() == sample_api_response
+    mock_client.get.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_get_fx_data_reuses_pooled_client(mock_client, api_service, sample_api_response):
+    """Test repeated fetches share one client and hit the service cache"""
+    mock_client.get.return_value = make_response(frankfurter_payload(sample_api_response))
+    
+    await api_service.get_fx_data("2025-07-01", "2025-07-03")
+    await api_service.get_fx_data("2025-07-01", "2025-07-03")
+    
+    assert api_service.client is mock_client
+    mock_client.get.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_get_fx_data_sub_range_served_from_cache(mock_client, api_service, sample_api_response):
+    """Test a sub-range of a cached range does not reach the network"""
+    mock_client.get.return_value = make_response(frankfurter_payload(sample_api_response))
+    
+    await api_service.get_fx_data("2025-07-01", "2025-07-03")
+    result = await api_service.get_fx_data("2025-07-02", "2025-07-03")
+    
+    assert result.to_records() == sample_api_response[1:]
+    mock_client.get.assert_called_once()
+
+@pytest.mark.asyncio
+async def test_get_fx_data_fetches_only_missing_gap(mock_client, api_service, sample_api_response):
+    """Test an overlapping range only fetches the uncached days"""
+    mock_client.get.return_value = make_response(frankfurter_payload(sample_api_response))
+    await api_service.get_fx_data("2025-07-01", "2025-07-03")
+    
+    mock_client.get.return_value = make_response(frankfurter_payload([{"date": "2025-07-04", "rate": 1.089}]))
+    result = await api_service.get_fx_data("2025-07-02", "2025-07-04")
+    
+    assert mock_client.get.call_count == 2
+    assert "2025-07-04..2025-07-04" in mock_client.get.call_args[0][0]
+    assert result.iso_dates() == ["2025-07-02", "2025-07-03", "2025-07-04"]
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_are_coalesced(mock_client, api_service, sample_api_response):
+    """Test concurrent callers for the same range share one upstream fetch"""
+    async def slow_get(url, **kwargs):
+        await asyncio.sleep(0.01)
+        return make_response(frankfurter_payload(sample_api_response))
+    mock_client.get.side_effect = slow_get
+    
+    results = await asyncio.gather(*(
+        api_service.get_fx_data("2025-07-01", "2025-07-03") for _ in range(20)
+    ))
+    
+    assert all(result.to_records() == sample_api_response for result in results)
+    mock_client.get.assert_called_once()
+    assert api_service.single_flight.leaders == 1
+    assert api_service.single_flight.coalesced == 19
+    assert api_service.single_flight.in_flight() == 0
+
+@pytest.mark.asyncio
+async def test_overlapping_request_waits_for_in_flight_fetch(mock_client, api_service, sample_api_response):
+    """Test a caller only fetches days not covered by an in-flight fetch"""
+    async def slow_get(url, **kwargs):
+        await asyncio.sleep(0.01)
+        if "2025-07-04..2025-07-04" in url:
+            return make_response(frankfurter_payload([{"date": "2025-07-04", "rate": 1.089}]))
+        return make_response(frankfurter_payload(sample_api_response))
+    mock_client.get.side_effect = slow_get
+    
+    first, second = await asyncio.gather(
+        api_service.get_fx_data("2025-07-01", "2025-07-03"),
+        api_service.get_fx_data("2025-07-02", "2025-07-04")
+    )
+    
+    assert first.to_records() == sample_api_response
+    assert second.iso_dates() == ["2025-07-02", "2025-07-03", "2025-07-04"]
+    urls = [call[0][0] for call in mock_client.get.call_args_list]
+    assert len(urls) == 2
+    assert "2025-07-04..2025-07-04" in urls[1]
+    assert api_service.single_flight.coalesced == 1
+
+@pytest.mark.asyncio
+async def test_historical_rates_persist_across_restarts(tmp_path, sample_api_response):
+    """Test final rates are persisted and a new service starts warm"""
+    path = str(tmp_path / "rates.sqlite3")
+    first_client = AsyncMock()
+    first_client.get.return_value = make_response(frankfurter_payload(sample_api_response))
+    first = FranksherAPIService(client=first_client, store_path=path)
+    await first.get_fx_data("2025-07-01", "2025-07-03")
+    await first.aclose()
+    
+    second_client = AsyncMock()
+    second = FranksherAPIService(client=second_client, store_path=path)
+    result = await second.get_fx_data("2025-07-01", "2025-07-03")
+    await second.aclose()
+    
+    assert result.to_records() == sample_api_response
+    second_client.get.assert_not_called()
+
+@pytest.mark.asyncio
+async def test_current_window_is_not_persisted(tmp_path, mock_client):
+    """Test rates on or after the latest publication only get a TTL"""
+    path = str(tmp_path / "rates.sqlite3")
+    service = FranksherAPIService(client=mock_client, store_path=path)
+    mock_client.get.return_value = make_response(frankfurter_payload([{"date": "2025-07-04", "rate": 1.089}]))
+    
+    with patch('app.services.franksher_api.latest_publication_date', return_value=date(2025, 7, 4)):
+        await service.get_fx_data("2025-07-03", "2025-07-04")
+    
+    covered, _ = service.rate_store.load(("EUR", "USD"), date(2025, 7, 1), date(2025, 7, 10))
+    await service.aclose()
+    assert covered == [(date(2025, 7, 3), date(2025, 7, 3))]
+
+@pytest.mark.asyncio
+async def test_multiple_targets_share_one_fetch(mock_client, api_service):
+    """Test several targets and derived crosses come from one upstream call"""
+    mock_client.get.return_value = make_response({
+        "base": "EUR",
+        "rates": {
+            "2025-07-01": {"USD": 1.1, "GBP": 0.85, "JPY": 160.0},
+            "2025-07-02": {"USD": 1.2, "GBP": 0.8, "JPY": 170.0}
+        }
+    })
+    
+    rates = await api_service.get_fx_rates("2025-07-01", "2025-07-02", "EUR", ["USD", "GBP", "JPY"])
+    cross = await api_service.get_fx_data("2025-07-01", "2025-07-02", "GBP", "JPY")
+    inverse = await api_service.get_fx_data("2025-07-01", "2025-07-02", "USD", "EUR")
+    
+    mock_client.get.assert_called_once()
+    assert "to=" not in mock_client.get.call_args[0][0]
+    assert list(rates["GBP"].rates) == [0.85, 0.8]
+    assert list(cross.rates) == [round(160.0 / 0.85, 6), 212.5]
+    assert list(inverse.rates) == [round(1 / 1.1, 6), round(1 / 1.2, 6)]
+
+@pytest.mark.asyncio
+async def test_unknown_target_currency_is_empty(mock_client, api_service, sample_api_response):
+    """Test a target missing from the response yields an empty series"""
+    mock_client.get.return_value = make_response(frankfurter_payload(sample_api_response))
+    
+    rates = await api_service.get_fx_rates("2025-07-01", "2025-07-03", "EUR", ["USD", "XYZ"])
+    
+    assert len(rates["USD"]) == 3
+    assert len(rates["XYZ"]) == 0
+
+@pytest.mark.asyncio
+async def test_stale_range_served_immediately_and_refreshed(mock_client, api_service, sample_api_response):
+    """Test an expired range is returned at once while it is refetched in the background"""
+    api_service.cache = RangeCache(ttl_seconds=300, max_stale_seconds=3600)
+    with patch('app.utils.range_cache.time.time', return_value=time.time() - 600):
+        api_service.cache.store(("EUR", "USD"), date(2025, 7, 1), date(2025, 7, 3), sample_api_response[:1])
+    mock_client.get.return_value = make_response(frankfurter_payload(sample_api_response))
     
     result = await api_service.get_fx_data("2025-07-01", "2025-07-03")
     
-    assert result == sample_api_response
-    mock_client_instance.get.assert_called_once()
+    assert result.iso_dates() == ["2025-07-01"]
+    await asyncio.sleep(0.01)
+    mock_client.get.assert_called_once()
+    refreshed = await api_service.get_fx_data("2025-07-01", "2025-07-03")
+    assert len(refreshed) == 3
+    assert mock_client.get.call_count == 1
+
+@pytest.mark.asyncio
+async def test_refresh_current_window(mock_client, api_service, sample_api_response):
+    """Test the publication refresh refetches only non-final cached ranges"""
+    api_service.cache.store(("EUR", "USD"), date(2025, 7, 1), date(2025, 7, 3), [])
+    api_service.cache.store(("EUR", "USD"), date(2025, 6, 1), date(2025, 6, 30), [], permanent=True)
+    mock_client.get.return_value = make_response(frankfurter_payload(sample_api_response))
+    
+    await api_service.refresh_current_window()
+    
+    mock_client.get.assert_called_once()
+    assert "2025-07-01..2025-07-03" in mock_client.get.call_args.args[0]
+    assert len(api_service.cache.get_range(("EUR", "USD"), date(2025, 7, 1), date(2025, 7, 3))) == 3
+
+@pytest.mark.asyncio
+async def test_is_final_only_for_published_upstream_rates(mock_client, api_service, local_data_file, sample_api_response):
+    """Test upstream historical rates are final while fallback data is not"""
+    mock_client.get.return_value = make_response(frankfurter_payload(sample_api_response))
+    await api_service.get_fx_data("2025-07-01", "2025-07-03")
+    assert api_service.is_final("2025-07-01", "2025-07-03", "EUR", ["USD"])
+    
+    mock_client.get.side_effect = Exception("API Error")
+    api_service.max_retries = 1
+    api_service.fallback = FallbackIndex(str(local_data_file))
+    await api_service.get_fx_data("2025-07-04", "2025-07-04")
+    assert not api_service.is_final("2025-07-01", "2025-07-04", "EUR", ["USD"])
+
+def test_get_api_service_is_singleton():
+    """Test the dependency returns one process-wide service"""
+    assert get_api_service() is get_api_service()
 
 @pytest.mark.asyncio
-@patch('httpx.AsyncClient')
-async def test_get_fx_data_api_failure_fallback(mock_client, api_service, sample_local_data):
+async def test_aclose_closes_client(mock_client, api_service):
+    """Test closing the service closes the pooled client"""
+    await api_service.aclose()
+    mock_client.aclose.assert_awaited_once()
+
+@pytest.mark.asyncio
+async def test_get_fx_data_api_failure_fallback(mock_client, api_service, local_data_file):
     """Test API failure with fallback to local data"""
     # Mock API failure
-    mock_client_instance = AsyncMock()
-    mock_client_instance.get.side_effect = Exception("API Error")
-    mock_client.return_value.__aenter__.return_value = mock_client_instance
+    mock_client.get.side_effect = Exception("API Error")
+    api_service.fallback = FallbackIndex(str(local_data_file))
     
-    # Mock local data file
-    with patch('builtins.open', mock_open(read_data=json.dumps(sample_local_data))):
-        with patch('os.path.exists', return_value=True):
-            result = await api_service.get_fx_data("2025-07-01", "2025-07-03")
+    before = metrics.FALLBACK_ACTIVATIONS.labels("upstream_failure").value
+    result = await api_service.get_fx_data("2025-07-01", "2025-07-03")
     
+    assert metrics.FALLBACK_ACTIVATIONS.labels("upstream_failure").value == before + 1
     # Should return filtered local data
-    assert len(result) == 3  # Only dates in range
-    assert result[0]["date"] == "2025-07-01"
-    assert result[0]["rate"] == 1.087
+    records = result.to_records()
+    assert len(records) == 3  # Only dates in range
+    assert records[0]["date"] == "2025-07-01"
+    assert records[0]["rate"] == 1.087
+
+@pytest.mark.asyncio
+async def test_fallback_never_replaces_cached_rates(mock_client, api_service, local_data_file):
+    """Test a failed fetch fills only the requested legs' gaps with local data"""
+    mock_client.get.return_value = make_response(frankfurter_payload([
+        {"date": "2025-07-01", "rate": 1.17},
+        {"date": "2025-07-02", "rate": 1.18}
+    ]))
+    await api_service.get_fx_data("2025-07-01", "2025-07-02")
+    
+    mock_client.get.side_effect = Exception("API Error")
+    api_service.max_retries = 1
+    api_service.fallback = FallbackIndex(str(local_data_file))
+    await api_service.get_fx_rates("2025-07-01", "2025-07-02", "EUR", ["USD", "JPY"])
+    
+    usd = api_service.cache.get_range(("EUR", "USD"), date(2025, 7, 1), date(2025, 7, 2))
+    assert list(usd.rates) == [1.17, 1.18]
+    assert api_service.cache.is_permanent(("EUR", "USD"), date(2025, 7, 1), date(2025, 7, 2))
+    
+    result = await api_service.get_fx_data("2025-07-01", "2025-07-03")
+    assert list(result.rates) == [1.17, 1.18, 1.092]
+    assert api_service.cache.is_permanent(("EUR", "USD"), date(2025, 7, 1), date(2025, 7, 2))
 
 @pytest.mark.asyncio
-@patch('httpx.AsyncClient')
 async def test_get_fx_data_timeout_retry(mock_client, api_service):
     """Test API timeout with retry logic"""
     # Mock timeout exception
-    mock_client_instance = AsyncMock()
-    mock_client_instance.get.side_effect = Exception("Timeout")
-    mock_client.return_value.__aenter__.return_value = mock_client_instance
+    mock_client.get.side_effect = Exception("Timeout")
     
     # Mock local data fallback
-    with patch.object(api_service, '_load_local_data', return_value=[]) as mock_local:
+    with patch.object(api_service, '_load_local_data', return_value=FXSeries()) as mock_local:
         result = await api_service.get_fx_data("2025-07-01", "2025-07-03")
     
     # Should have tried API multiple times then fallen back
-    assert mock_client_instance.get.call_count == api_service.max_retries
+    assert mock_client.get.call_count == api_service.max_retries
     mock_local.assert_called_once()
 
+def test_split_by_year():
+    """Test long ranges are split at calendar year boundaries"""
+    assert _split_by_year(date(2023, 11, 1), date(2025, 2, 1)) == [
+        (date(2023, 11, 1), date(2023, 12, 31)),
+        (date(2024, 1, 1), date(2024, 12, 31)),
+        (date(2025, 1, 1), date(2025, 2, 1)),
+    ]
+    assert _split_by_year(date(2025, 7, 1), date(2025, 7, 3)) == [(date(2025, 7, 1), date(2025, 7, 3))]
+
 @pytest.mark.asyncio
-async def test_load_local_data_success(api_service, sample_local_data):
+async def test_long_range_fetched_in_chunks_retrying_only_failures(mock_client, api_service):
+    """Test a multi-year range is fetched per year and only the failed chunk is retried"""
+    failures = {"2024": 1}
+    
+    async def get(url, **kwargs):
+        year = url.split("/")[-1][:4]
+        if failures.get(year):
+            failures[year] -= 1
+            raise Exception("Timeout")
+        return make_response(frankfurter_payload([{"date": f"{year}-06-03", "rate": 1.1}]))
+    
+    mock_client.get.side_effect = get
+    
+    with patch("app.services.franksher_api.asyncio.sleep", new=AsyncMock()):
+        result = await api_service.get_fx_data("2023-01-01", "2025-12-31")
+    
+    assert result.iso_dates() == ["2023-06-03", "2024-06-03", "2025-06-03"]
+    urls = [call.args[0] for call in mock_client.get.call_args_list]
+    assert len(urls) == 4
+    assert sum("2024-01-01..2024-12-31" in url for url in urls) == 2
+
+@pytest.mark.asyncio
+async def test_open_circuit_skips_upstream(mock_client, api_service, local_data_file):
+    """Test repeated upstream failures open the circuit and later requests fall back at once"""
+    mock_client.get.side_effect = httpx.ConnectError("down")
+    api_service.fallback = FallbackIndex(str(local_data_file))
+    api_service.max_retries = 1
+    
+    for day in range(1, 6):
+        await api_service.get_fx_data(f"2025-06-0{day}", f"2025-06-0{day}")
+    assert api_service.circuit_breaker.state == "open"
+    calls = mock_client.get.call_count
+    
+    result = await api_service.get_fx_data("2025-07-01", "2025-07-03")
+    
+    assert len(result) == 3
+    assert mock_client.get.call_count == calls
+    assert api_service.circuit_breaker.rejected == 1
+
+@pytest.mark.asyncio
+async def test_deadline_serves_fallback_without_caching_it(mock_client, api_service, local_data_file):
+    """Test an exhausted budget answers from local data while the shared fetch keeps retrying"""
+    mock_client.get.side_effect = httpx.ConnectError("down")
+    api_service.fallback = FallbackIndex(str(local_data_file))
+    
+    started = time.monotonic()
+    result = await api_service.get_fx_data("2025-07-01", "2025-07-03", deadline=started + 0.2)
+    
+    assert time.monotonic() - started < 0.9  # did not wait for the 1s backoff
+    assert len(result) == 3
+    assert api_service.cache.missing_ranges(("EUR", "USD"), date(2025, 7, 1), date(2025, 7, 3))
+    assert api_service.circuit_breaker.snapshot()["calls"] == 1
+    
+    for entries in list(api_service.single_flight._inflight.values()):
+        for *_, task in entries:
+            task.cancel()
+
+@pytest.mark.asyncio
+async def test_impatient_caller_does_not_cut_shared_fetch(mock_client, api_service, local_data_file):
+    """Test a caller with a tiny budget does not shorten a fetch shared with a patient caller"""
+    upstream = [{"date": "2025-07-01", "rate": 1.1}, {"date": "2025-07-02", "rate": 1.2}]
+    
+    async def slow_get(url, **kwargs):
+        await asyncio.sleep(0.2)
+        return make_response(frankfurter_payload(upstream))
+    mock_client.get.side_effect = slow_get
+    api_service.fallback = FallbackIndex(str(local_data_file))
+    
+    impatient, patient = await asyncio.gather(
+        api_service.get_fx_data("2025-07-01", "2025-07-02", deadline=time.monotonic() + 0.05),
+        api_service.get_fx_data("2025-07-01", "2025-07-02")
+    )
+    
+    assert list(impatient.rates) == [1.087, 1.085]  # local data
+    assert list(patient.rates) == [1.1, 1.2]
+    assert mock_client.get.call_count == 1
+    cached = api_service.cache.get_range(("EUR", "USD"), date(2025, 7, 1), date(2025, 7, 2))
+    assert list(cached.rates) == [1.1, 1.2]
+    assert api_service.circuit_breaker.snapshot()["failure_rate"] == 0.0
+
+@pytest.mark.asyncio
+async def test_slow_upstream_returns_at_deadline(mock_client, api_service, local_data_file, sample_api_response):
+    """Test a caller stops waiting at its deadline while the fetch completes in the background"""
+    async def slow_get(url, **kwargs):
+        await asyncio.sleep(0.3)
+        return make_response(frankfurter_payload(sample_api_response))
+    mock_client.get.side_effect = slow_get
+    api_service.fallback = FallbackIndex(str(local_data_file))
+    
+    result = await api_service.get_fx_data("2025-07-01", "2025-07-03", deadline=time.monotonic() + 0.05)
+    assert len(result) == 3
+    
+    await asyncio.sleep(0.4)
+    assert api_service.cache.missing_ranges(("EUR", "USD"), date(2025, 7, 1), date(2025, 7, 3)) == []
+
+@pytest.mark.asyncio
+async def test_slow_request_is_hedged(mock_client, api_service, sample_api_response):
+    """Test a request slower than the p95 latency is hedged and the faster response wins"""
+    api_service.hedge = True
+    for _ in range(api_service.upstream_latency.min_samples):
+        api_service.upstream_latency.record(0.01)
+    delays = [1.0, 0.0]
+    
+    async def get(url, **kwargs):
+        await asyncio.sleep(delays.pop(0))
+        return make_response(frankfurter_payload(sample_api_response))
+    mock_client.get.side_effect = get
+    
+    started = time.monotonic()
+    result = await api_service.get_fx_data("2025-07-01", "2025-07-03")
+    
+    assert time.monotonic() - started < 0.5
+    assert len(result) == 3
+    assert api_service.hedged == 1
+    assert mock_client.get.call_count == 2
+
+@pytest.mark.asyncio
+async def test_load_local_data_success(api_service, local_data_file):
     """Test successful local data loading"""
-    with patch('builtins.open', mock_open(read_data=json.dumps(sample_local_data))):
-        with patch('os.path.exists', return_value=True):
-            result = await api_service._load_local_data("2025-07-01", "2025-07-03")
+    api_service.fallback = FallbackIndex(str(local_data_file))
+    result = await api_service._load_local_data("2025-07-01", "2025-07-03")
     
     # Should return filtered data
     assert len(result) == 3
-    assert all(item["date"] >= "2025-07-01" and item["date"] <= "2025-07-03" for item in result)
+    assert all("2025-07-01" <= day <= "2025-07-03" for day in result.iso_dates())
 
 @pytest.mark.asyncio
-async def test_load_local_data_file_not_found(api_service):
+async def test_load_local_data_file_not_found(api_service, tmp_path):
     """Test local data loading when file doesn't exist"""
-    with patch('os.path.exists', return_value=False):
-        result = await api_service._load_local_data("2025-07-01", "2025-07-03")
+    api_service.fallback = FallbackIndex(str(tmp_path / "missing.json"))
+    result = await api_service._load_local_data("2025-07-01", "2025-07-03")
     
-    assert result == []
+    assert len(result) == 0
 
 @pytest.mark.asyncio
-async def test_load_local_data_invalid_json(api_service):
+async def test_load_local_data_invalid_json(api_service, tmp_path):
     """Test local data loading with invalid JSON"""
-    with patch('builtins.open', mock_open(read_data="invalid json")):
-        with patch('os.path.exists', return_value=True):
-            result = await api_service._load_local_data("2025-07-01", "2025-07-03")
+    path = tmp_path / "invalid.json"
+    path.write_text("invalid json")
+    api_service.fallback = FallbackIndex(str(path))
+    result = await api_service._load_local_data("2025-07-01", "2025-07-03")
     
-    assert result == []
+    assert len(result) == 0
 
 @pytest.mark.asyncio
-async def test_fetch_from_api_different_response_formats(api_service):
+async def test_load_local_data_parses_file_once(api_service, local_data_file):
+    """Test the fallback file is only reparsed when it changes"""
+    api_service.fallback = FallbackIndex(str(local_data_file))
+    
+    with patch('app.services.fallback_data.json.load', wraps=json.load) as mock_load:
+        await api_service._load_local_data("2025-07-01", "2025-07-03")
+        await api_service._load_local_data("2025-07-02", "2025-07-04")
+        assert mock_load.call_count == 1
+        
+        local_data_file.write_text(json.dumps([{"date": "2025-07-02", "rate": 1.2}]))
+        os.utime(local_data_file, ns=(1, 1))
+        result = await api_service._load_local_data("2025-07-01", "2025-07-03")
+        assert mock_load.call_count == 2
+    
+    assert result.to_records() == [{"date": "2025-07-02", "rate": 1.2}]
+
+@pytest.mark.asyncio
+async def test_load_local_data_unsorted_file(api_service, tmp_path):
+    """Test fallback lookups return sorted data for an unsorted file"""
+    path = tmp_path / "unsorted.json"
+    path.write_text(json.dumps([
+        {"date": "2025-07-03", "rate": 1.092},
+        {"date": "2025-07-01", "rate": 1.087}
+    ]))
+    api_service.fallback = FallbackIndex(str(path))
+    
+    result = await api_service._load_local_data("2025-07-01", "2025-07-03")
+    assert result.iso_dates() == ["2025-07-01", "2025-07-03"]
+
+@pytest.mark.asyncio
+async def test_fetch_from_api_different_response_formats(mock_client, api_service):
     """Test API response with different formats"""
     # Test with rates object format
     rates_response = {
@@ -126,41 +519,58 @@ async def test_fetch_from_api_different_response_formats(api_service):
         }
     }
     
-    # Mock the httpx.AsyncClient directly
-    with patch('httpx.AsyncClient') as mock_client:
-        mock_response = AsyncMock()
-        mock_response.json.return_value = rates_response
-        mock_response.raise_for_status.return_value = None
-        
-        mock_client_instance = AsyncMock()
-        mock_client_instance.get.return_value = mock_response
-        mock_client.return_value.__aenter__ = AsyncMock(return_value=mock_client_instance)
-        mock_client.return_value.__aexit__ = AsyncMock(return_value=None)
-        
-        result = await api_service._fetch_from_api("2025-07-01", "2025-07-03", "EUR", "USD")
-        
-        expected = [
-            {"date": "2025-07-01", "rate": 1.087},
-            {"date": "2025-07-02", "rate": 1.085},
-            {"date": "2025-07-03", "rate": 1.092}
-        ]
-        
-        print(f"Result: {result}")
-        print(f"Expected: {expected}")
-        assert result == expected
+    mock_client.get.return_value = make_response(rates_response)
+    
+    result = await api_service._fetch_from_api("2025-07-01", "2025-07-03", "EUR", "USD")
+    
+    expected = [
+        {"date": "2025-07-01", "rate": 1.087},
+        {"date": "2025-07-02", "rate": 1.085},
+        {"date": "2025-07-03", "rate": 1.092}
+    ]
+    
+    assert result["USD"].to_records() == expected
 
 @pytest.mark.asyncio
-@patch('httpx.AsyncClient')
 async def test_fetch_from_api_unexpected_format(mock_client, api_service):
     """Test API response with unexpected format"""
-    mock_response = AsyncMock()
-    mock_response.json.return_value = {"unexpected": "format"}
-    mock_response.raise_for_status.return_value = None
-    
-    mock_client_instance = AsyncMock()
-    mock_client_instance.get.return_value = mock_response
-    mock_client.return_value.__aenter__.return_value = mock_client_instance
+    mock_client.get.return_value = make_response({"unexpected": "format"})
     
     result = await api_service._fetch_from_api("2025-07-01", "2025-07-03", "EUR", "USD")
     
     assert result is None
+
+@pytest.mark.asyncio
+async def test_prefetch_caches_upstream_data(mock_client, api_service, sample_api_response):
+    """Test prefetch reports success once upstream rates are cached"""
+    mock_client.get.return_value = make_response(frankfurter_payload(sample_api_response))
+    
+    assert await api_service.prefetch("2025-07-01", "2025-07-03", "EUR", ["USD"]) is True
+    assert api_service.cache.missing_ranges(("EUR", "USD"), date(2025, 7, 1), date(2025, 7, 3)) == []
+    assert await api_service.prefetch("2025-07-01", "2025-07-03", "EUR", ["USD"]) is True
+    assert mock_client.get.call_count == 1
+
+@pytest.mark.asyncio
+async def test_prefetch_never_caches_fallback(mock_client, api_service, local_data_file):
+    """Test a failed prefetch reports failure and leaves the range uncached instead of using local data"""
+    mock_client.get.side_effect = httpx.ConnectError("down")
+    api_service.max_retries = 1
+    api_service.fallback = FallbackIndex(str(local_data_file))
+    
+    assert await api_service.prefetch("2025-07-01", "2025-07-03", "EUR", ["USD"]) is False
+    assert api_service.cache.missing_ranges(("EUR", "USD"), date(2025, 7, 1), date(2025, 7, 3))
+
+@pytest.mark.asyncio
+async def test_cache_lookups_counted_once_per_request(mock_client, api_service):
+    """Test a multi-leg request records a single hit or miss, however many coverage checks it makes"""
+    mock_client.get.return_value = make_response({
+        "amount": 1.0,
+        "base": "EUR",
+        "rates": {"2025-07-01": {"USD": 1.087, "GBP": 0.86}}
+    })
+    
+    await api_service.get_fx_rates("2025-07-01", "2025-07-01", "EUR", ["USD", "GBP"])
+    await api_service.get_fx_rates("2025-07-01", "2025-07-01", "GBP", ["USD"])
+    
+    stats = api_service.cache.stats()
+    assert (stats["misses"], stats["hits"]) == (1, 1)
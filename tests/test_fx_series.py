@@ -0,0 +1,61 @@
+"""
+Unit tests for the columnar FX series
+"""
+
+import pytest
+from datetime import date
+from app.services.fx_series import FXSeries
+
+@pytest.fixture
+def series():
+    """Series for July 1-4 built from unsorted records"""
+    return FXSeries.from_records([
+        {"date": "2025-07-03", "rate": 1.092},
+        {"date": "2025-07-01", "rate": 1.087},
+        {"date": "2025-07-04", "rate": 1.089},
+        {"date": "2025-07-02", "rate": 1.085}
+    ])
+
+def test_from_records_sorts_by_date(series):
+    """Test records are stored in date order"""
+    assert series.iso_dates() == ["2025-07-01", "2025-07-02", "2025-07-03", "2025-07-04"]
+    assert list(series.rates) == [1.087, 1.085, 1.092, 1.089]
+
+def test_from_records_last_duplicate_wins():
+    """Test duplicate dates keep the last rate"""
+    series = FXSeries.from_records([
+        {"date": "2025-07-01", "rate": 1.0},
+        {"date": "2025-07-01", "rate": 1.1}
+    ])
+    assert series.to_records() == [{"date": "2025-07-01", "rate": 1.1}]
+
+def test_between_is_zero_copy(series):
+    """Test slicing by date range shares the underlying arrays"""
+    window = series.between(date(2025, 7, 2), date(2025, 7, 3))
+    
+    assert window.to_records() == [
+        {"date": "2025-07-02", "rate": 1.085},
+        {"date": "2025-07-03", "rate": 1.092}
+    ]
+    assert window._rates is series._rates
+    assert window.first_date == date(2025, 7, 2)
+    assert window.last_date == date(2025, 7, 3)
+
+def test_between_outside_range_is_empty(series):
+    """Test a range without points gives an empty series"""
+    window = series.between(date(2025, 8, 1), date(2025, 8, 31))
+    assert len(window) == 0
+    assert not window
+
+def test_splice_replaces_window(series):
+    """Test splicing replaces the window and leaves the original untouched"""
+    replacement = FXSeries.from_records([
+        {"date": "2025-07-03", "rate": 1.1},
+        {"date": "2025-07-10", "rate": 1.2}
+    ])
+    
+    spliced = series.splice(date(2025, 7, 2), date(2025, 7, 3), replacement)
+    
+    assert spliced.iso_dates() == ["2025-07-01", "2025-07-03", "2025-07-04"]
+    assert list(spliced.rates) == [1.087, 1.1, 1.089]
+    assert len(series) == 4
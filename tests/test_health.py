@@ -2,8 +2,13 @@
 Unit tests for health endpoint
 """
 
+import asyncio
+import os
+import time
 import pytest
+from unittest.mock import patch
 from fastapi.testclient import TestClient
+from app import config
 from app.main import app
 
 client = TestClient(app)
@@ -12,7 +17,9 @@ def test_health_endpoint():
     """Test health endpoint returns correct response"""
     response = client.get("/health")
     assert response.status_code == 200
-    assert response.json() == {"status": "ok"}
+    data = response.json()
+    assert data["status"] == "ok"
+    assert data["upstream"]["state"] == "closed"
 
 def test_root_endpoint():
     """Test root endpoint returns API information"""
@@ -23,3 +30,75 @@ def test_root_endpoint():
     assert "version" in data
     assert "docs" in data
     assert data["service"] == "FX Summary Microservice"
+
+def test_lifespan_starts_and_closes_shared_service():
+    """Test the app lifespan starts background tasks and tears the service down"""
+    from app.services import franksher_api
+    
+    with patch.object(config, "WARMUP_ENABLED", False), TestClient(app) as lifespan_client:
+        service = franksher_api.get_api_service()
+        assert service._background_tasks
+        assert lifespan_client.get("/health").status_code == 200
+        assert lifespan_client.get("/ready").json()["warmup"]["state"] == "disabled"
+    
+    assert franksher_api._api_service is None
+
+def test_lifespan_waits_for_warmup_within_budget():
+    """Test startup waits for a short warm-up and /ready reports it finished"""
+    from app.services.franksher_api import FranksherAPIService
+    
+    async def fetch(start, end, base, targets):
+        return True
+    
+    with patch.multiple(config, WARMUP_ENABLED=True, WARMUP_PAIRS="EUR/USD,EUR/GBP", WARMUP_LOOKBACK_DAYS=400), \
+            patch.object(FranksherAPIService, "prefetch", side_effect=fetch) as prefetch, \
+            TestClient(app) as lifespan_client:
+        response = lifespan_client.get("/ready")
+    
+    assert response.status_code == 200
+    assert response.json()["warmup"]["state"] == "complete"
+    warmup = response.json()["warmup"]
+    assert warmup["windows_done"] == warmup["windows_total"]
+    assert prefetch.call_count == warmup["windows_total"]  # one call per window for both targets
+
+def test_lifespan_does_not_wait_beyond_startup_budget():
+    """Test a slow warm-up does not delay startup past its budget and /ready returns 503 meanwhile"""
+    from app.services.franksher_api import FranksherAPIService
+    
+    async def slow_fetch(*args, **kwargs):
+        await asyncio.sleep(30)
+    
+    with patch.multiple(config, WARMUP_ENABLED=True, WARMUP_STARTUP_WAIT_SECONDS=0.05), \
+            patch.object(FranksherAPIService, "prefetch", side_effect=slow_fetch):
+        started = time.monotonic()
+        with TestClient(app) as lifespan_client:
+            response = lifespan_client.get("/ready")
+            assert time.monotonic() - started < 5
+        
+    assert response.status_code == 503
+    assert response.json()["status"] == "warming_up"
+    assert response.json()["warmup"]["state"] == "running"
+
+def test_ready_endpoint_without_lifespan():
+    """Test readiness defaults to ready when no warm-up was started"""
+    response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+
+def test_debug_profile_header_writes_report(tmp_path):
+    """Test the opt-in debug header profiles the request and dumps a report"""
+    with patch.multiple(config, PROFILE_HEADER_ENABLED=True, PROFILE_DIR=str(tmp_path)):
+        response = client.get("/health", headers={"X-Debug-Profile": "1"})
+    
+    assert response.status_code == 200
+    report = response.headers["X-Profile-Report"]
+    assert report.endswith(".prof")
+    assert os.path.exists(report)
+    assert os.path.exists(report[:-len(".prof")] + ".txt")
+
+def test_debug_profile_header_ignored_by_default(tmp_path):
+    """Test the debug header does nothing unless enabled"""
+    response = client.get("/health", headers={"X-Debug-Profile": "1"})
+    
+    assert "X-Profile-Report" not in response.headers
+    assert "Server-Timing" in response.headers
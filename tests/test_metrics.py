@@ -0,0 +1,59 @@
+"""
+Unit tests for metrics collection and the /metrics endpoint
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.utils.metrics import Registry, _Metric
+
+client = TestClient(app)
+
+def test_counter_and_gauge_rendering():
+    """Test labelled counters and gauges render in the Prometheus text format"""
+    registry = Registry()
+    requests = registry.counter("requests_total", "Requests", ("status",))
+    in_flight = registry.gauge("in_flight", "In flight")
+    
+    requests.labels("200").inc()
+    requests.labels("200").inc()
+    requests.labels("timeout").inc()
+    in_flight.inc()
+    in_flight.dec()
+    
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{status="200"} 2.0' in text
+    assert 'requests_total{status="timeout"} 1.0' in text
+    assert "in_flight 0.0" in text
+
+def test_metric_base_is_abstract():
+    """Test the metric base class cannot be instantiated by mistake"""
+    with pytest.raises(TypeError):
+        _Metric("untyped", "No kind")
+
+def test_histogram_buckets_are_cumulative():
+    """Test histogram buckets are cumulative with an inclusive upper bound"""
+    registry = Registry()
+    latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+    
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.observe(value)
+    
+    text = registry.render()
+    assert 'latency_seconds_bucket{le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{le="1.0"} 3' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+    assert "latency_seconds_count 4" in text
+
+def test_metrics_endpoint():
+    """Test /metrics reports per-route latency, cache and circuit breaker metrics"""
+    client.get("/health")
+    
+    response = client.get("/metrics")
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'fx_http_request_duration_seconds_count{route="/health"}' in response.text
+    assert 'fx_cache_lookups_total{result="hit"}' in response.text
+    assert 'fx_circuit_breaker_state{state="closed"} 1' in response.text
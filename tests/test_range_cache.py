@@ -0,0 +1,117 @@
+"""
+Unit tests for the interval-aware rate cache
+"""
+
+import pytest
+from datetime import date
+from unittest.mock import patch
+from app.utils.range_cache import RangeCache
+
+PAIR = ("EUR", "USD")
+
+@pytest.fixture
+def cache():
+    """Create a range cache with July 1-10 cached"""
+    cache = RangeCache(ttl_seconds=300)
+    cache.store(PAIR, date(2025, 7, 1), date(2025, 7, 10), [
+        {"date": "2025-07-01", "rate": 1.087},
+        {"date": "2025-07-02", "rate": 1.085},
+        {"date": "2025-07-07", "rate": 1.088},
+        {"date": "2025-07-10", "rate": 1.093}
+    ])
+    return cache
+
+def test_sub_range_is_fully_covered(cache):
+    """Test a range inside cached coverage has no gaps"""
+    assert cache.missing_ranges(PAIR, date(2025, 7, 2), date(2025, 7, 8)) == []
+    
+    result = cache.get_range(PAIR, date(2025, 7, 2), date(2025, 7, 8))
+    assert result.to_records() == [
+        {"date": "2025-07-02", "rate": 1.085},
+        {"date": "2025-07-07", "rate": 1.088}
+    ]
+
+def test_overlapping_range_reports_only_gaps(cache):
+    """Test only the uncached parts of an overlapping range are missing"""
+    gaps = cache.missing_ranges(PAIR, date(2025, 6, 28), date(2025, 7, 15))
+    assert gaps == [
+        (date(2025, 6, 28), date(2025, 6, 30)),
+        (date(2025, 7, 11), date(2025, 7, 15))
+    ]
+
+def test_gap_between_stored_ranges(cache):
+    """Test a hole between two cached intervals is detected"""
+    cache.store(PAIR, date(2025, 7, 20), date(2025, 7, 25), [{"date": "2025-07-21", "rate": 1.1}])
+    
+    gaps = cache.missing_ranges(PAIR, date(2025, 7, 5), date(2025, 7, 22))
+    assert gaps == [(date(2025, 7, 11), date(2025, 7, 19))]
+
+def test_other_pair_is_not_covered(cache):
+    """Test coverage is tracked per currency pair"""
+    gaps = cache.missing_ranges(("EUR", "GBP"), date(2025, 7, 1), date(2025, 7, 3))
+    assert gaps == [(date(2025, 7, 1), date(2025, 7, 3))]
+
+def test_store_ignores_rates_outside_range():
+    """Test rates outside the fetched interval are not cached"""
+    cache = RangeCache()
+    cache.store(PAIR, date(2025, 7, 5), date(2025, 7, 6), [{"date": "2025-07-04", "rate": 1.089}])
+    
+    assert cache.size() == 0
+    assert cache.missing_ranges(PAIR, date(2025, 7, 5), date(2025, 7, 6)) == []
+
+def test_expired_coverage_is_refetched(cache):
+    """Test coverage older than the TTL counts as missing"""
+    with patch('app.utils.range_cache.time.time', return_value=10**12):
+        gaps = cache.missing_ranges(PAIR, date(2025, 7, 1), date(2025, 7, 10))
+    
+    assert gaps == [(date(2025, 7, 1), date(2025, 7, 10))]
+    assert cache.size() == 0
+
+def test_least_recently_used_pair_is_evicted():
+    """Test pair histories are bounded by the pair limit"""
+    cache = RangeCache(max_pairs=1)
+    cache.store(("EUR", "USD"), date(2025, 7, 1), date(2025, 7, 1), [{"date": "2025-07-01", "rate": 1.087}])
+    cache.store(("EUR", "GBP"), date(2025, 7, 1), date(2025, 7, 1), [{"date": "2025-07-01", "rate": 0.85}])
+    
+    assert cache.missing_ranges(("EUR", "USD"), date(2025, 7, 1), date(2025, 7, 1)) != []
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["pairs"] == 1
+
+def test_sweep_drops_expired_pairs(cache):
+    """Test the sweep removes expired coverage and empty pair histories"""
+    with patch('app.utils.range_cache.time.time', return_value=10**12):
+        removed = cache.sweep()
+    
+    assert removed == 4
+    assert cache.stats()["pairs"] == 0
+
+def test_stale_coverage_is_served_and_reported():
+    """Test coverage past the TTL is still served within the staleness limit"""
+    cache = RangeCache(ttl_seconds=300, max_stale_seconds=3600)
+    with patch('app.utils.range_cache.time.time', return_value=1000):
+        cache.store(PAIR, date(2025, 7, 1), date(2025, 7, 10), [{"date": "2025-07-02", "rate": 1.085}])
+    
+    with patch('app.utils.range_cache.time.time', return_value=1000 + 600):
+        assert cache.missing_ranges(PAIR, date(2025, 7, 1), date(2025, 7, 5)) == []
+        assert cache.stale_ranges(PAIR, date(2025, 7, 1), date(2025, 7, 5)) == [(date(2025, 7, 1), date(2025, 7, 5))]
+        assert len(cache.get_range(PAIR, date(2025, 7, 1), date(2025, 7, 5))) == 1
+    
+    with patch('app.utils.range_cache.time.time', return_value=1000 + 300 + 3601):
+        assert cache.missing_ranges(PAIR, date(2025, 7, 1), date(2025, 7, 5)) == [(date(2025, 7, 1), date(2025, 7, 5))]
+
+def test_permanent_coverage_is_never_stale_or_expiring(cache):
+    """Test only the non-permanent current window is reported for refresh"""
+    cache.store(PAIR, date(2025, 6, 1), date(2025, 6, 30), [], permanent=True)
+    
+    assert cache.expiring_ranges(PAIR) == [(date(2025, 7, 1), date(2025, 7, 10))]
+    with patch('app.utils.range_cache.time.time', return_value=10**12):
+        assert cache.stale_ranges(PAIR, date(2025, 6, 1), date(2025, 6, 30)) == []
+
+def test_is_permanent_requires_full_permanent_coverage(cache):
+    """Test a range is final only when permanent intervals cover every day"""
+    cache.store(PAIR, date(2025, 6, 1), date(2025, 6, 15), [], permanent=True)
+    cache.store(PAIR, date(2025, 6, 16), date(2025, 6, 30), [], permanent=True)
+    
+    assert cache.is_permanent(PAIR, date(2025, 6, 10), date(2025, 6, 20))
+    assert not cache.is_permanent(PAIR, date(2025, 6, 20), date(2025, 7, 2))
+    assert not cache.is_permanent(("EUR", "GBP"), date(2025, 6, 10), date(2025, 6, 20))
@@ -0,0 +1,86 @@
+"""
+Unit tests for the persistent rate store
+"""
+
+import pytest
+from datetime import date, datetime, timedelta
+from app.services.fx_series import FXSeries
+from app.services.rate_store import RateStore
+from app.utils.publication import latest_publication_date, next_publication_time, next_refresh_time
+
+PAIR = ("EUR", "USD")
+
+@pytest.fixture
+def store(tmp_path):
+    """Create a rate store in a temporary directory"""
+    store = RateStore(str(tmp_path / "rates.sqlite3"))
+    yield store
+    store.close()
+
+def test_save_and_load(store):
+    """Test saved rates and coverage are loaded back for an overlapping range"""
+    store.save(PAIR, date(2025, 7, 1), date(2025, 7, 6), FXSeries.from_records([
+        {"date": "2025-07-01", "rate": 1.087},
+        {"date": "2025-07-04", "rate": 1.089},
+        {"date": "2025-07-09", "rate": 1.093}
+    ]))
+    
+    covered, data = store.load(PAIR, date(2025, 7, 3), date(2025, 7, 10))
+    
+    assert covered == [(date(2025, 7, 3), date(2025, 7, 6))]
+    assert data.to_records() == [{"date": "2025-07-04", "rate": 1.089}]
+
+def test_adjacent_saves_merge_coverage(store):
+    """Test adjacent saved ranges are merged into one interval"""
+    store.save(PAIR, date(2025, 7, 1), date(2025, 7, 3), FXSeries())
+    store.save(PAIR, date(2025, 7, 4), date(2025, 7, 6), FXSeries())
+    
+    covered, _ = store.load(PAIR, date(2025, 6, 1), date(2025, 8, 1))
+    assert covered == [(date(2025, 7, 1), date(2025, 7, 6))]
+
+def test_load_uncovered_range(store):
+    """Test loading a range that was never saved"""
+    covered, data = store.load(PAIR, date(2025, 7, 1), date(2025, 7, 3))
+    assert covered == []
+    assert len(data) == 0
+
+def test_data_survives_reopen(tmp_path):
+    """Test a new store instance on the same file starts warm"""
+    path = str(tmp_path / "rates.sqlite3")
+    first = RateStore(path)
+    first.save(PAIR, date(2025, 7, 1), date(2025, 7, 1), FXSeries.from_records([{"date": "2025-07-01", "rate": 1.087}]))
+    first.close()
+    
+    second = RateStore(path)
+    covered, data = second.load(PAIR, date(2025, 7, 1), date(2025, 7, 1))
+    second.close()
+    
+    assert covered == [(date(2025, 7, 1), date(2025, 7, 1))]
+    assert data.to_records() == [{"date": "2025-07-01", "rate": 1.087}]
+
+def test_latest_publication_date():
+    """Test the publication date before and after the 16:00 CET release and on weekends"""
+    assert latest_publication_date(datetime(2025, 7, 7, 10, 0)) == date(2025, 7, 4)
+    assert latest_publication_date(datetime(2025, 7, 7, 15, 0)) == date(2025, 7, 7)
+    assert latest_publication_date(datetime(2025, 7, 6, 15, 0)) == date(2025, 7, 4)
+
+def test_next_publication_time():
+    """Test the next release is later today before 16:00 CET and skips weekends"""
+    assert next_publication_time(datetime(2025, 7, 7, 10, 0)).date() == date(2025, 7, 7)
+    assert next_publication_time(datetime(2025, 7, 7, 15, 0)).date() == date(2025, 7, 8)
+    assert next_publication_time(datetime(2025, 7, 4, 15, 0)).date() == date(2025, 7, 7)
+    assert next_publication_time(datetime(2025, 7, 7, 10, 0)).hour == 16
+
+def test_next_refresh_time_skips_weekends():
+    """Test refresh slots around the publication stay on working days for either offset sign"""
+    before = timedelta(minutes=-30)
+    after = timedelta(minutes=2)
+    
+    # Friday 15:45 CEST: the 15:30 slot has passed, the next one is Monday's
+    friday_late = datetime(2025, 7, 4, 13, 45)
+    assert next_refresh_time(before, friday_late).isoformat() == "2025-07-07T15:30:00+02:00"
+    # Friday 16:01 CEST: today's 16:02 slot is still ahead
+    friday_after = datetime(2025, 7, 4, 14, 1)
+    assert next_refresh_time(after, friday_after).isoformat() == "2025-07-04T16:02:00+02:00"
+    # Saturday: no publication, so the next slot is Monday
+    assert next_refresh_time(before, datetime(2025, 7, 5, 12, 0)).date() == date(2025, 7, 7)
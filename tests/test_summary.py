@@ -2,13 +2,28 @@
 Unit tests for summary endpoint
 """
 
+import json
+import time
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, AsyncMock
+from unittest.mock import ANY, AsyncMock, MagicMock, patch
 from app.main import app
+from app.routes.summary import response_cache
+from app.services.franksher_api import get_api_service
+from app.services.fx_series import FXSeries
 
 client = TestClient(app)
 
+@pytest.fixture
+def mock_api_service():
+    """Override the shared API service dependency with a mock"""
+    mock_service_instance = AsyncMock()
+    mock_service_instance.is_final = MagicMock(return_value=False)
+    response_cache.clear()
+    app.dependency_overrides[get_api_service] = lambda: mock_service_instance
+    yield mock_service_instance
+    app.dependency_overrides.clear()
+
 @pytest.fixture
 def sample_fx_data():
     """Sample FX data for testing"""
@@ -18,13 +33,9 @@ def sample_fx_data():
         {"date": "2025-07-03", "rate": 1.092, "from": "EUR", "to": "USD"}
     ]
 
-@patch('app.routes.summary.FranksherAPIService')
 def test_summary_endpoint_success(mock_api_service, sample_fx_data):
     """Test summary endpoint with successful API response"""
-    # Mock the API service
-    mock_service_instance = AsyncMock()
-    mock_service_instance.get_fx_data.return_value = sample_fx_data
-    mock_api_service.return_value = mock_service_instance
+    mock_api_service.get_fx_data.return_value = sample_fx_data
     
     response = client.get(
         "/summary?start=2025-07-01&end=2025-07-03"
@@ -43,13 +54,9 @@ def test_summary_endpoint_success(mock_api_service, sample_fx_data):
     assert data["end_rate"] == 1.092
     assert data["mean_rate"] == 1.088  # (1.087 + 1.085 + 1.092) / 3
 
-@patch('app.routes.summary.FranksherAPIService')
 def test_summary_endpoint_daily_breakdown(mock_api_service, sample_fx_data):
     """Test summary endpoint with daily breakdown"""
-    # Mock the API service
-    mock_service_instance = AsyncMock()
-    mock_service_instance.get_fx_data.return_value = sample_fx_data
-    mock_api_service.return_value = mock_service_instance
+    mock_api_service.get_fx_data.return_value = sample_fx_data
     
     response = client.get(
         "/summary?start=2025-07-01&end=2025-07-03&breakdown=day"
@@ -85,6 +92,13 @@ def test_summary_endpoint_invalid_date_format():
     assert response.status_code == 400
     assert "Invalid date format" in response.json()["detail"]
 
+@pytest.mark.parametrize("start", ["2023-1-1", "20230101", "2023-02-30"])
+def test_summary_endpoint_rejects_non_iso_dates(start):
+    """Test dates the service cannot parse are rejected as bad requests"""
+    response = client.get(f"/summary?start={start}&end=2023-03-05")
+    assert response.status_code == 400
+    assert "Invalid date format" in response.json()["detail"]
+
 def test_summary_endpoint_invalid_breakpoint():
     """Test summary endpoint with invalid breakpoint parameter"""
     response = client.get(
@@ -93,6 +107,94 @@ def test_summary_endpoint_invalid_breakpoint():
     assert response.status_code == 400
     assert "Invalid breakdown parameter" in response.json()["detail"]
 
+def test_summary_endpoint_month_breakdown(mock_api_service, sample_fx_data):
+    """Test monthly resampling returns one aggregate row per month"""
+    mock_api_service.get_fx_data.return_value = sample_fx_data
+    
+    response = client.get(
+        "/summary?start=2025-07-01&end=2025-07-03&breakdown=month"
+    )
+    
+    assert response.status_code == 200
+    assert response.json() == [{
+        "period": "2025-07",
+        "start_date": "2025-07-01",
+        "end_date": "2025-07-03",
+        "first_rate": 1.087,
+        "last_rate": 1.092,
+        "min_rate": 1.085,
+        "max_rate": 1.092,
+        "mean_rate": 1.088,
+        "pct_change": 0.46,
+        "days": 3
+    }]
+
+def test_summary_ndjson_streams_period_rows(mock_api_service, sample_fx_data):
+    """Test period breakdowns stream one line per period"""
+    mock_api_service.get_fx_data.return_value = FXSeries.from_records(sample_fx_data)
+    
+    response = client.get(
+        "/summary?start=2025-07-01&end=2025-07-03&breakdown=week&format=ndjson"
+    )
+    
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["period"] for line in lines] == ["2025-W27"]
+
+def test_summary_ndjson_streams_rolling_rows(mock_api_service, sample_fx_data):
+    """Test rolling breakdowns stream the drawdown line, then one line per day"""
+    mock_api_service.get_fx_data.return_value = FXSeries.from_records(sample_fx_data)
+    
+    streamed = client.get(
+        "/summary?start=2025-07-01&end=2025-07-03&breakdown=rolling&window=2&format=ndjson"
+    )
+    regular = client.get("/summary?start=2025-07-01&end=2025-07-03&breakdown=rolling&window=2").json()
+    
+    assert streamed.status_code == 200
+    lines = [json.loads(line) for line in streamed.text.splitlines()]
+    days = regular.pop("days")
+    assert lines[0] == regular
+    assert lines[1:] == days
+
+def test_summary_endpoint_rolling_breakdown(mock_api_service, sample_fx_data):
+    """Test rolling-window statistics are computed server-side"""
+    mock_api_service.get_fx_data.return_value = sample_fx_data
+    
+    response = client.get(
+        "/summary?start=2025-07-01&end=2025-07-03&breakdown=rolling&window=2"
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["window"] == 2
+    assert data["max_drawdown_pct"] == -0.18
+    assert [day["date"] for day in data["days"]] == ["2025-07-02", "2025-07-03"]
+    assert data["days"][0]["moving_average"] == 1.086
+    assert data["days"][1]["rolling_min"] == 1.085
+    assert data["days"][1]["rolling_max"] == 1.092
+
+def test_summary_endpoint_rolling_window_changes_etag(mock_api_service, sample_fx_data):
+    """Test the window is part of the cache key for rolling breakdowns only"""
+    mock_api_service.get_fx_data.return_value = sample_fx_data
+    base = "/summary?start=2025-07-01&end=2025-07-03"
+    
+    rolling_2 = client.get(f"{base}&breakdown=rolling&window=2").headers["ETag"]
+    rolling_3 = client.get(f"{base}&breakdown=rolling&window=3").headers["ETag"]
+    summary_2 = client.get(f"{base}&window=2").headers["ETag"]
+    summary_3 = client.get(f"{base}&window=3").headers["ETag"]
+    
+    assert rolling_2 != rolling_3
+    assert summary_2 == summary_3
+
+@pytest.mark.parametrize("window", [1, 100000])
+def test_summary_endpoint_invalid_window(window):
+    """Test rolling windows outside the allowed range are rejected"""
+    response = client.get(
+        f"/summary?start=2025-07-01&end=2025-07-03&breakdown=rolling&window={window}"
+    )
+    assert response.status_code == 400
+    assert "Invalid window parameter" in response.json()["detail"]
+
 def test_summary_endpoint_start_after_end():
     """Test summary endpoint with start date after end date"""
     response = client.get(
@@ -101,13 +203,10 @@ def test_summary_endpoint_start_after_end():
     assert response.status_code == 400
     assert "Start date must be before or equal to end date" in response.json()["detail"]
 
-@patch('app.routes.summary.FranksherAPIService')
 def test_summary_endpoint_no_data(mock_api_service):
     """Test summary endpoint when no data is available"""
     # Mock the API service to return empty data
-    mock_service_instance = AsyncMock()
-    mock_service_instance.get_fx_data.return_value = []
-    mock_api_service.return_value = mock_service_instance
+    mock_api_service.get_fx_data.return_value = []
     
     response = client.get(
         "/summary?start=2025-07-01&end=2025-07-03"
@@ -115,3 +214,231 @@ def test_summary_endpoint_no_data(mock_api_service):
     
     assert response.status_code == 404
     assert "No FX data available" in response.json()["detail"]
+
+def test_summary_batch_fetches_union_once(mock_api_service, sample_fx_data):
+    """Test overlapping batch ranges are answered from one fetch"""
+    mock_api_service.get_fx_data.return_value = FXSeries.from_records(sample_fx_data)
+    
+    response = client.post("/summary/batch", json={"ranges": [
+        {"start": "2025-07-01", "end": "2025-07-03"},
+        {"start": "2025-07-02", "end": "2025-07-03", "breakdown": "day"}
+    ]})
+    
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == 2
+    assert results[0]["result"]["start_rate"] == 1.087
+    assert results[0]["result"]["mean_rate"] == 1.088
+    assert [day["date"] for day in results[1]["result"]] == ["2025-07-02", "2025-07-03"]
+    assert results[1]["result"][0]["pct_change"] is None
+    mock_api_service.get_fx_data.assert_called_once_with("2025-07-01", "2025-07-03", "EUR", "USD", deadline=ANY)
+
+def test_summary_batch_disjoint_ranges_fetched_separately(mock_api_service, sample_fx_data):
+    """Test adjacent ranges are merged and disjoint ranges fetched as separate spans"""
+    mock_api_service.get_fx_data.return_value = FXSeries.from_records(sample_fx_data)
+    
+    response = client.post("/summary/batch", json={"ranges": [
+        {"start": "2025-07-01", "end": "2025-07-01"},
+        {"start": "2025-07-02", "end": "2025-07-03"},
+        {"start": "2025-07-20", "end": "2025-07-21"}
+    ]})
+    
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["result"]["start_rate"] == 1.087
+    assert results[1]["result"]["start_rate"] == 1.085
+    assert "error" in results[2]["result"]
+    assert mock_api_service.get_fx_data.call_count == 2
+
+def test_summary_batch_rolling_window(mock_api_service, sample_fx_data):
+    """Test batch ranges carry their own rolling window"""
+    mock_api_service.get_fx_data.return_value = FXSeries.from_records(sample_fx_data)
+    
+    response = client.post("/summary/batch", json={"ranges": [
+        {"start": "2025-07-01", "end": "2025-07-03", "breakdown": "rolling", "window": 3}
+    ]})
+    
+    assert response.status_code == 200
+    result = response.json()["results"][0]["result"]
+    assert result["window"] == 3
+    assert [day["date"] for day in result["days"]] == ["2025-07-03"]
+
+def test_summary_batch_invalid_range():
+    """Test an invalid range rejects the batch and names its index"""
+    response = client.post("/summary/batch", json={"ranges": [
+        {"start": "2025-07-01", "end": "2025-07-03"},
+        {"start": "2025-07-03", "end": "2025-07-01"}
+    ]})
+    
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("ranges[1]:")
+
+def test_summary_batch_rejects_non_iso_dates():
+    """Test unpadded dates in a batch range are a bad request, not a server error"""
+    response = client.post("/summary/batch", json={"ranges": [
+        {"start": "2023-1-1", "end": "2023-1-5"}
+    ]})
+    
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("ranges[0]: Invalid date format")
+
+def test_summary_multiple_targets(mock_api_service, sample_fx_data):
+    """Test several target currencies return one summary per currency"""
+    mock_api_service.get_fx_rates.return_value = {
+        "USD": FXSeries.from_records(sample_fx_data),
+        "GBP": FXSeries()
+    }
+    
+    response = client.get("/summary?start=2025-07-01&end=2025-07-03&from=eur&to=USD,gbp")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["USD"]["start_rate"] == 1.087
+    assert "error" in data["GBP"]
+    mock_api_service.get_fx_rates.assert_called_once_with("2025-07-01", "2025-07-03", "EUR", ["USD", "GBP"], deadline=ANY)
+
+def test_summary_cross_pair(mock_api_service, sample_fx_data):
+    """Test a single non-EUR pair is passed through to the service"""
+    mock_api_service.get_fx_data.return_value = sample_fx_data
+    
+    response = client.get("/summary?start=2025-07-01&end=2025-07-03&from=GBP&to=JPY")
+    
+    assert response.status_code == 200
+    mock_api_service.get_fx_data.assert_called_once_with("2025-07-01", "2025-07-03", "GBP", "JPY", deadline=ANY)
+
+def test_summary_invalid_currency():
+    """Test invalid currency codes are rejected"""
+    response = client.get("/summary?start=2025-07-01&end=2025-07-03&to=DOLLARS")
+    assert response.status_code == 400
+    assert "Invalid currency code" in response.json()["detail"]
+
+def test_summary_same_base_and_target():
+    """Test a target equal to the base currency is rejected"""
+    response = client.get("/summary?start=2025-07-01&end=2025-07-03&from=USD&to=USD")
+    assert response.status_code == 400
+
+def test_summary_ndjson_stream(mock_api_service, sample_fx_data):
+    """Test the daily breakdown streamed as NDJSON matches the JSON response"""
+    mock_api_service.get_fx_data.return_value = FXSeries.from_records(sample_fx_data)
+    
+    streamed = client.get("/summary?start=2025-07-01&end=2025-07-03&breakdown=day&format=ndjson")
+    regular = client.get("/summary?start=2025-07-01&end=2025-07-03&breakdown=day")
+    
+    assert streamed.status_code == 200
+    assert streamed.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in streamed.text.splitlines()]
+    assert rows == regular.json()
+
+def test_summary_ndjson_multiple_targets(mock_api_service, sample_fx_data):
+    """Test streamed rows are tagged with their currency when there are several targets"""
+    mock_api_service.get_fx_rates.return_value = {
+        "USD": FXSeries.from_records(sample_fx_data),
+        "GBP": FXSeries.from_records(sample_fx_data[:1])
+    }
+    
+    response = client.get("/summary?start=2025-07-01&end=2025-07-03&to=USD,GBP&format=ndjson")
+    
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["currency"] for row in rows] == ["USD", "GBP"]
+    assert rows[0]["start_rate"] == 1.087
+
+def test_summary_invalid_format():
+    """Test an unknown response format is rejected"""
+    response = client.get("/summary?start=2025-07-01&end=2025-07-03&format=xml")
+    assert response.status_code == 400
+
+def test_summary_request_timeout_sets_deadline(mock_api_service, sample_fx_data):
+    """Test the X-Request-Timeout header becomes a deadline passed to the service"""
+    mock_api_service.get_fx_data.return_value = FXSeries.from_records(sample_fx_data)
+    
+    before = time.monotonic()
+    response = client.get("/summary?start=2025-07-01&end=2025-07-03", headers={"X-Request-Timeout": "2.5"})
+    
+    assert response.status_code == 200
+    deadline = mock_api_service.get_fx_data.call_args.kwargs["deadline"]
+    assert before + 2.5 <= deadline <= time.monotonic() + 2.5
+
+def test_summary_invalid_timeout():
+    """Test a non-positive latency budget is rejected"""
+    response = client.get("/summary?start=2025-07-01&end=2025-07-03&timeout=0")
+    assert response.status_code == 400
+
+def test_summary_server_timing_header(mock_api_service, sample_fx_data):
+    """Test the response reports validation, processing and serialization phases"""
+    mock_api_service.get_fx_data.return_value = FXSeries.from_records(sample_fx_data)
+    
+    response = client.get("/summary?start=2025-07-01&end=2025-07-03")
+    
+    phases = [entry.split(";")[0] for entry in response.headers["Server-Timing"].split(", ")]
+    assert phases == ["validation", "processing", "serialization", "total"]
+
+def test_summary_etag_and_not_modified(mock_api_service, sample_fx_data):
+    """Test a matching If-None-Match returns 304 before any calculation"""
+    mock_api_service.get_fx_data.return_value = FXSeries.from_records(sample_fx_data)
+    
+    first = client.get("/summary?start=2025-07-01&end=2025-07-03")
+    etag = first.headers["ETag"]
+    with patch("app.routes.summary.FXCalculator.process_fx_data") as mock_process:
+        second = client.get("/summary?start=2025-07-01&end=2025-07-03", headers={"If-None-Match": etag})
+    
+    assert etag.startswith('"') and etag.endswith('"')
+    assert second.status_code == 304
+    assert second.headers["ETag"] == etag
+    mock_process.assert_not_called()
+
+def test_summary_etag_changes_with_data_and_params(mock_api_service, sample_fx_data):
+    """Test the ETag depends on the rates and the normalized request"""
+    mock_api_service.get_fx_data.return_value = FXSeries.from_records(sample_fx_data)
+    etag = client.get("/summary?start=2025-07-01&end=2025-07-03").headers["ETag"]
+    
+    assert client.get("/summary?start=2025-07-01&end=2025-07-03&breakdown=day").headers["ETag"] != etag
+    
+    mock_api_service.get_fx_data.return_value = FXSeries.from_records(sample_fx_data[:2])
+    response = client.get("/summary?start=2025-07-01&end=2025-07-03", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+def test_summary_cache_control(mock_api_service, sample_fx_data):
+    """Test final ranges are immutable and others get a short lifetime"""
+    mock_api_service.get_fx_data.return_value = FXSeries.from_records(sample_fx_data)
+    
+    response = client.get("/summary?start=2025-07-01&end=2025-07-03")
+    assert "immutable" not in response.headers["Cache-Control"]
+    
+    mock_api_service.is_final.return_value = True
+    response = client.get("/summary?start=2025-07-01&end=2025-07-03")
+    assert "immutable" in response.headers["Cache-Control"]
+
+def test_summary_repeat_query_served_from_encoded_cache(mock_api_service, sample_fx_data):
+    """Test a repeat query with unchanged data skips calculation and encoding"""
+    mock_api_service.get_fx_data.return_value = FXSeries.from_records(sample_fx_data)
+    first = client.get("/summary?start=2025-07-01&end=2025-07-03&breakdown=day")
+    
+    with patch("app.routes.summary.FXCalculator.process_fx_data") as mock_process:
+        second = client.get("/summary?start=2025-07-01&end=2025-07-03&breakdown=day")
+    
+    mock_process.assert_not_called()
+    assert second.content == first.content
+    assert second.headers["content-type"] == "application/json"
+
+def test_summary_encoded_cache_tracks_data_changes(mock_api_service, sample_fx_data):
+    """Test a cached body is not reused once the underlying rates change"""
+    mock_api_service.get_fx_data.return_value = FXSeries.from_records(sample_fx_data)
+    client.get("/summary?start=2025-07-01&end=2025-07-03")
+    
+    mock_api_service.get_fx_data.return_value = FXSeries.from_records(sample_fx_data[:2])
+    response = client.get("/summary?start=2025-07-01&end=2025-07-03")
+    
+    assert response.json()["end_rate"] == 1.085
+
+def test_summary_final_response_skips_fetch(mock_api_service, sample_fx_data):
+    """Test a cached response over final rates is served without fetching"""
+    mock_api_service.is_final.return_value = True
+    mock_api_service.get_fx_data.return_value = FXSeries.from_records(sample_fx_data)
+    first = client.get("/summary?start=2025-07-01&end=2025-07-03")
+    
+    second = client.get("/summary?start=2025-07-01&end=2025-07-03")
+    
+    assert mock_api_service.get_fx_data.await_count == 1
+    assert second.content == first.content
+    assert "immutable" in second.headers["Cache-Control"]
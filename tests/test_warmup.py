@@ -0,0 +1,121 @@
+"""
+Unit tests for the startup cache warm-up
+"""
+
+import asyncio
+import pytest
+from datetime import date
+from unittest.mock import AsyncMock
+from app.services.warmup import (
+    COMPLETE, DISABLED, INCOMPLETE, CacheWarmer, lookback_windows, parse_pairs
+)
+
+def test_parse_pairs_groups_targets_by_base():
+    """Test pairs are grouped per base currency without duplicates"""
+    assert parse_pairs(" eur/usd, EUR/GBP,GBP/JPY,EUR/USD,") == {
+        "EUR": ["USD", "GBP"],
+        "GBP": ["JPY"]
+    }
+    assert parse_pairs("") == {}
+
+@pytest.mark.parametrize("value", ["EURUSD", "EUR/US", "EUR/EUR", "E1R/USD"])
+def test_parse_pairs_rejects_invalid(value):
+    """Test malformed pairs are rejected"""
+    with pytest.raises(ValueError):
+        parse_pairs(value)
+
+def test_lookback_windows_newest_first():
+    """Test the lookback is covered by calendar-year windows starting from the most recent"""
+    assert lookback_windows(date(2025, 7, 1), 800) == [
+        (date(2025, 1, 1), date(2025, 7, 1)),
+        (date(2024, 1, 1), date(2024, 12, 31)),
+        (date(2023, 4, 23), date(2023, 12, 31))
+    ]
+
+def make_service():
+    """Mock service whose prefetch reports every window as cached"""
+    service = AsyncMock()
+    service.prefetch.return_value = True
+    return service
+
+@pytest.mark.asyncio
+async def test_warmer_fetches_each_window_once_per_base():
+    """Test every base currency is fetched once per window with all its targets"""
+    service = make_service()
+    warmer = CacheWarmer(service, {"EUR": ["USD", "GBP"], "GBP": ["JPY"]}, lookback_days=400)
+    
+    await warmer.run()
+    
+    assert warmer.state == COMPLETE
+    assert warmer.ready
+    years = len(lookback_windows(date.today(), 400))
+    assert service.prefetch.call_count == warmer.windows_total == 2 * years
+    bases = [call.args[2] for call in service.prefetch.call_args_list]
+    assert sorted(bases) == ["EUR"] * years + ["GBP"] * years
+    assert warmer.snapshot()["windows_done"] == 2 * years
+
+@pytest.mark.asyncio
+async def test_warmer_bounds_concurrency():
+    """Test no more windows are fetched at once than the concurrency limit"""
+    running = 0
+    peak = 0
+    
+    async def fetch(*args, **kwargs):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return True
+    
+    service = AsyncMock()
+    service.prefetch.side_effect = fetch
+    warmer = CacheWarmer(service, {"EUR": ["USD"]}, lookback_days=5 * 365, concurrency=2)
+    
+    await warmer.run()
+    
+    assert warmer.windows_done == warmer.windows_total >= 5
+    assert peak == 2
+
+@pytest.mark.asyncio
+async def test_warmer_skips_windows_after_budget():
+    """Test windows not started within the budget are skipped and the warm-up is still ready"""
+    async def slow_fetch(*args, **kwargs):
+        await asyncio.sleep(0.05)
+        return True
+    
+    service = AsyncMock()
+    service.prefetch.side_effect = slow_fetch
+    warmer = CacheWarmer(service, {"EUR": ["USD"]}, lookback_days=5 * 365, concurrency=1, budget_seconds=0.01)
+    
+    await warmer.run()
+    
+    assert warmer.state == INCOMPLETE
+    assert warmer.ready
+    assert warmer.windows_done == 1
+    assert warmer.windows_skipped == warmer.windows_total - 1
+
+@pytest.mark.asyncio
+async def test_warmer_counts_failures():
+    """Test a failing window does not stop the others"""
+    service = AsyncMock()
+    service.prefetch.side_effect = [RuntimeError("boom"), False] + [True] * 10
+    warmer = CacheWarmer(service, {"EUR": ["USD"]}, lookback_days=800)
+    
+    await warmer.run()
+    
+    assert warmer.state == INCOMPLETE
+    assert warmer.windows_failed == 2  # an error and a window upstream could not serve
+    assert warmer.windows_done == warmer.windows_total - 2
+
+@pytest.mark.asyncio
+async def test_warmer_disabled():
+    """Test a disabled warm-up is ready immediately and fetches nothing"""
+    service = make_service()
+    warmer = CacheWarmer(service, {"EUR": ["USD"]}, lookback_days=400, enabled=False)
+    
+    await warmer.run()
+    
+    assert warmer.state == DISABLED
+    assert warmer.ready
+    service.prefetch.assert_not_called()